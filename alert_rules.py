@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+alert_rules.py
+
+Reglas de alerta para system_monitor.py, leídas desde un YAML
+(ALERT_RULES_FILE, por defecto alert_rules.yaml):
+
+    rules:
+      - name: cpu_alta
+        metric: cpu_percent          # admite rutas: net.bytes_recv_per_s, load_avg.0
+        aggregate: ewma              # last | ewma | avg | max | p95
+        alpha: 0.2                   # solo ewma
+        window: 60                   # muestras, para avg / max / p95
+        above: 85                    # o `below:` para alertar por valores bajos
+        clear: 75                    # histéresis: vuelve a OK recién bajo 75
+        for: 5m                      # la condición debe sostenerse 5 minutos
+
+Cada regla se evalúa de forma incremental con cada muestra: ewma, avg y max
+cuestan O(1) (amortizado) por muestra y p95 mantiene la ventana ordenada con
+bisect. Una regla pasa a CRIT cuando el valor agregado cruza el umbral durante
+`for`, y vuelve a OK solo cuando cruza `clear`, así un valor que oscila cerca
+del umbral no genera alertas y recuperaciones en cada muestra.
+
+Al arrancar, cada regla parte del último estado notificado (restore): si
+había una alerta activa sigue en CRIT, y no vuelve a OK hasta "calentar"
+(pasó `for` desde la primera muestra y, con avg/max/p95, la ventana está
+llena), así un reinicio no manda una recuperación falsa.
+
+Sin archivo de reglas se usan los umbrales instantáneos de siempre
+(CPU > 85, RAM > 90, disco > 85).
+"""
+
+import math
+import os
+import re
+from bisect import bisect_left, insort
+from collections import deque
+
+import yaml
+
+from alert_state import STATE_CRIT, STATE_OK
+
+
+DEFAULT_RULES = [
+    {"name": "cpu_percent", "metric": "cpu_percent", "above": 85},
+    {"name": "memory_percent", "metric": "memory_percent", "above": 90},
+    {"name": "disk_percent", "metric": "disk_percent", "above": 85},
+]
+
+AGGREGATES = ("last", "ewma", "avg", "max", "p95")
+WINDOW_AGGREGATES = ("avg", "max", "p95")
+DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value) -> float:
+    """Convierte 30, "30s", "5m", "1h" o "1d" a segundos."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = DURATION_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Duración inválida: {value!r}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def lookup_metric(metrics: dict, path: str):
+    """Obtiene un valor por ruta con puntos ("net.bytes_recv_per_s", "load_avg.0"); None si no existe."""
+    value = metrics
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, (list, tuple)) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value if isinstance(value, (int, float)) else None
+
+
+class _Ewma:
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value = None
+
+    def add(self, x: float) -> float:
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _WindowAvg:
+    def __init__(self, size: int):
+        self.window = deque(maxlen=size)
+        self.total = 0.0
+
+    def add(self, x: float) -> float:
+        if len(self.window) == self.window.maxlen:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        return self.total / len(self.window)
+
+
+class _WindowMax:
+    """Máximo de la ventana con una deque monótona decreciente (O(1) amortizado)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self.candidates: deque[tuple[int, float]] = deque()
+
+    def add(self, x: float) -> float:
+        while self.candidates and self.candidates[-1][1] <= x:
+            self.candidates.pop()
+        self.candidates.append((self.count, x))
+        if self.candidates[0][0] <= self.count - self.size:
+            self.candidates.popleft()
+        self.count += 1
+        return self.candidates[0][1]
+
+
+class _WindowP95:
+    """Percentil 95 (nearest-rank) de la ventana, manteniendo sus valores ordenados."""
+
+    def __init__(self, size: int):
+        self.window = deque(maxlen=size)
+        self.ordered: list[float] = []
+
+    def add(self, x: float) -> float:
+        if len(self.window) == self.window.maxlen:
+            del self.ordered[bisect_left(self.ordered, self.window[0])]
+        self.window.append(x)
+        insort(self.ordered, x)
+        return self.ordered[max(0, math.ceil(0.95 * len(self.ordered)) - 1)]
+
+
+class _Last:
+    def add(self, x: float) -> float:
+        return x
+
+
+def _make_aggregate(kind: str, window: int, alpha: float):
+    if kind == "ewma":
+        return _Ewma(alpha)
+    if kind == "avg":
+        return _WindowAvg(window)
+    if kind == "max":
+        return _WindowMax(window)
+    if kind == "p95":
+        return _WindowP95(window)
+    return _Last()
+
+
+class AlertRule:
+    """Una regla con su agregado incremental, duración mínima e histéresis."""
+
+    def __init__(self, name: str, metric: str, above: float | None = None, below: float | None = None,
+                 clear: float | None = None, aggregate: str = "last", window: int = 12,
+                 alpha: float = 0.3, for_seconds: float = 0.0):
+        if (above is None) == (below is None):
+            raise ValueError(f"La regla '{name}' debe definir exactamente uno de `above` o `below`")
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"La regla '{name}' usa un agregado desconocido: {aggregate}")
+
+        self.name = name
+        self.metric = metric
+        self.above = above
+        self.below = below
+        self.threshold = above if above is not None else below
+        self.clear = self.threshold if clear is None else clear
+        self.aggregate = aggregate
+        self.for_seconds = for_seconds
+        self.window = max(1, int(window))
+        self._agg = _make_aggregate(aggregate, self.window, alpha)
+
+        self.state = STATE_OK
+        self.restored = False
+        self.value: float | None = None
+        self._pending_since: float | None = None
+        self._first_sample: float | None = None
+        self._samples = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "AlertRule":
+        return cls(
+            name=config.get("name") or config["metric"],
+            metric=config["metric"],
+            above=config.get("above"),
+            below=config.get("below"),
+            clear=config.get("clear"),
+            aggregate=config.get("aggregate", "last"),
+            window=int(config.get("window", 12)),
+            alpha=float(config.get("alpha", 0.3)),
+            for_seconds=parse_duration(config.get("for", 0)),
+        )
+
+    def restore(self, state: str | None) -> None:
+        """Parte del último estado notificado (None: nunca alertó), p. ej. tras reiniciar el proceso."""
+        self.state = STATE_OK if state is None else state
+        self.restored = True
+
+    def warmed_up(self, now: float) -> bool:
+        """Si ya hay muestras suficientes para confiar en el valor: pasó `for` y la ventana está llena."""
+        if self._first_sample is None or now - self._first_sample < self.for_seconds:
+            return False
+        return self.aggregate not in WINDOW_AGGREGATES or self._samples >= self.window
+
+    def _breached(self, value: float) -> bool:
+        return value > self.threshold if self.above is not None else value < self.threshold
+
+    def _cleared(self, value: float) -> bool:
+        return value <= self.clear if self.above is not None else value >= self.clear
+
+    def update(self, metrics: dict, now: float) -> str:
+        """Agrega la muestra y devuelve el estado de la regla (STATE_OK o STATE_CRIT)."""
+        raw = lookup_metric(metrics, self.metric)
+        if raw is None or (isinstance(raw, float) and math.isnan(raw)):
+            return self.state
+
+        value = self.value = self._agg.add(float(raw))
+        self._samples += 1
+        if self._first_sample is None:
+            self._first_sample = now
+
+        if self.state == STATE_CRIT:
+            # Recién arrancada, una ventana a medio llenar no basta para dar la alerta por resuelta
+            if self._cleared(value) and self.warmed_up(now):
+                self.state = STATE_OK
+            return self.state
+
+        if not self._breached(value):
+            self._pending_since = None
+            return self.state
+
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since >= self.for_seconds:
+            self.state = STATE_CRIT
+            self._pending_since = None
+        return self.state
+
+    def describe(self) -> str:
+        op = ">" if self.above is not None else "<"
+        agg = "" if self.aggregate == "last" else f"{self.aggregate} "
+        value = "sin datos" if self.value is None else f"{self.value:.1f}"
+        return f"{self.name}: {agg}{self.metric} = {value} ({op} {self.threshold:g})"
+
+
+def load_rules(path: str) -> list[AlertRule]:
+    """Lee las reglas del YAML; si no existe, usa DEFAULT_RULES."""
+    if not os.path.exists(path):
+        return [AlertRule.from_config(rule) for rule in DEFAULT_RULES]
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    rules = [AlertRule.from_config(rule) for rule in data.get("rules", [])]
+    if not rules:
+        print(f"[WARNING] {path} no define reglas, se usan los umbrales por defecto.")
+        return [AlertRule.from_config(rule) for rule in DEFAULT_RULES]
+    return rules
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+alert_state.py
+
+Estado de alertas persistido en SQLite para no repetir la misma notificación
+en cada ejecución mientras una condición se mantiene.
+
+Por cada (host, chequeo) se guarda el último estado, su huella (qué se
+alertó) y cuándo se notificó. Solo se notifica cuando el estado cambia
+(OK→CRIT, CRIT→OK, o cambia la huella) o cuando pasan
+ALERT_RENOTIFY_INTERVAL segundos desde el último aviso de un problema que sigue.
+
+La tabla se carga completa en un dict al primer uso y los cambios se escriben
+en una sola transacción con save(), así cada chequeo cuesta una búsqueda en
+memoria aunque haya miles por ejecución.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ALERT_STATE_DB = os.getenv("ALERT_STATE_DB", "alert_state.db")
+# Segundos entre recordatorios de un problema que no cambia; 0 = avisar en cada ejecución
+ALERT_RENOTIFY_INTERVAL = float(os.getenv("ALERT_RENOTIFY_INTERVAL", "3600"))
+
+STATE_OK = "OK"
+STATE_CRIT = "CRIT"
+
+# Resultados de AlertStateStore.evaluate()
+NOTIFY_ALERT = "alert"          # problema nuevo o distinto al ya avisado
+NOTIFY_REMINDER = "reminder"    # el mismo problema sigue tras el intervalo de re-aviso
+NOTIFY_RECOVERED = "recovered"  # volvió a OK
+
+
+class AlertStateStore:
+    """Último estado notificado por (host, chequeo), en SQLite."""
+
+    def __init__(self, path: str = ALERT_STATE_DB, renotify_interval: float = ALERT_RENOTIFY_INTERVAL):
+        self.path = path
+        self.renotify_interval = renotify_interval
+        # (host, check) -> (state, fingerprint, last_change, last_notified)
+        self._states: dict[tuple[str, str], tuple[str, str, float, float]] | None = None
+        self._dirty: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS alert_state ("
+            " host TEXT NOT NULL,"
+            " check_name TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " last_change REAL NOT NULL,"
+            " last_notified REAL NOT NULL,"
+            " PRIMARY KEY (host, check_name)"
+            ") WITHOUT ROWID"
+        )
+        return conn
+
+    def _load_locked(self) -> dict[tuple[str, str], tuple[str, str, float, float]]:
+        if self._states is None:
+            self._states = {}
+            try:
+                conn = self._connect()
+                try:
+                    rows = conn.execute(
+                        "SELECT host, check_name, state, fingerprint, last_change, last_notified FROM alert_state"
+                    )
+                    self._states = {(row[0], row[1]): tuple(row[2:]) for row in rows}
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"[WARNING] No se pudo leer {self.path}, se parte sin estado de alertas: {e}")
+        return self._states
+
+    def state(self, host: str, check: str) -> str | None:
+        """Último estado registrado de un chequeo; None si nunca se alertó."""
+        with self._lock:
+            previous = self._load_locked().get((host, check))
+        return previous[0] if previous is not None else None
+
+    def evaluate(self, host: str, check: str, state: str, fingerprint: str = "",
+                 now: float | None = None) -> str | None:
+        """
+        Registra el estado actual de un chequeo y devuelve si hay que notificar:
+        NOTIFY_ALERT, NOTIFY_REMINDER, NOTIFY_RECOVERED o None.
+
+        `state` es STATE_OK o cualquier otro valor (STATE_CRIT, "WARN", ...);
+        `fingerprint` distingue problemas dentro de un mismo estado (p. ej. el
+        SubState de un servicio), de modo que un cambio también se avisa.
+        """
+        now = time.time() if now is None else now
+        key = (host, check)
+
+        with self._lock:
+            states = self._load_locked()
+            previous = states.get(key)
+
+            if previous is None:
+                if state == STATE_OK:
+                    return None  # Nunca alertado: no hace falta guardar nada
+                states[key] = (state, fingerprint, now, now)
+                self._dirty.add(key)
+                return NOTIFY_ALERT
+
+            prev_state, prev_fingerprint, last_change, last_notified = previous
+
+            if state == STATE_OK:
+                if prev_state == STATE_OK:
+                    return None
+                states[key] = (state, fingerprint, now, now)
+                self._dirty.add(key)
+                return NOTIFY_RECOVERED
+
+            if state != prev_state or fingerprint != prev_fingerprint:
+                states[key] = (state, fingerprint, now, now)
+                self._dirty.add(key)
+                return NOTIFY_ALERT
+
+            if now - last_notified >= self.renotify_interval:
+                states[key] = (state, fingerprint, last_change, now)
+                self._dirty.add(key)
+                return NOTIFY_REMINDER
+
+            return None
+
+    def save(self) -> None:
+        """Escribe en SQLite solo los chequeos que cambiaron, en una transacción."""
+        with self._lock:
+            if not self._dirty or self._states is None:
+                return
+
+            rows = [(host, check, *self._states[(host, check)]) for host, check in self._dirty]
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO alert_state"
+                            " (host, check_name, state, fingerprint, last_change, last_notified)"
+                            " VALUES (?, ?, ?, ?, ?, ?)"
+                            " ON CONFLICT (host, check_name) DO UPDATE SET"
+                            " state = excluded.state, fingerprint = excluded.fingerprint,"
+                            " last_change = excluded.last_change, last_notified = excluded.last_notified",
+                            rows,
+                        )
+                finally:
+                    conn.close()
+                self._dirty.clear()
+            except sqlite3.Error as e:
+                print(f"[ERROR] No se pudo guardar el estado de alertas en {self.path}: {e}")
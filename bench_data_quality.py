@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+bench_data_quality.py
+
+Benchmark opcional (no corre con pytest) del mini DSL de
+data_quality_dsl_simple.py sobre datos sintéticos de 1M y 10M filas:
+
+  - cada tipo de regla por separado, con cada backend (segundos y millones
+    de filas por segundo);
+  - el caché por columna (_ColumnCache): la misma regla repetida y dos
+    reglas que comparten la conversión de la columna;
+  - regex_match (Arrow/RE2 con revisión en `re`) contra `re` fila por fila.
+
+Uso:
+    python bench_data_quality.py                       # 1M y 10M filas
+    python bench_data_quality.py --rows 200000 --repeat 1 --backends pandas
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_quality_dsl_simple import (
+    BACKENDS,
+    _ColumnCache,
+    match_with_re,
+    native_regex_ok,
+    regex_match,
+    run_quality_checks,
+)
+
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+RULES = [
+    {"type": "not_null", "column": "email"},
+    {"type": "unique", "column": "user_id"},
+    {"type": "in_range", "column": "age", "min": 0, "max": 120},
+    {"type": "in_range", "column": "age_text", "min": 0, "max": 120},
+    {"type": "regex", "column": "email", "pattern": EMAIL_PATTERN},
+    {"type": "in_set", "column": "status", "allowed": ["active", "inactive"]},
+]
+
+
+def make_data(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Datos sintéticos con ~1% de errores por columna y algo de texto no ASCII (revisado con `re`)."""
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, rows * 2, size=rows)
+    age = rng.integers(-10, 131, size=rows)
+
+    email = "user" + pd.Series(ids).astype(str) + "@example.com"
+    noise = rng.random(rows)
+    email[noise < 0.01] = "bademail"
+    email[(noise >= 0.01) & (noise < 0.02)] = None
+    email[(noise >= 0.02) & (noise < 0.021)] = "josé@example.com"
+
+    age_text = pd.Series(age).astype(str)
+    age_text[rng.random(rows) < 0.01] = "n/a"
+
+    return pd.DataFrame({
+        "user_id": ids,
+        "email": email,
+        "age": age,
+        "age_text": age_text,
+        "status": rng.choice(["active", "inactive", "unknown"], size=rows, p=[0.6, 0.39, 0.01]),
+    })
+
+
+def best_time(fn, repeat: int) -> float:
+    """Mejor tiempo (segundos) de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def describe(rule: dict) -> str:
+    return f"{rule['type']}({rule['column']})"
+
+
+def bench_rules(df: pd.DataFrame, backends, repeat: int) -> None:
+    rows = len(df)
+    print(f"{'regla':<24} {'backend':<8} {'segundos':>9} {'Mfilas/s':>9}")
+    for rule in RULES:
+        for backend in backends:
+            seconds = best_time(lambda: run_quality_checks(df, [rule], backend=backend), repeat)
+            print(f"{describe(rule):<24} {backend:<8} {seconds:>9.3f} {rows / seconds / 1e6:>9.1f}")
+
+
+def bench_cache(df: pd.DataFrame) -> None:
+    """Tiempo de cada regla en una columna con reglas repetidas o que comparten conversión."""
+    cases = {
+        "regex repetida": [RULES[4], dict(RULES[4])],
+        "in_range x2 (to_numeric compartido)": [RULES[3], {**RULES[3], "min": 18}],
+        "regex x2 (texto compartido)": [RULES[4], {**RULES[4], "pattern": r"^user\d+@"}],
+    }
+    for name, rules in cases.items():
+        report = run_quality_checks(df, rules, max_workers=1)
+        seconds = ", ".join(f"{r['seconds']:.3f}" for r in report["results"])
+        print(f"{name:<38} segundos por regla: {seconds}")
+
+
+def bench_regex_match(df: pd.DataFrame, repeat: int, baseline: bool) -> None:
+    text = _ColumnCache(df["email"]).text()
+    rows = len(text)
+    print(f"{'regex_match':<24} {'motor':<8} {'segundos':>9} {'Mfilas/s':>9}")
+    engine = "arrow" if native_regex_ok(EMAIL_PATTERN) else "re"
+    seconds = best_time(lambda: regex_match(text, EMAIL_PATTERN), repeat)
+    print(f"{'email':<24} {engine:<8} {seconds:>9.3f} {rows / seconds / 1e6:>9.1f}")
+    if baseline:
+        values = text.astype(object)
+        seconds = best_time(lambda: match_with_re(values, EMAIL_PATTERN), 1)
+        print(f"{'email':<24} {'re/fila':<8} {seconds:>9.3f} {rows / seconds / 1e6:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las reglas del mini DSL de calidad de datos.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                        help="filas de cada corrida (por defecto: 1000000 10000000)")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="backends a medir (por defecto: todos)")
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por medición; se informa la mejor")
+    parser.add_argument("--no-baseline", action="store_true",
+                        help="no medir `re` fila por fila (lento con 10M filas)")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        start = time.perf_counter()
+        df = make_data(rows)
+        print(f"\n=== {rows:,} filas (datos generados en {time.perf_counter() - start:.1f}s) ===")
+        bench_rules(df, args.backends, args.repeat)
+        print()
+        bench_cache(df)
+        print()
+        bench_regex_match(df, args.repeat, baseline=not args.no_baseline)
+
+
+if __name__ == "__main__":
+    main()
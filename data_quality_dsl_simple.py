@@ -1,6 +1,98 @@
+import importlib.util
+import argparse
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from failure_index import FailureIndex
+
+# pyarrow es opcional: con él las columnas de texto se evalúan en Arrow
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def as_string_series(s: pd.Series) -> pd.Series:
+    """
+    Columna como texto con los nulos en "", igual que `fillna("").astype(str)`,
+    pero respaldada por Arrow si pyarrow está instalado: así `.str.match` y el
+    resto de operaciones de texto corren vectorizadas en vez de fila por fila.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype) or (
+        pd.api.types.is_extension_array_dtype(s.dtype) and s.dtype.kind in "iufb"
+    ):
+        # Categorías y enteros/booleanos con nulos de pandas no aceptan "" en fillna
+        s = s.astype(object)
+    text = s.fillna("").astype(str)
+    if HAS_PYARROW and text.dtype == object:
+        # pandas < 3 deja object; desde pandas 3 `str` ya usa Arrow
+        text = text.astype("string[pyarrow]")
+    return text
+
+
+# RE2 (Arrow) y el motor de Polars solo difieren de `re` en filas con estos caracteres:
+# no ASCII (\d, \w, \s y \b de RE2 son solo ASCII), "\n" (`$` de `re` acepta un "\n"
+# final) y \v, \x1c-\x1f (espacios para `\s` de `re`, no para RE2)
+RE_RECHECK_CHARS = r"[^\x00-\x09\x0c-\x1b\x20-\x7f]"
+# Sintaxis que RE2 lee distinto que `re` aun en texto ASCII: clases POSIX, "{,n}" y
+# \B (en "" depende de la versión de Python)
+_RE_ONLY_SYNTAX = re.compile(r"\[:|\{,|\\B")
+
+
+def native_regex_ok(pattern: str) -> bool:
+    """True si `pattern` se puede evaluar con RE2/Polars revisando con `re` solo las filas de RE_RECHECK_CHARS."""
+    return pattern.isascii() and not _RE_ONLY_SYNTAX.search(pattern)
+
+
+def _printable_ascii(chunks) -> bool:
+    """True si los bytes de todos los arrays de texto de Arrow son ASCII imprimible (sin RE_RECHECK_CHARS)."""
+    data = [np.frombuffer(c.buffers()[2], dtype=np.uint8) for c in chunks if c.buffers()[2] is not None]
+    return all(b.size == 0 or (b.min() >= 0x20 and b.max() < 0x80) for b in data)
+
+
+def recheck_rows(text: pd.Series) -> pd.Series:
+    """
+    Filas de `text` con caracteres de RE_RECHECK_CHARS. Con Arrow mira primero
+    los bytes de toda la columna: si son todos ASCII imprimible (lo habitual)
+    no recorre las filas.
+    """
+    try:
+        if _printable_ascii(text.array.__arrow_array__().chunks):
+            return pd.Series(False, index=text.index)
+    except Exception:
+        pass
+    return text.str.contains(RE_RECHECK_CHARS)
+
+
+def match_with_re(values, pattern: str) -> list[bool]:
+    rx = re.compile(pattern)
+    return [rx.match(x) is not None for x in values]
+
+
+def regex_match(text: pd.Series, pattern: str, recheck: pd.Series | None = None) -> pd.Series:
+    """
+    Máscara booleana de las filas cuyo inicio coincide con `pattern`, con la
+    semántica de `re.match`. Con Arrow el patrón se evalúa con RE2 y las filas
+    donde RE2 puede diferir (`recheck`, por defecto las de recheck_rows) se
+    vuelven a evaluar con `re`; si RE2 no soporta el patrón (backreferences,
+    lookaround) se usa `re` en todas.
+    """
+    re.compile(pattern)  # un patrón inválido para `re` falla igual que antes
+    if native_regex_ok(pattern):
+        try:
+            match = text.str.match(pattern).fillna(False).astype(bool)
+        except Exception:
+            match = None
+        if match is not None:
+            if recheck is None:
+                recheck = recheck_rows(text)
+            if recheck.any():
+                match[recheck] = match_with_re(text[recheck].astype(object), pattern)
+            return match
+    return pd.Series(match_with_re(text.astype(object), pattern), index=text.index)
+
 
 def make_synthetic_data() -> pd.DataFrame:
     """Crea un DataFrame sintético con algunos errores a propósito."""
@@ -14,91 +106,457 @@ def make_synthetic_data() -> pd.DataFrame:
     )
 
 
-def run_quality_checks(df: pd.DataFrame, rules: list[dict]) -> dict:
+BACKENDS = ("pandas", "polars")
+RULE_TYPES = ("not_null", "unique", "in_range", "regex", "in_set")
+
+
+def run_quality_checks(df, rules: list[dict], backend: str = "pandas", max_workers: int | None = None) -> dict:
     """
     Mini DSL: cada regla es un dict con:
       - type: "not_null" | "unique" | "in_range" | "regex" | "in_set"
       - column: nombre de columna
       - params extra según el type
+
+    backend="pandas" agrupa las reglas por columna: cada columna se convierte
+    una sola vez (to_numeric, texto) para todas sus reglas y las columnas se
+    evalúan en paralelo en hasta `max_workers` hilos (por defecto, uno por CPU;
+    1 = secuencial).
+    backend="polars" compila todas las reglas a una sola consulta lazy de Polars
+    y las evalúa en una pasada multihilo; acepta un DataFrame de pandas (los
+    índices fallidos son sus etiquetas) o uno de Polars (posiciones de fila).
+    Los resultados son los mismos que con pandas: las reglas sobre tipos o
+    valores que Polars compara distinto (o si la consulta falla) se evalúan
+    con pandas, y las filas de texto que Polars no interpreta igual (números
+    con espacios o exponente, caracteres de RE_RECHECK_CHARS) se revisan con
+    pandas.
+    El reporte tiene la misma forma con ambos backends; cada resultado trae en
+    "seconds" lo que tardó la regla (None con las reglas que evalúa Polars,
+    donde se evalúan juntas, y en los errores). Una conversión compartida se le cuenta a la primera
+    regla de la columna que la usa.
     """
-    results = []
-    for rule in rules:
-        rtype = rule["type"]
-        col = rule["column"]
+    if backend == "polars":
+        return _run_quality_checks_polars(df, rules)
+    if backend != "pandas":
+        raise ValueError(f"Backend desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+    return _run_quality_checks_pandas(df, rules, max_workers)
 
+
+def _rule_result(rule: dict, failed_idx: FailureIndex, seconds: float | None = None) -> dict:
+    return {
+        "rule": rule,
+        "passed": len(failed_idx) == 0,
+        "failed_rows": len(failed_idx),
+        "failed_idx": failed_idx,
+        "message": "OK" if len(failed_idx) == 0 else f"Fallan {len(failed_idx)} fila(s)",
+        "seconds": seconds,
+    }
+
+
+def _error_result(rule: dict, all_idx: FailureIndex, message: str) -> dict:
+    return {"rule": rule, "passed": False, "failed_rows": len(all_idx), "failed_idx": all_idx, "message": message,
+            "seconds": None}
+
+
+def _fail_index(fail: pd.Series, index: pd.Index) -> FailureIndex:
+    """Máscara de fallas (nulos = no falla) a FailureIndex sobre las etiquetas de `index`."""
+    return FailureIndex.from_mask(fail.to_numpy(dtype=bool, na_value=False), index)
+
+
+def _build_report(results: list[dict]) -> dict:
+    summary = {
+        "total_rules": len(results),
+        "passed": sum(1 for r in results if r["passed"]),
+        "failed": sum(1 for r in results if not r["passed"]),
+    }
+    return {"summary": summary, "results": results}
+
+
+def _plan_rules(df: pd.DataFrame, rules: list[dict]) -> tuple[dict[str, list[int]], dict[int, str]]:
+    """
+    Agrupa las reglas por columna, en el orden en que aparecen, para evaluar
+    cada grupo de una vez. Devuelve ({columna: [posiciones de sus reglas]},
+    {posición: mensaje de error}) con las reglas que no se pueden evaluar.
+    """
+    groups: dict[str, list[int]] = {}
+    errors: dict[int, str] = {}
+    for i, rule in enumerate(rules):
+        col = rule["column"]
         if col not in df.columns:
-            results.append(
-                {"rule": rule, "passed": False, "failed_rows": len(df), "failed_idx": df.index.tolist(),
-                 "message": f"Column '{col}' no existe"}
-            )
-            continue
+            errors[i] = f"Column '{col}' no existe"
+        elif rule["type"] not in RULE_TYPES:
+            errors[i] = f"Rule type '{rule['type']}' no soportada"
+        else:
+            groups.setdefault(col, []).append(i)
+    return groups, errors
+
+
+class _ColumnCache:
+    """
+    Conversiones de una columna compartidas por todas sus reglas, calculadas
+    al primer uso: `pd.to_numeric` para in_range, el texto para regex y la
+    máscara de cada regla distinta (reglas repetidas no se recalculan).
+    """
+
+    __slots__ = ("s", "_numeric", "_text", "_recheck", "_masks")
+
+    def __init__(self, s: pd.Series):
+        self.s = s
+        self._numeric = None
+        self._text = None
+        self._recheck = None
+        self._masks: dict[str, pd.Series] = {}
+
+    def numeric(self) -> pd.Series:
+        if self._numeric is None:
+            self._numeric = pd.to_numeric(self.s, errors="coerce")  # no numérico => NaN
+        return self._numeric
+
+    def text(self) -> pd.Series:
+        if self._text is None:
+            self._text = as_string_series(self.s)  # None => "" para que falle
+        return self._text
+
+    def recheck(self) -> pd.Series:
+        """Filas que regex_match debe revisar con `re` (ver RE_RECHECK_CHARS)."""
+        if self._recheck is None:
+            self._recheck = recheck_rows(self.text())
+        return self._recheck
 
-        s = df[col]
+    def fail_mask(self, rule: dict) -> pd.Series:
+        key = repr(sorted(rule.items()))
+        if key not in self._masks:
+            self._masks[key] = self._compute_fail_mask(rule)
+        return self._masks[key]
+
+    def _compute_fail_mask(self, rule: dict) -> pd.Series:
+        rtype = rule["type"]
+        s = self.s
 
         if rtype == "not_null":
-            fail = s.isna()
+            return s.isna()
 
-        elif rtype == "unique":
+        if rtype == "unique":
             # ignora NaN al evaluar duplicados
             non_null = s.dropna()
             dup_vals = non_null[non_null.duplicated(keep=False)]
-            fail = s.isin(dup_vals)
-
-        elif rtype == "in_range":
-            min_v = rule.get("min")
-            max_v = rule.get("max")
-            num = pd.to_numeric(s, errors="coerce")  # no numérico => NaN
-            fail = num.isna()
-            if min_v is not None:
-                fail |= num < min_v
-            if max_v is not None:
-                fail |= num > max_v
-
-        elif rtype == "regex":
+            return s.isin(dup_vals)
+
+        if rtype == "in_range":
+            num = self.numeric()
+            return _apply_bounds(num.isna(), num, rule)
+
+        if rtype == "regex":
             pattern = rule["pattern"]
-            rx = re.compile(pattern)
-            # None => "" para que falle
-            fail = ~s.fillna("").astype(str).apply(lambda x: bool(rx.match(x)))
+            return ~regex_match(self.text(), pattern, self.recheck() if native_regex_ok(pattern) else None)
 
-        elif rtype == "in_set":
-            allowed = set(rule["allowed"])
-            fail = ~s.isin(allowed)
+        # in_set
+        return ~s.isin(set(rule["allowed"]))
 
-        else:
-            results.append(
-                {"rule": rule, "passed": False, "failed_rows": len(df), "failed_idx": df.index.tolist(),
-                 "message": f"Rule type '{rtype}' no soportada"}
-            )
+
+def _apply_bounds(fail, num, rule: dict):
+    """Agrega a `fail` los valores fuera de [min, max] de la regla (Series de pandas o expresión de Polars)."""
+    if rule.get("min") is not None:
+        fail = fail | (num < rule["min"])
+    if rule.get("max") is not None:
+        fail = fail | (num > rule["max"])
+    return fail
+
+
+def _evaluate_column(s: pd.Series, rules: list[dict]) -> list[tuple[pd.Series, float]]:
+    """(máscara de fallas, segundos) de cada regla sobre la columna `s`, en orden."""
+    cache = _ColumnCache(s)
+    out = []
+    for rule in rules:
+        start = time.perf_counter()
+        fail = cache.fail_mask(rule)
+        out.append((fail, time.perf_counter() - start))
+    return out
+
+
+def _run_quality_checks_pandas(df: pd.DataFrame, rules: list[dict], max_workers: int | None = None) -> dict:
+    groups, errors = _plan_rules(df, rules)
+
+    def run_group(col: str, positions: list[int]) -> list[tuple[int, dict]]:
+        evaluated = _evaluate_column(df[col], [rules[i] for i in positions])
+        group_results = []
+        for i, (fail, seconds) in zip(positions, evaluated):
+            start = time.perf_counter()
+            failed_idx = _fail_index(fail, df.index)
+            group_results.append((i, _rule_result(rules[i], failed_idx, seconds + time.perf_counter() - start)))
+        return group_results
+
+    # Cada columna en un hilo: NumPy, Arrow y RE2 sueltan el GIL en las operaciones pesadas
+    workers = max_workers or min(len(groups), os.cpu_count() or 1)
+    if workers > 1 and len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as executor:
+            group_results = list(executor.map(lambda item: run_group(*item), groups.items()))
+    else:
+        group_results = [run_group(col, positions) for col, positions in groups.items()]
+
+    by_position = {i: result for results in group_results for i, result in results}
+    for i, message in errors.items():
+        by_position[i] = _error_result(rules[i], FailureIndex.all(len(df), df.index), message)
+
+    return _build_report([by_position[i] for i in range(len(rules))])
+
+
+# Texto que Polars convierte a float igual que pd.to_numeric: números cortos sin
+# exponente ni espacios (el valor es exacto); el resto del texto lo convierte pandas
+_PLAIN_NUMBER = r"^[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)$"
+_PLAIN_NUMBER_MAX_CHARS = 15
+
+
+def _polars_in_set_values(pl, allowed, dtype):
+    """`allowed` como Series de Polars del tipo de la columna; None si pandas compararía distinto."""
+    values = list(allowed)
+    if any(v is None or (isinstance(v, float) and v != v) for v in values):
+        return None
+    if dtype == pl.String:
+        ok = all(isinstance(v, str) for v in values)
+    elif dtype == pl.Boolean:
+        ok = all(isinstance(v, bool) for v in values)
+    elif dtype.is_numeric():
+        ok = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+        if ok and dtype.is_integer():
+            # 2.0 está en una columna entera, 2.5 nunca
+            values = [int(v) for v in values if isinstance(v, int) or v.is_integer()]
+        elif ok and dtype.is_float():
+            values = [float(v) for v in values]
+    else:
+        ok = False
+    if not ok:
+        return None
+    try:
+        return pl.Series(values, dtype=dtype, strict=True)
+    except Exception:
+        return None
+
+
+def _polars_text_recheck(pl, s) -> np.ndarray:
+    """Filas de la columna de texto `s` (Series de Polars) con caracteres de RE_RECHECK_CHARS."""
+    try:
+        arr = s.to_arrow()
+        if _printable_ascii(arr.chunks if hasattr(arr, "chunks") else [arr]):
+            return np.zeros(len(s), dtype=bool)
+    except Exception:
+        pass
+    return s.str.contains(RE_RECHECK_CHARS).fill_null(False).to_numpy()
+
+
+def _polars_fail_expr(pl, rule: dict, dtype):
+    """
+    (expresión, filas a revisar) de Polars para la regla: la expresión es True
+    en las filas que fallan y "filas a revisar" (o None) marca las filas que
+    Polars no resuelve igual que pandas, que se evalúan con pandas: es otra
+    expresión (se calcula en la misma consulta) o una función que recibe la
+    columna (Series de Polars) y se llama después. Devuelve None si la
+    regla se evalúa entera con pandas (tipos de columna o valores que Polars
+    compara distinto).
+    """
+    rtype = rule["type"]
+    col = pl.col(rule["column"])
+    is_float = dtype in (pl.Float32, pl.Float64)
+
+    def missing(expr, floating):
+        # pandas trata NaN como nulo; en Polars son distintos
+        return expr.is_null() | expr.is_nan() if floating else expr.is_null()
+
+    if rtype == "not_null":
+        return missing(col, is_float), None
+
+    if rtype == "unique":
+        if not (dtype.is_numeric() or dtype in (pl.String, pl.Boolean)):
+            return None
+        # ignora nulos al evaluar duplicados
+        return col.is_duplicated() & ~missing(col, is_float), None
+
+    if rtype == "in_range":
+        if dtype.is_numeric() or dtype == pl.Boolean:
+            num = col.cast(pl.Float64)
+            return _apply_bounds(missing(num, True), num, rule).fill_null(True), None
+        if dtype == pl.String:
+            # Un número corto y sin exponente tiene solo ASCII: bytes = caracteres
+            plain = col.str.contains(_PLAIN_NUMBER) & (col.str.len_bytes() <= _PLAIN_NUMBER_MAX_CHARS)
+            num = pl.when(plain).then(col.cast(pl.Float64, strict=False))
+            # Sin dígitos ni "inf" pandas tampoco obtiene un número: fallan sin revisar
+            recheck = ~plain.fill_null(False) & col.str.contains(r"[0-9]|(?i)inf").fill_null(False)
+            return _apply_bounds(missing(num, True), num, rule).fill_null(True), recheck
+        return None
+
+    if rtype == "regex":
+        pattern = rule["pattern"]
+        # Como texto, solo String y enteros se ven igual que con astype(str) de pandas
+        if not (dtype == pl.String or dtype.is_integer()) or not native_regex_ok(pattern):
+            return None
+        try:
+            pl.Series([""]).str.contains(pattern)  # el motor de Polars no soporta todo lo de `re`
+        except Exception:
+            return None
+        # Como re.match: la coincidencia debe empezar al inicio; nulos => "" para que falle
+        text = col.cast(pl.String).fill_null("")
+        # Los enteros como texto son ASCII: no hay filas que revisar
+        recheck = None if dtype.is_integer() else (lambda s: _polars_text_recheck(pl, s))
+        return ~text.str.contains(f"^(?:{pattern})"), recheck
+
+    if rtype == "in_set":
+        values = _polars_in_set_values(pl, rule["allowed"], dtype)
+        if values is None:
+            return None
+        return ~col.is_in(values.implode()).fill_null(False), None
+
+    return None
+
+
+def _polars_frame(pl, df: pd.DataFrame, columns: list[str]):
+    """
+    Las columnas de `df` como DataFrame de Polars. Si alguna no se puede
+    convertir (object con tipos mezclados) queda afuera y sus reglas se
+    evalúan con pandas.
+    """
+    try:
+        return pl.from_pandas(df[columns], include_index=False, nan_to_null=True)
+    except Exception:
+        pass
+    frames = []
+    for col in columns:
+        try:
+            frames.append(pl.from_pandas(df[[col]], include_index=False, nan_to_null=True))
+        except Exception:
             continue
+    return pl.concat(frames, how="horizontal") if frames else pl.DataFrame()
 
-        failed_idx = df.index[fail].tolist()
-        results.append(
-            {
-                "rule": rule,
-                "passed": len(failed_idx) == 0,
-                "failed_rows": len(failed_idx),
-                "failed_idx": failed_idx,
-                "message": "OK" if len(failed_idx) == 0 else f"Fallan {len(failed_idx)} fila(s)",
-            }
-        )
 
-    summary = {
-        "total_rules": len(results),
-        "passed": sum(1 for r in results if r["passed"]),
-        "failed": sum(1 for r in results if not r["passed"]),
-    }
-    return {"summary": summary, "results": results}
+def _run_quality_checks_polars(df, rules: list[dict]) -> dict:
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("El backend 'polars' requiere instalar polars (pip install polars)") from e
 
+    if isinstance(df, pd.DataFrame):
+        columns = set(df.columns)
+        used = [c for c in dict.fromkeys(r["column"] for r in rules) if c in columns]
+        frame = _polars_frame(pl, df, used)
+        index = df.index
+        height = len(df)
+    else:
+        columns = set(df.columns)
+        frame = df
+        index = None
+        height = frame.height
 
-def print_report(report: dict) -> None:
+    schema = frame.schema
+    all_idx = FailureIndex.all(height, index)
+
+    def pandas_column(col: str, positions=None) -> pd.Series:
+        if isinstance(df, pd.DataFrame):
+            s = df[col]
+            return s if positions is None else s.iloc[positions]
+        s = frame[col] if positions is None else frame[col].gather(positions)
+        return s.to_pandas()
+
+    # Una expresión por regla distinta: reglas repetidas comparten la columna de resultado.
+    # Las reglas que Polars no evalúa como pandas van enteras a pandas (`fallback`)
+    exprs = {}
+    rechecks = {}
+    rule_plan = []
+    fallback = []
+    for i, rule in enumerate(rules):
+        col = rule["column"]
+        if col not in columns:
+            rule_plan.append((None, None, f"Column '{col}' no existe"))
+            continue
+        if rule["type"] not in RULE_TYPES:
+            rule_plan.append((None, None, f"Rule type '{rule['type']}' no soportada"))
+            continue
+
+        planned = _polars_fail_expr(pl, rule, schema[col]) if col in schema else None
+        if planned is None:
+            fallback.append(i)
+            rule_plan.append((None, None, None))
+            continue
+
+        expr, recheck = planned
+        key = repr(sorted(rule.items()))
+        alias = exprs.setdefault(key, (f"__rule_{len(exprs)}", expr))[0]
+        recheck_key = None
+        if recheck is not None:
+            # Las filas a revisar dependen solo de la columna y el tipo de regla
+            recheck_key = (col, rule["type"])
+            rechecks.setdefault(recheck_key, (f"__recheck_{len(rechecks)}", recheck))
+        rule_plan.append((alias, recheck_key, None))
+
+    # Todas las reglas (y las filas a revisar que son expresiones) en un solo
+    # select: una pasada sobre los datos, en paralelo
+    masks = {}
+    if exprs:
+        selected = [expr.alias(alias) for alias, expr in exprs.values()]
+        selected += [recheck.alias(alias) for alias, recheck in rechecks.values() if isinstance(recheck, pl.Expr)]
+        try:
+            out = frame.lazy().select(selected).collect()
+            masks = {alias: out[alias].fill_null(False).to_numpy() for alias in out.columns}
+        except Exception as e:
+            print(f"[WARNING] Polars no pudo evaluar las reglas, se evalúan con pandas: {e}")
+            fallback = [i for i, (_, _, error) in enumerate(rule_plan) if error is None]
+            rule_plan = [(None, None, error) for _, _, error in rule_plan]
+
+    pandas_results = {}
+    if fallback:
+        frame_cols = list(dict.fromkeys(rules[i]["column"] for i in fallback))
+        pdf = df if isinstance(df, pd.DataFrame) else pd.DataFrame({c: pandas_column(c) for c in frame_cols})
+        report = _run_quality_checks_pandas(pdf, [rules[i] for i in fallback])
+        pandas_results = dict(zip(fallback, report["results"]))
+
+    recheck_rows_by_key = {}
+    fixed = {}
+    results = []
+    for i, (rule, (alias, recheck_key, error)) in enumerate(zip(rules, rule_plan)):
+        if error is not None:
+            results.append(_error_result(rule, all_idx, error))
+        elif i in pandas_results:
+            results.append(pandas_results[i])
+        else:
+            if alias not in fixed:
+                mask = masks[alias]
+                if recheck_key is not None:
+                    # Filas que Polars no resuelve como pandas: se evalúan con pandas
+                    if recheck_key not in recheck_rows_by_key:
+                        recheck_alias, recheck = rechecks[recheck_key]
+                        if isinstance(recheck, pl.Expr):
+                            rows = masks[recheck_alias]
+                        else:
+                            rows = recheck(frame[recheck_key[0]])
+                        recheck_rows_by_key[recheck_key] = np.flatnonzero(rows)
+                    positions = recheck_rows_by_key[recheck_key]
+                    if len(positions):
+                        mask = mask.copy()
+                        sub = pandas_column(rule["column"], positions)
+                        mask[positions] = _ColumnCache(sub).fail_mask(rule).to_numpy(dtype=bool, na_value=False)
+                fixed[alias] = FailureIndex.from_mask(mask, index)
+            results.append(_rule_result(rule, fixed[alias]))
+
+    return _build_report(results)
+
+
+def print_report(report: dict, sample_size: int = 10) -> None:
+    """Imprime el reporte con una muestra de hasta `sample_size` índices fallidos y el tiempo de cada regla."""
     print("\n=== DATA QUALITY REPORT ===")
     print(report["summary"])
     for r in report["results"]:
         status = "✅ PASS" if r["passed"] else "❌ FAIL"
-        print(f"{status} | {r['rule']} | {r['message']} | idx={r['failed_idx']}")
+        failed_idx = r["failed_idx"]
+        more = f" (+{len(failed_idx) - sample_size} más)" if len(failed_idx) > sample_size else ""
+        elapsed = f" | {r['seconds'] * 1000:.1f} ms" if r.get("seconds") is not None else ""
+        print(f"{status} | {r['rule']} | {r['message']} | idx={failed_idx.sample(sample_size)}{more}{elapsed}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Mini DSL de calidad de datos.")
+    parser.add_argument("--backend", choices=BACKENDS, default="pandas",
+                        help="motor de evaluación de las reglas (por defecto: pandas)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="hilos para evaluar columnas en paralelo con pandas (por defecto: uno por CPU; 1 = secuencial)")
+    args = parser.parse_args()
+
     df = make_synthetic_data()
     print("=== DATASET ===")
     print(df)
@@ -112,14 +570,14 @@ def main():
         {"type": "unique", "column": "user_id"},
     ]
 
-    report = run_quality_checks(df, rules)
+    report = run_quality_checks(df, rules, backend=args.backend, max_workers=args.workers)
     print_report(report)
 
     # BONUS: muestra filas problemáticas (uniendo todos los índices fallidos)
-    bad_idx = sorted({i for r in report["results"] for i in r["failed_idx"]})
+    bad_idx = FailureIndex.union_all(r["failed_idx"] for r in report["results"])
     if bad_idx:
         print("\n=== Filas con al menos 1 falla ===")
-        print(df.loc[bad_idx])
+        print(df.iloc[bad_idx.positions()])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+data_quality_stream.py
+
+Valida archivos CSV o Parquet más grandes que la RAM con las mismas reglas
+del mini DSL de data_quality_dsl_simple.py, leyéndolos por bloques.
+
+Las reglas sin estado (not_null, in_range, regex, in_set) se evalúan bloque
+a bloque con el mismo código del DSL. `unique` necesita ver todo el archivo:
+los valores de su columna se reparten por un hash de 64 bits en particiones
+en archivos temporales ("spill") y después cada partición se confirma por
+separado con `duplicated(keep=False)`, así la memoria queda acotada por el
+tamaño de una partición y no por el del archivo.
+
+Con `unique_mode="bloom"` la primera pasada solo pasa los hashes por un
+filtro de Bloom de tamaño fijo; los que ya podrían haberse visto (candidatos,
+también a disco) son los únicos valores que una segunda pasada reparte en
+particiones para confirmar.
+
+Los índices fallidos son números de fila globales del archivo (desde 0) y
+se acumulan por bloque como tramos de FailureIndex, no como listas de Python.
+"""
+
+import argparse
+import json
+import math
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from data_quality_dsl_simple import _build_report, _error_result, _rule_result, _run_quality_checks_pandas, print_report
+from failure_index import FailureIndex
+
+CHUNK_ROWS = 1_000_000
+SPILL_PARTITIONS = 64
+SPILL_PARTITION_BYTES = 256 * 1024 * 1024
+UNIQUE_MODES = ("spill", "bloom")
+STATELESS_RULES = ("not_null", "in_range", "regex", "in_set")
+
+
+def read_columns(path: str) -> list[str]:
+    """Columnas del archivo sin leer los datos."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_chunks(path: str, columns: list[str], chunk_size: int = CHUNK_ROWS, as_text: bool = False,
+                dtypes: dict[str, str] | None = None):
+    """
+    Itera el archivo en DataFrames de hasta `chunk_size` filas con índice global de fila.
+    Con `as_text` un CSV se lee sin inferir tipos (todo como texto, nulos aparte);
+    con `dtypes` cada columna se lee con el tipo dado (ver _file_dtype).
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+        return
+
+    if dtypes:
+        # "object" es booleano con nulos: read_csv no tiene ese tipo, se lee como texto y se convierte
+        read_dtypes = {col: str if dtype == "object" else dtype for col, dtype in dtypes.items()}
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_size, dtype=read_dtypes):
+            for col, dtype in dtypes.items():
+                if dtype == "object":
+                    chunk[col] = chunk[col].str.lower().map(_CSV_BOOLS)
+            yield chunk
+        return
+
+    # read_csv por bloques ya numera las filas de forma continua entre bloques
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size, dtype=str if as_text else None)
+
+
+# Tipo de cada "clase" de bloque que infiere read_csv (una columna toda nula no tiene tipo propio)
+_KIND_DTYPES = {"int": "int64", "float": "float64", "bool": "bool", "boolnull": "object", "text": "str"}
+_CSV_BOOLS = {"true": True, "false": False}
+
+
+def _chunk_kind(s: pd.Series) -> str:
+    """Clase del tipo que read_csv infirió para la columna en un bloque."""
+    if s.isna().all():
+        return "null"
+    if pd.api.types.is_bool_dtype(s):
+        return "bool"
+    if pd.api.types.is_integer_dtype(s):
+        return "int"
+    if pd.api.types.is_float_dtype(s):
+        return "float"
+    if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) == "boolean":
+        return "boolnull"
+    return "text"
+
+
+def _file_dtype(kinds: set[str]) -> str | None:
+    """
+    Tipo que read_csv habría inferido leyendo el archivo entero, a partir de
+    las clases de sus bloques: enteros con nulos pasan a float64, booleanos
+    con nulos a object y cualquier mezcla con texto (o de booleanos con
+    números) queda como texto. None si la columna es toda nula.
+    """
+    has_null = "null" in kinds
+    kinds = kinds - {"null"}
+    if not kinds:
+        return None
+    if kinds == {"int"}:
+        return "float64" if has_null else "int64"
+    if kinds <= {"int", "float"}:
+        return "float64"
+    if kinds == {"bool"}:
+        return "object" if has_null else "bool"
+    if kinds <= {"bool", "boolnull"}:
+        return "object"
+    return "str"
+
+
+def iter_rule_chunks(path: str, stateless_columns: list[str], unique_columns: list[str],
+                     chunk_size: int = CHUNK_ROWS):
+    """
+    Pares (bloque para las reglas sin estado, bloque para `unique`) del mismo
+    rango de filas. En un CSV las columnas de `unique` se leen aparte y como
+    texto (ver _UniqueValues); en Parquet los tipos ya son fijos y basta un
+    solo bloque para ambas.
+    """
+    if path.endswith(".parquet") or not unique_columns:
+        # Al menos una columna, para contar las filas aunque ninguna regla aplique
+        columns = sorted(set(stateless_columns) | set(unique_columns)) or read_columns(path)[:1]
+        for chunk in iter_chunks(path, columns, chunk_size):
+            yield chunk, chunk
+        return
+    unique_chunks = iter_chunks(path, unique_columns, chunk_size, as_text=True)
+    if not stateless_columns:
+        for chunk in unique_chunks:
+            yield chunk, chunk
+        return
+    yield from zip(iter_chunks(path, stateless_columns, chunk_size), unique_chunks)
+
+
+def hash_values(s: pd.Series) -> np.ndarray:
+    """
+    Hash de 64 bits de cada valor. Los números se pasan a float64 para que 5 y
+    5.0 (un bloque con nulos se lee como float) tengan el mismo hash.
+    """
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return pd.util.hash_array(s.to_numpy(dtype="float64"))
+    return pd.util.hash_array(s.astype(object).to_numpy())
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom por bloques sobre hashes de 64 bits: los k bits de cada
+    valor caen en una misma palabra de 64 bits, así insertar y consultar es un
+    solo acceso a memoria por valor y se vectoriza con NumPy. Por concentrar
+    los bits en un bloque tiene más falsos positivos que uno clásico del mismo
+    tamaño, por eso se dimensiona para la cuarta parte de `error_rate`.
+    """
+
+    MAX_HASHES = 10  # 10 posiciones de 6 bits salen de un mismo hash de 64 bits
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        bits = -capacity * math.log(error_rate / 4) / math.log(2) ** 2
+        self.words = np.zeros(max(1, math.ceil(bits / 64)), dtype=np.uint64)
+        self.hashes = min(self.MAX_HASHES, max(1, round(bits / capacity * math.log(2))))
+
+    def _locate(self, hashes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        word = ((hashes >> np.uint64(32)) % np.uint64(len(self.words))).astype(np.intp)
+        # Las posiciones dentro de la palabra salen de otra mezcla del hash
+        mixed = hashes * np.uint64(0x9E3779B97F4A7C15)
+        mask = np.zeros(len(hashes), dtype=np.uint64)
+        for i in range(self.hashes):
+            mask |= np.uint64(1) << ((mixed >> np.uint64(6 * i)) & np.uint64(63))
+        return word, mask
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Agrega los hashes y devuelve cuáles ya podían estar (antes de este llamado)."""
+        word, mask = self._locate(hashes)
+        present = (self.words[word] & mask) == mask
+        np.bitwise_or.at(self.words, word, mask)
+        return present
+
+
+def _partition_order(hashes: np.ndarray, partitions: int) -> tuple[np.ndarray, np.ndarray]:
+    """Orden que agrupa los hashes por partición y límites de cada partición en ese orden."""
+    part = (hashes % np.uint64(partitions)).astype(np.intp)
+    order = np.argsort(part, kind="stable")
+    return order, np.searchsorted(part[order], np.arange(partitions + 1))
+
+
+class _Spill:
+    """Directorio temporal con un archivo por partición; se abren solo al escribir."""
+
+    def __init__(self, partitions: int, spill_dir: str | None = None):
+        self.partitions = partitions
+        self._dir = tempfile.TemporaryDirectory(prefix="dq_spill_", dir=spill_dir)
+
+    def path(self, i: int) -> str:
+        return os.path.join(self._dir.name, f"p{i}.bin")
+
+    def cleanup(self) -> None:
+        self._dir.cleanup()
+
+
+def csv_numbers(s: pd.Series) -> tuple[pd.Series, np.ndarray]:
+    """
+    Número de cada texto de `s` (NaN si no lo es) y cuáles son decimales (no
+    enteros). Solo pasa por to_numeric lo que puede ser un número (empieza
+    con un dígito, un punto o "inf"); los enteros que no caben en 64 bits
+    read_csv los deja como texto, así que aquí también quedan en NaN.
+    """
+    integer = s.str.fullmatch(r"\s*[+-]?\d+\s*").to_numpy(dtype=bool)
+    if len(s) and integer.all() and s.str.len().max() <= 18:
+        return s.astype("int64"), np.zeros(len(s), dtype=bool)
+    maybe = s.str.match(r"\s*[+-]?(\d|\.\d|inf)", case=False).to_numpy(dtype=bool)
+    numbers = pd.Series(np.nan, index=s.index)
+    if maybe.any():
+        numbers[maybe] = pd.to_numeric(s[maybe], errors="coerce")
+    long_int = integer & (s.str.len().to_numpy() > 18)
+    if long_int.any():
+        overflow = [not -2 ** 63 <= int(v) < 2 ** 64 for v in s[long_int]]
+        numbers.iloc[np.flatnonzero(long_int)[overflow]] = np.nan
+    return numbers, numbers.notna().to_numpy() & ~integer
+
+
+class _UniqueValues:
+    """
+    Valores no nulos de una columna `unique`, repartidos por hash en
+    particiones en disco; `duplicated_positions` confirma cada partición por
+    separado, así en memoria hay una sola partición a la vez.
+
+    Con `as_text` (CSV) la columna llega como texto: cada bloque inferiría su
+    propio tipo y el 5 de un bloque de enteros no se compararía con el "5" de
+    un bloque que también tiene "abc". Leyendo el archivo entero, read_csv la
+    toma como número si todos sus valores lo son (5, 05 y 5.0 iguales), como
+    booleana si todos son true/false sin importar mayúsculas, y si no la deja
+    como el texto tal cual; aquí se decide igual, al final, con lo que se vio
+    en todos los bloques. Para no depender de esa decisión al repartir, el
+    hash de partición es el del número si el texto lo es, el de true/false en
+    minúsculas si es booleano y el del texto si no: los valores iguales con
+    cualquiera de los tres criterios caen en la misma partición.
+    """
+
+    def __init__(self, as_text: bool, partitions: int = SPILL_PARTITIONS, spill_dir: str | None = None):
+        self.as_text = as_text
+        # Con `as_text`: si todos los valores vistos son números / true-false, y si hubo decimales
+        self.numeric = True
+        self.boolean = True
+        self.floats = False
+        self._spill = _Spill(partitions, spill_dir)
+
+    def keys(self, s: pd.Series) -> tuple[pd.Series, pd.Series | None, np.ndarray]:
+        """Valores no nulos, sus números (solo con `as_text`) y el hash de partición de cada uno."""
+        s = s.dropna()
+        if not self.as_text:
+            return s, None, hash_values(s)
+        numbers, decimal = csv_numbers(s)
+        parsed = numbers.notna().to_numpy()
+        boolean = s.str.fullmatch(r"true|false", case=False).to_numpy(dtype=bool)
+        self.numeric = self.numeric and bool(parsed.all())
+        self.boolean = self.boolean and bool(boolean.all())
+        self.floats = self.floats or bool(decimal.any())
+        text = ~(parsed | boolean)
+        hashes = np.empty(len(s), dtype=np.uint64)
+        if parsed.any():
+            hashes[parsed] = hash_values(numbers[parsed])
+        if boolean.any():
+            hashes[boolean] = hash_values(s[boolean].str.lower())
+        if text.any():
+            hashes[text] = hash_values(s[text])
+        return s, numbers, hashes
+
+    def add(self, s: pd.Series, numbers: pd.Series | None, hashes: np.ndarray) -> None:
+        order, bounds = _partition_order(hashes, self._spill.partitions)
+        s = s.take(order)
+        # Los números solo hacen falta mientras la columna pueda ser numérica
+        numbers = numbers.take(order) if numbers is not None and self.numeric else None
+        for i in range(self._spill.partitions):
+            if bounds[i] < bounds[i + 1]:
+                rows = slice(bounds[i], bounds[i + 1])
+                piece = (s.iloc[rows], None if numbers is None else numbers.iloc[rows])
+                with open(self._spill.path(i), "ab") as f:
+                    pickle.dump(piece, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _comparable(self, values: pd.Series, numbers: pd.Series | None) -> pd.Series:
+        if not self.as_text:
+            return values
+        if self.numeric:
+            # Con algún decimal en el archivo, read_csv lee toda la columna como float
+            return numbers.astype("float64") if self.floats else numbers
+        if self.boolean:
+            return values.str.lower()
+        return values
+
+    def duplicated_positions(self) -> np.ndarray:
+        """Filas (ordenadas) cuyo valor aparece más de una vez en el archivo."""
+        found = []
+        for i in range(self._spill.partitions):
+            if not os.path.exists(self._spill.path(i)):
+                continue
+            pieces = []
+            with open(self._spill.path(i), "rb") as f:
+                while True:
+                    try:
+                        pieces.append(self._comparable(*pickle.load(f)))
+                    except EOFError:
+                        break
+            values = pd.concat(pieces)
+            found.append(values.index[values.duplicated(keep=False)].to_numpy(dtype=np.int64))
+            os.remove(self._spill.path(i))
+        self._spill.cleanup()
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+
+class _BloomCandidates:
+    """
+    Hashes que el filtro de Bloom ya podría haber visto. Los aciertos van a
+    particiones en disco y `candidates` los deduplica de a una partición: en
+    memoria queda solo el resultado, 8 bytes por valor candidato distinto.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, partitions: int = SPILL_PARTITIONS,
+                 spill_dir: str | None = None):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._spill = _Spill(partitions, spill_dir)
+
+    def add(self, hashes: np.ndarray) -> None:
+        # Repetidos dentro del mismo bloque: el filtro no los ve porque se consulta antes de insertar
+        repeated = pd.Series(hashes).duplicated().to_numpy()
+        hits = hashes[self.bloom.add(hashes) | repeated]
+        order, bounds = _partition_order(hits, self._spill.partitions)
+        for i in range(self._spill.partitions):
+            if bounds[i] < bounds[i + 1]:
+                with open(self._spill.path(i), "ab") as f:
+                    hits[order[bounds[i]:bounds[i + 1]]].tofile(f)
+
+    def candidates(self) -> np.ndarray:
+        found = []
+        for i in range(self._spill.partitions):
+            if os.path.exists(self._spill.path(i)):
+                found.append(np.unique(np.fromfile(self._spill.path(i), dtype=np.uint64)))
+        self._spill.cleanup()
+        return np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.uint64)
+
+
+def run_quality_checks_file(path: str, rules: list[dict], chunk_size: int = CHUNK_ROWS,
+                            unique_mode: str = "spill", spill_dir: str | None = None,
+                            expected_rows: int | None = None, max_workers: int | None = None) -> dict:
+    """
+    Igual que run_quality_checks, pero leyendo `path` (CSV o Parquet) por
+    bloques de `chunk_size` filas. `expected_rows` dimensiona el filtro de
+    Bloom (por defecto, el número de filas de un Parquet o 10 millones).
+    "seconds" de cada regla suma sus tiempos de todos los bloques (para
+    `unique`, el hash y la confirmación de su columna), sin la lectura.
+
+    En un CSV read_csv infiere el tipo de cada bloque por separado (un bloque
+    de solo números es int64 aunque otro tenga texto); si el de una columna
+    cambia entre bloques, sus reglas se vuelven a evaluar en otra pasada con
+    el tipo de todo el archivo, así el resultado es el mismo que en memoria.
+    """
+    if unique_mode not in UNIQUE_MODES:
+        raise ValueError(f"unique_mode desconocido: {unique_mode}. Opciones: {', '.join(UNIQUE_MODES)}")
+
+    all_columns = read_columns(path)
+    file_columns = set(all_columns)
+    stateless_idx = [i for i, r in enumerate(rules) if r["type"] in STATELESS_RULES and r["column"] in file_columns]
+    stateless = [rules[i] for i in stateless_idx]
+    stateless_columns = sorted({r["column"] for r in stateless})
+    unique_columns = sorted({r["column"] for r in rules if r["type"] == "unique" and r["column"] in file_columns})
+    as_text = not path.endswith(".parquet")
+    # Particiones de unos SPILL_PARTITION_BYTES como mucho (el archivo entero acota lo que ocupa una columna)
+    partitions = max(SPILL_PARTITIONS, math.ceil(os.path.getsize(path) / SPILL_PARTITION_BYTES))
+
+    if unique_mode == "bloom" and expected_rows is None:
+        expected_rows = _parquet_rows(path) if path.endswith(".parquet") else 10_000_000
+
+    # Por regla: tramos (inicios, largos) de filas fallidas de cada bloque, ya en posición global
+    failed: dict[int, list] = {i: [] for i in stateless_idx}
+    seconds = dict.fromkeys(stateless_idx, 0.0)
+    unique_seconds = dict.fromkeys(unique_columns, 0.0)
+    values = {col: _UniqueValues(as_text, partitions, spill_dir) for col in unique_columns}
+    blooms = {}
+    if unique_mode == "bloom":
+        blooms = {col: _BloomCandidates(expected_rows, partitions=partitions, spill_dir=spill_dir)
+                  for col in unique_columns}
+    # CSV: clases de tipo que tuvo cada columna de las reglas sin estado en los bloques
+    kinds = {col: set() for col in stateless_columns} if as_text else {}
+    total_rows = 0
+
+    def check_chunk(chunk, rule_idx, offset):
+        report = _run_quality_checks_pandas(chunk, [rules[i] for i in rule_idx], max_workers)
+        for i, result in zip(rule_idx, report["results"]):
+            starts, lengths = result["failed_idx"].runs()
+            failed[i].append((starts + offset, lengths))
+            seconds[i] += result["seconds"]
+
+    # Pasada 1: reglas sin estado por bloque y, para `unique`, particiones (spill) o filtro de Bloom
+    for chunk, unique_chunk in iter_rule_chunks(path, stateless_columns, unique_columns, chunk_size):
+        offset = total_rows
+        total_rows += len(chunk)
+        if stateless:
+            check_chunk(chunk, stateless_idx, offset)
+        for col, seen in kinds.items():
+            seen.add(_chunk_kind(chunk[col]))
+        for col in unique_columns:
+            start = time.perf_counter()
+            s, numbers, hashes = values[col].keys(unique_chunk[col])
+            if blooms:
+                blooms[col].add(hashes)
+            else:
+                values[col].add(s, numbers, hashes)
+            unique_seconds[col] += time.perf_counter() - start
+
+    # Columnas cuyo tipo cambió entre bloques: sus reglas se repiten con el tipo de todo el archivo
+    retype = {}
+    for col, seen in kinds.items():
+        dtype = _file_dtype(seen)
+        if dtype is not None and any(_KIND_DTYPES[kind] != dtype for kind in seen - {"null"}):
+            retype[col] = dtype
+    if retype:
+        retype_idx = [i for i in stateless_idx if rules[i]["column"] in retype]
+        for i in retype_idx:
+            failed[i], seconds[i] = [], 0.0
+        offset = 0
+        for chunk in iter_chunks(path, sorted(retype), chunk_size, dtypes=retype):
+            check_chunk(chunk, retype_idx, offset)
+            offset += len(chunk)
+
+    # Pasada 2 (solo bloom): repartir en particiones solo los valores candidatos
+    if blooms:
+        candidates = {}
+        for col, bloom in blooms.items():
+            start = time.perf_counter()
+            candidates[col] = bloom.candidates()
+            unique_seconds[col] += time.perf_counter() - start
+        if any(len(c) for c in candidates.values()):
+            for chunk in iter_chunks(path, unique_columns, chunk_size, as_text=as_text):
+                for col, cand in candidates.items():
+                    start = time.perf_counter()
+                    s, numbers, hashes = values[col].keys(chunk[col])
+                    # `cand` viene ordenado: buscar por bisección es más rápido que np.isin
+                    pos = np.minimum(np.searchsorted(cand, hashes), len(cand) - 1)
+                    keep = np.flatnonzero(cand[pos] == hashes)
+                    values[col].add(s.iloc[keep], None if numbers is None else numbers.iloc[keep], hashes[keep])
+                    unique_seconds[col] += time.perf_counter() - start
+
+    duplicated_rows = {}
+    for col in unique_columns:
+        start = time.perf_counter()
+        duplicated_rows[col] = FailureIndex.from_positions(values[col].duplicated_positions(), total_rows)
+        unique_seconds[col] += time.perf_counter() - start
+
+    def merged(parts):
+        if not parts:
+            return FailureIndex.from_positions([], total_rows)
+        starts, lengths = zip(*parts)
+        return FailureIndex.from_runs(np.concatenate(starts), np.concatenate(lengths), total_rows)
+
+    results = []
+    for i, rule in enumerate(rules):
+        col = rule["column"]
+        if col not in file_columns:
+            results.append(_error_result(rule, FailureIndex.all(total_rows), f"Column '{col}' no existe"))
+        elif rule["type"] == "unique":
+            results.append(_rule_result(rule, duplicated_rows[col], unique_seconds[col]))
+        elif i in failed:
+            results.append(_rule_result(rule, merged(failed[i]), seconds[i]))
+        else:
+            results.append(_error_result(rule, FailureIndex.all(total_rows), f"Rule type '{rule['type']}' no soportada"))
+
+    return _build_report(results)
+
+
+def _parquet_rows(path: str) -> int:
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def load_rules(path: str) -> list[dict]:
+    """Reglas desde YAML o JSON: una lista de reglas o {"rules": [...]}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f) if path.endswith(".json") else yaml.safe_load(f)
+    return data.get("rules", []) if isinstance(data, dict) else data or []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida un CSV o Parquet grande por bloques con el mini DSL de calidad.")
+    parser.add_argument("path", help="archivo CSV o Parquet")
+    parser.add_argument("--rules", required=True, help="reglas en YAML o JSON")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS,
+                        help=f"filas por bloque (por defecto: {CHUNK_ROWS})")
+    parser.add_argument("--unique-mode", choices=UNIQUE_MODES, default="spill",
+                        help="cómo detectar duplicados globales (por defecto: spill)")
+    parser.add_argument("--spill-dir", help="directorio para las particiones temporales de `unique`")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="hilos para evaluar columnas en paralelo (por defecto: uno por CPU; 1 = secuencial)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"[ERROR] No existe el archivo: {args.path}")
+        return
+
+    start = time.perf_counter()
+    report = run_quality_checks_file(args.path, load_rules(args.rules), args.chunk_size,
+                                     args.unique_mode, args.spill_dir, max_workers=args.workers)
+    print_report(report)
+    print(f"\n[INFO] Validado en {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
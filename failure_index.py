@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+failure_index.py
+
+Representación compacta de las filas que fallan una regla de calidad
+(data_quality_dsl_simple.py, data_quality_stream.py).
+
+Las filas se guardan como posiciones en arrays de NumPy (int32 si alcanza)
+o, cuando las fallas vienen en tramos contiguos, con run-length encoding
+(inicio y largo de cada tramo): "la columna no existe" sobre 50 millones de
+filas ocupa un solo tramo. Las etiquetas del índice de pandas se calculan
+solo al pedirlas, y la unión de varias reglas se hace con máscaras booleanas
+en vez de conjuntos de Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _position_dtype(total: int):
+    return np.int32 if total <= np.iinfo(np.int32).max else np.int64
+
+
+class FailureIndex:
+    """Filas que fallan, sobre un eje de `total` filas con etiquetas opcionales (un pd.Index)."""
+
+    __slots__ = ("total", "labels", "count", "_positions", "_starts", "_lengths")
+
+    def __init__(self, total: int, labels: pd.Index | None = None, positions=None, starts=None, lengths=None):
+        self.total = total
+        # Sin etiquetas (o con un RangeIndex 0..n-1) la etiqueta es la propia posición
+        if isinstance(labels, pd.RangeIndex) and labels.start == 0 and labels.step == 1:
+            labels = None
+        self.labels = labels
+        self._positions = positions
+        self._starts = starts
+        self._lengths = lengths
+        self.count = int(lengths.sum()) if starts is not None else len(positions)
+
+    # ---------- construcción ----------
+
+    @classmethod
+    def _from_runs_normalized(cls, starts, lengths, total: int, labels) -> "FailureIndex":
+        """Elige la forma más chica: tramos si hay menos de la mitad que filas, si no posiciones."""
+        dtype = _position_dtype(total)
+        count = int(lengths.sum())
+        if 2 * len(starts) < count:
+            return cls(total, labels, starts=starts.astype(dtype), lengths=lengths.astype(dtype))
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        positions = (np.arange(count, dtype=np.int64) + offsets).astype(dtype)
+        return cls(total, labels, positions=positions)
+
+    @classmethod
+    def from_mask(cls, mask, labels: pd.Index | None = None) -> "FailureIndex":
+        """Desde una máscara booleana (True = falla) del largo del eje."""
+        mask = np.asarray(mask, dtype=bool)
+        edges = np.diff(np.concatenate(([False], mask, [False])).view(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        return cls._from_runs_normalized(starts, lengths, len(mask), labels)
+
+    @classmethod
+    def from_runs(cls, starts, lengths, total: int, labels: pd.Index | None = None) -> "FailureIndex":
+        """Desde tramos (inicio, largo) ordenados y sin solaparse; une los que quedan contiguos."""
+        starts = np.asarray(starts, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        keep = lengths > 0
+        starts, lengths = starts[keep], lengths[keep]
+        if len(starts):
+            ends = starts + lengths
+            new_run = np.concatenate(([True], starts[1:] != ends[:-1]))
+            group = np.cumsum(new_run) - 1
+            lengths = np.bincount(group, weights=lengths).astype(np.int64)
+            starts = starts[new_run]
+        return cls._from_runs_normalized(starts, lengths, total, labels)
+
+    @classmethod
+    def from_positions(cls, positions, total: int, labels: pd.Index | None = None) -> "FailureIndex":
+        """Desde posiciones ordenadas y sin repetir."""
+        positions = np.asarray(positions, dtype=np.int64)
+        return cls.from_runs(positions, np.ones(len(positions), dtype=np.int64), total, labels)
+
+    @classmethod
+    def all(cls, total: int, labels: pd.Index | None = None) -> "FailureIndex":
+        """Todas las filas (un solo tramo)."""
+        return cls.from_runs([0], [total], total, labels)
+
+    @classmethod
+    def union_all(cls, indexes) -> "FailureIndex":
+        """Filas que fallan al menos una de las reglas; todas deben ser sobre el mismo eje."""
+        indexes = list(indexes)
+        if not indexes:
+            raise ValueError("union_all necesita al menos un FailureIndex")
+        total, labels = indexes[0].total, indexes[0].labels
+        mask = np.zeros(total, dtype=bool)
+        for index in indexes:
+            if index.total != total:
+                raise ValueError("No se pueden unir FailureIndex de ejes distintos")
+            mask |= index.to_mask()
+        return cls.from_mask(mask, labels)
+
+    # ---------- consulta ----------
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    @property
+    def nbytes(self) -> int:
+        if self._starts is not None:
+            return self._starts.nbytes + self._lengths.nbytes
+        return self._positions.nbytes
+
+    def runs(self) -> tuple[np.ndarray, np.ndarray]:
+        """Tramos (inicios, largos) de las filas que fallan."""
+        if self._starts is not None:
+            return self._starts.astype(np.int64), self._lengths.astype(np.int64)
+        positions = self._positions.astype(np.int64)
+        new_run = np.concatenate(([True], np.diff(positions) != 1)) if len(positions) else np.empty(0, dtype=bool)
+        starts = positions[new_run]
+        bounds = np.concatenate((np.flatnonzero(new_run), [len(positions)]))
+        return starts, np.diff(bounds)
+
+    def positions(self) -> np.ndarray:
+        """Posiciones (0..total-1) de todas las filas que fallan."""
+        if self._positions is not None:
+            return self._positions
+        offsets = np.repeat(self._starts.astype(np.int64) - np.concatenate(([0], np.cumsum(self._lengths)[:-1])),
+                            self._lengths)
+        return np.arange(self.count, dtype=np.int64) + offsets
+
+    def to_mask(self) -> np.ndarray:
+        mask = np.zeros(self.total, dtype=bool)
+        if self._positions is not None:
+            mask[self._positions] = True
+            return mask
+        delta = np.zeros(self.total + 1, dtype=np.int8)
+        delta[self._starts] = 1
+        delta[self._starts + self._lengths] -= 1
+        return np.cumsum(delta[:-1], dtype=np.int8).astype(bool)
+
+    def _labels_for(self, positions: np.ndarray) -> list:
+        if self.labels is None:
+            return positions.tolist()
+        return self.labels[positions].tolist()
+
+    def sample(self, n: int = 10) -> list:
+        """Etiquetas de las primeras `n` filas que fallan, sin materializar el resto."""
+        if self._positions is not None:
+            return self._labels_for(self._positions[:n])
+        taken = []
+        remaining = n
+        for start, length in zip(self._starts, self._lengths):
+            if remaining <= 0:
+                break
+            take = min(int(length), remaining)
+            taken.append(np.arange(start, start + take, dtype=np.int64))
+            remaining -= take
+        return self._labels_for(np.concatenate(taken) if taken else np.empty(0, dtype=np.int64))
+
+    def tolist(self) -> list:
+        """Etiquetas de todas las filas que fallan (como el antiguo `failed_idx`)."""
+        return self._labels_for(self.positions())
+
+    def __iter__(self):
+        block = 65536
+        positions = self.positions()
+        for i in range(0, len(positions), block):
+            yield from self._labels_for(positions[i:i + block])
+
+    def __or__(self, other: "FailureIndex") -> "FailureIndex":
+        return FailureIndex.union_all([self, other])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FailureIndex):
+            return NotImplemented
+        return (self.total == other.total and self.count == other.count
+                and np.array_equal(self.positions(), other.positions())
+                and (self.labels is None) == (other.labels is None)
+                and (self.labels is None or self.labels.equals(other.labels)))
+
+    def __repr__(self):
+        more = f", +{self.count - 10} más" if self.count > 10 else ""
+        return f"FailureIndex(count={self.count}, sample={self.sample(10)}{more})"
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+log_cursor_store.py
+
+Guarda en un archivo JSON local hasta qué byte se leyó cada log remoto
+(host + ruta), junto con el inode del archivo. Permite que
+remote_log_error_summary.py lea solo los bytes nuevos en cada ejecución y
+detecte rotaciones (cambio de inode) o truncados (tamaño menor al offset).
+"""
+
+import json
+import os
+import threading
+
+
+class LogCursorStore:
+    """Cursores {inode, offset} por host y ruta de log, persistidos en JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cursors: dict[str, dict[str, int]] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(host: str, log_path: str) -> str:
+        return f"{host}|{log_path}"
+
+    def _load_locked(self) -> dict[str, dict[str, int]]:
+        if self._cursors is None:
+            self._cursors = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._cursors = json.load(f) or {}
+                except (OSError, ValueError) as e:
+                    print(f"[WARNING] No se pudo leer {self.path}, se parte sin cursores: {e}")
+        return self._cursors
+
+    def get(self, host: str, log_path: str) -> dict[str, int] | None:
+        """Devuelve {"inode": ..., "offset": ...} o None si el log nunca se leyó."""
+        with self._lock:
+            return self._load_locked().get(self._key(host, log_path))
+
+    def set(self, host: str, log_path: str, inode: int, offset: int) -> None:
+        """Registra el byte hasta el que se leyó el log."""
+        with self._lock:
+            self._load_locked()[self._key(host, log_path)] = {"inode": inode, "offset": offset}
+            self._dirty = True
+
+    def save(self) -> None:
+        """Escribe los cursores de forma atómica (archivo temporal + rename)."""
+        with self._lock:
+            if not self._dirty or self._cursors is None:
+                return
+
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._cursors, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[ERROR] No se pudieron guardar los cursores en {self.path}: {e}")
@@ -4,38 +4,123 @@ log_error_summary.py
 
 Lee un archivo llamado app.log, cuenta ocurrencias de niveles
 (ERROR, WARNING, INFO) y genera un archivo CSV con el resumen.
+
+Los niveles son excluyentes y siguen las mismas reglas que
+remote_log_error_summary.summarize_log_content (ver log_levels.py).
+Motores disponibles (--engine):
+  - python: recorre el archivo línea por línea.
+  - mmap:   mapea el archivo en memoria y lo procesa por bloques de líneas
+            completas; con --workers > 1 reparte el archivo en tramos
+            alineados a salto de línea entre varios procesos.
+
+Con --follow queda corriendo como `tail -F` (ver log_follow.py): procesa solo
+lo que se agrega al log, soporta rotaciones de logrotate y reescribe el CSV
+cada --flush-interval segundos.
 """
 
+import argparse
 import csv
+import mmap
 import os
+import signal
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from log_follow import LogFollower
+from log_levels import analyze_log_chunk, new_summary
 
 
 LOG_FILE = "app.log"            # <-- nombre fijo del log
 OUTPUT_FILE = "log_summary.csv" # <-- nombre fijo del output
 
+ENGINES = ("python", "mmap")
+MMAP_BLOCK_SIZE = 16 * 1024 * 1024  # bytes por bloque dentro de cada tramo
 
-def analyze_log_file(log_path: str) -> Counter:
-    if not os.path.exists(log_path):
-        print(f"[ERROR] El archivo {log_path} no existe.")
-        return Counter()
-
-    if os.stat(log_path).st_size == 0:
-        print(f"[WARNING] El archivo {log_path} está vacío.")
-        return Counter()
 
+def _count_lines_python(log_path: str) -> Counter:
     levels = Counter({"ERROR": 0, "WARNING": 0, "INFO": 0})
 
-    with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
+    # En binario: las líneas se cortan solo en "\n" y upper() es ASCII, igual que en log_levels
+    with open(log_path, "rb") as f:
         for line in f:
             upper_line = line.upper()
-            if "ERROR" in upper_line:
+            if b"ERROR" in upper_line:
                 levels["ERROR"] += 1
-            if "WARNING" in upper_line or "WARN" in upper_line:
+            elif b"WARN" in upper_line:
                 levels["WARNING"] += 1
-            if "INFO" in upper_line:
+            elif b"INFO" in upper_line:
                 levels["INFO"] += 1
 
+    return levels
+
+
+def _count_range_mmap(log_path: str, start: int, end: int) -> Counter:
+    """Cuenta niveles entre los bytes [start, end) del archivo, que empiezan y terminan en límite de línea."""
+    summary = new_summary()
+
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            stop = min(pos + MMAP_BLOCK_SIZE, end)
+            if stop < end:
+                # Cortar el bloque en el último salto de línea; si no hay, en el siguiente
+                cut = mm.rfind(b"\n", pos, stop)
+                if cut < 0:
+                    cut = mm.find(b"\n", stop, end)
+                stop = end if cut < 0 else cut + 1
+
+            analyze_log_chunk(mm[pos:stop], summary)
+            pos = stop
+
+    return Counter({level: summary[level] for level in ("ERROR", "WARNING", "INFO")})
+
+
+def _split_ranges(log_path: str, size: int, parts: int) -> list[tuple[int, int]]:
+    """Divide el archivo en `parts` tramos que empiezan justo después de un salto de línea."""
+    bounds = [0]
+
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, parts):
+            cut = mm.find(b"\n", max(bounds[-1], size * k // parts))
+            if cut < 0:
+                break
+            bounds.append(cut + 1)
+
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def _count_lines_mmap(log_path: str, size: int, workers: int) -> Counter:
+    if workers <= 1:
+        return _count_range_mmap(log_path, 0, size)
+
+    ranges = _split_ranges(log_path, size, workers)
+    levels = Counter({"ERROR": 0, "WARNING": 0, "INFO": 0})
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_count_range_mmap, log_path, start, end) for start, end in ranges]
+        for future in futures:
+            levels.update(future.result())
+
+    return levels
+
+
+def analyze_log_file(log_path: str, engine: str = "mmap", workers: int = 1) -> Counter:
+    if not os.path.exists(log_path):
+        print(f"[ERROR] El archivo {log_path} no existe.")
+        return Counter()
+
+    size = os.stat(log_path).st_size
+    if size == 0:
+        print(f"[WARNING] El archivo {log_path} está vacío.")
+        return Counter()
+
+    if engine == "mmap":
+        levels = _count_lines_mmap(log_path, size, workers)
+    else:
+        levels = _count_lines_python(log_path)
+
     if all(count == 0 for count in levels.values()):
         print("[INFO] No se detectaron registros de ERROR, WARNING ni INFO.")
 
@@ -52,6 +137,12 @@ def save_to_csv(counts: Counter, output_path: str) -> None:
         for level, count in counts.items():
             writer.writerow([level, count])
 
+def save_to_csv_atomic(counts: Counter, output_path: str) -> None:
+    """Como save_to_csv, pero quien lea el CSV nunca ve un archivo a medio escribir."""
+    tmp_path = f"{output_path}.tmp"
+    save_to_csv(counts, tmp_path)
+    os.replace(tmp_path, output_path)
+
 def color(text, level):
     if level == "ERROR":
         return f"\033[91m{text}\033[0m"   # rojo
@@ -61,14 +152,59 @@ def color(text, level):
         return f"\033[92m{text}\033[0m"  # verde
     return text
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resume los niveles de app.log en log_summary.csv.")
+    parser.add_argument("--engine", choices=ENGINES, default="mmap",
+                        help="motor de conteo (por defecto: mmap)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos para el motor mmap (por defecto: 1)")
+    parser.add_argument("--follow", action="store_true",
+                        help="seguir el log procesando solo lo nuevo, hasta Ctrl+C")
+    parser.add_argument("--flush-interval", type=float, default=10.0,
+                        help="segundos entre escrituras del CSV en modo --follow (por defecto: 10)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="segundos entre revisiones si no hay inotify (por defecto: 1)")
+    return parser.parse_args()
+
+def follow_log(args) -> None:
+    follower = LogFollower(LOG_FILE, args.poll_interval)
+
+    def on_flush(summary):
+        counts = Counter({level: summary[level] for level in ("ERROR", "WARNING", "INFO")})
+        try:
+            save_to_csv_atomic(counts, OUTPUT_FILE)
+        except OSError as e:
+            print(f"[ERROR] No se pudo escribir {OUTPUT_FILE}: {e}")
+            return
+        print("[INFO] " + ", ".join(f"{level}: {count}" for level, count in counts.items())
+              + f" -> {OUTPUT_FILE}")
+
+    # SIGTERM (systemd, kill) termina igual que Ctrl+C, con un último guardado del CSV
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    print(f"[INFO] Siguiendo {LOG_FILE} (Ctrl+C para salir)")
+    follower.follow(on_flush, args.flush_interval)
+
 def main():
-    print(f"[INFO] Analizando archivo de log: {LOG_FILE}")
-    counts = analyze_log_file(LOG_FILE)
+    args = parse_args()
+
+    if args.follow:
+        follow_log(args)
+        return
+
+    print(f"[INFO] Analizando archivo de log: {LOG_FILE} (motor: {args.engine})")
+    start = time.perf_counter()
+    counts = analyze_log_file(LOG_FILE, args.engine, args.workers)
+    elapsed = time.perf_counter() - start
 
     print("\n=== Resumen de niveles detectados ===")
     for level, count in counts.items():
         print(color(f"{level}: {count}", level))
 
+    if counts:
+        size_mb = os.stat(LOG_FILE).st_size / (1024 * 1024)
+        print(f"\n[INFO] {size_mb:.1f} MB procesados en {elapsed:.2f}s ({size_mb / max(elapsed, 1e-9):.1f} MB/s)")
+
     save_to_csv(counts, OUTPUT_FILE)
     print(f"\n[INFO] Resumen guardado en: {OUTPUT_FILE}")
 
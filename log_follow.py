@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+log_follow.py
+
+Sigue un log local como `tail -F`: mantiene el archivo abierto, procesa solo
+los bytes nuevos y detecta rotaciones de logrotate, tanto por renombre
+(el inode de la ruta cambia) como por copytruncate (el archivo se achica).
+
+En Linux espera cambios con inotify (vía ctypes, sin dependencias extra) y no
+consume CPU mientras el log no cambia; en otros sistemas, o si inotify no está
+disponible, revisa el archivo cada `poll_interval` segundos.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from log_levels import analyze_log_chunk, new_summary
+
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    """Espera eventos de inotify sobre el directorio del log, filtrando por nombre de archivo."""
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+
+        # Se vigila el directorio para ver también el archivo nuevo que deja logrotate
+        directory = os.path.dirname(os.path.abspath(path))
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch falló en {directory}")
+
+        self._name = os.fsencode(os.path.basename(path))
+
+    def wait(self, timeout: float) -> bool:
+        """Bloquea hasta un evento sobre el log o hasta `timeout`; indica si hubo evento."""
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not readable:
+            return False
+
+        relevant = False
+        try:
+            while True:
+                data = os.read(self._fd, 64 * 1024)
+                pos = 0
+                while pos < len(data):
+                    _, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+                    pos += EVENT_HEADER.size
+                    name = data[pos:pos + length].rstrip(b"\0")
+                    pos += length
+                    if name == self._name or mask & IN_Q_OVERFLOW:
+                        relevant = True
+        except BlockingIOError:
+            pass
+        return relevant
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Alternativa sin inotify: duerme hasta el siguiente chequeo."""
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(max(min(timeout, self.poll_interval), 0))
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(path: str, poll_interval: float):
+    """Usa inotify si está disponible; si no, polling."""
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError, TypeError) as e:
+        print(f"[WARNING] inotify no disponible ({e}); se revisará el archivo cada {poll_interval}s.")
+        return PollingWatcher(poll_interval)
+
+
+class LogFollower:
+    """
+    Cuenta niveles (ver log_levels.py) de un log que sigue creciendo.
+
+    Lee desde el inicio del archivo y luego solo lo que se agrega. Las líneas
+    se cuentan cuando están completas (terminan en salto de línea); una línea
+    a medio escribir queda pendiente hasta que llega su final o hasta que el
+    archivo rota.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.summary = new_summary()
+        self._file = None
+        self._inode = None
+        self._offset = 0
+        self._pending = b""
+
+    def _open(self) -> bool:
+        try:
+            self._file = open(self.path, "rb", buffering=0)
+        except FileNotFoundError:
+            return False
+
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._offset = 0
+        self._pending = b""
+        return True
+
+    def _close(self) -> None:
+        if self._pending:
+            # Última línea del archivo rotado sin salto de línea final
+            analyze_log_chunk(self._pending, self.summary)
+            self._pending = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read_new_data(self) -> int:
+        """Procesa todo lo agregado desde la última lectura; devuelve los bytes leídos."""
+        total = 0
+        while self._file is not None:
+            block = self._file.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+
+            total += len(block)
+            self._offset += len(block)
+
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                self._pending += block
+                continue
+
+            analyze_log_chunk(self._pending + block[:cut], self.summary)
+            self._pending = block[cut:]
+        return total
+
+    def check_rotation(self) -> None:
+        """Reabre el log si fue renombrado/recreado y vuelve al inicio si fue truncado."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return  # Renombrado y aún sin reemplazo: se sigue leyendo el descriptor abierto
+
+        if self._file is None or stat.st_ino != self._inode:
+            if self._file is not None:
+                print(f"[INFO] {self.path} fue rotado, se abre el archivo nuevo.")
+                self.read_new_data()  # Lo que alcanzó a escribirse en el archivo antiguo
+                self._close()
+            if self._open():
+                self.read_new_data()
+        elif stat.st_size < self._offset:
+            print(f"[INFO] {self.path} fue truncado, se lee desde el inicio.")
+            if self._pending:
+                analyze_log_chunk(self._pending, self.summary)
+                self._pending = b""
+            self._file.seek(0)
+            self._offset = 0
+            self.read_new_data()
+
+    def follow(self, on_flush, flush_interval: float = 10.0) -> None:
+        """
+        Sigue el log hasta un KeyboardInterrupt (Ctrl+C) y llama a `on_flush(summary)` cada
+        `flush_interval` segundos si hubo cambios, y una última vez al salir.
+        """
+        watcher = create_watcher(self.path, self.poll_interval)
+        flushed_lines = -1
+
+        def flush():
+            nonlocal flushed_lines
+            if self.summary["TOTAL_LINES"] != flushed_lines:
+                on_flush(self.summary)
+                flushed_lines = self.summary["TOTAL_LINES"]
+
+        try:
+            if self._open():
+                self.read_new_data()
+            else:
+                print(f"[WARNING] El archivo {self.path} no existe aún, se espera a que aparezca.")
+            next_flush = time.monotonic() + flush_interval
+
+            while True:
+                watcher.wait(next_flush - time.monotonic())
+                self.read_new_data()
+                self.check_rotation()
+
+                if time.monotonic() >= next_flush:
+                    flush()
+                    next_flush = time.monotonic() + flush_interval
+        except KeyboardInterrupt:
+            print("\n[INFO] Seguimiento detenido.")
+        finally:
+            watcher.close()
+            flush()
+            if self._file is not None:
+                self._file.close()
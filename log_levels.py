@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+log_levels.py
+
+Conteo de niveles de log (ERROR, WARNING, INFO) compartido por
+log_error_summary.py y remote_log_error_summary.py, para que ambos apliquen
+exactamente las mismas reglas: sin distinguir mayúsculas, una línea cuenta
+como ERROR si contiene "ERROR"; si no, como WARNING si contiene "WARN"; si no,
+como INFO si contiene "INFO".
+"""
+
+import re
+
+# Desde "ERROR" hasta el fin de línea; se busca sobre el bloque ya en mayúsculas
+ERROR_TAIL_RE = re.compile(r"ERROR[^\n]*")
+
+
+def new_summary() -> dict[str, int]:
+    """Resumen vacío con la forma que usan ambos scripts."""
+    return {
+        "ERROR": 0,
+        "WARNING": 0,
+        "INFO": 0,
+        "TOTAL_LINES": 0,
+    }
+
+
+def analyze_log_chunk(chunk: bytes, summary: dict[str, int], on_error=None) -> None:
+    """
+    Suma a `summary` los niveles de un bloque de líneas completas, en una sola
+    pasada que también entrega a `on_error` cada línea con ERROR.
+
+    El bloque se pasa a mayúsculas de una vez sobre bytes (solo ASCII, mucho más
+    barato que `str.upper()` línea por línea) y se decodifica como latin-1, que
+    mantiene un carácter por byte: así las posiciones de ERROR_TAIL_RE sirven
+    para recortar el bloque original, y solo las líneas con ERROR se decodifican
+    como UTF-8. Las líneas se separan por salto de línea, igual que en el
+    PUSHDOWN_AWK de remote_log_error_summary.py.
+    """
+    if not chunk:
+        return
+
+    upper = chunk.upper().decode("latin-1")
+    lines = upper.split("\n")
+    if not lines[-1]:
+        lines.pop()
+
+    errors = warnings = infos = 0
+    for line in lines:
+        if "ERROR" in line:
+            errors += 1
+        elif "WARN" in line:
+            warnings += 1
+        elif "INFO" in line:
+            infos += 1
+
+    summary["TOTAL_LINES"] += len(lines)
+    summary["ERROR"] += errors
+    summary["WARNING"] += warnings
+    summary["INFO"] += infos
+
+    if on_error is None or not errors:
+        return
+
+    for match in ERROR_TAIL_RE.finditer(upper):
+        start = upper.rfind("\n", 0, match.start()) + 1
+        on_error(chunk[start:match.end()].decode(errors="ignore"))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+log_stats.py
+
+Agrega un log con formato `YYYY-mm-dd HH:MM:SS [LEVEL] mensaje` (como app.log)
+en una sola pasada y con memoria acotada:
+
+  - Conteo por nivel en intervalos de un minuto o una hora (serie de tiempo).
+  - Top-N de mensajes más frecuentes por nivel, con números, IPs, UUIDs e
+    identificadores hexadecimales enmascarados, usando Space-Saving.
+
+El archivo se lee por bloques, de modo que sirve para logs más grandes que la
+RAM: la memoria depende del número de intervalos y de `--capacity`, no del
+tamaño del log. La serie se guarda en CSV, o en Parquet si la ruta de salida
+termina en `.parquet` (requiere pandas y pyarrow).
+"""
+
+import argparse
+import csv
+import os
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+
+LOG_FILE = "app.log"
+TIMESERIES_FILE = "log_timeseries.csv"
+TOP_MESSAGES_FILE = "log_top_messages.csv"
+
+READ_BLOCK_SIZE = 16 * 1024 * 1024
+BUCKET_WIDTHS = {"minute": 16, "hour": 13}  # largo del prefijo "YYYY-mm-dd HH:MM" / "YYYY-mm-dd HH"
+LEVEL_ALIASES = {"WARN": "WARNING"}
+
+LOG_LINE_RE = re.compile(r"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) \[([A-Za-z]+)\] ?(.*)")
+
+# Se aplican en orden: primero lo más específico para que los números de un UUID o una IP no se enmascaren sueltos
+MASKS = [
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<uuid>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b(?:0x[0-9a-fA-F]+|(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{6,})\b"), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<num>"),
+]
+
+
+@lru_cache(maxsize=65536)
+def normalize_message(message: str) -> str:
+    """Enmascara las partes variables de un mensaje para agrupar mensajes equivalentes."""
+    for pattern, mask in MASKS:
+        message = pattern.sub(mask, message)
+    return message.strip()
+
+
+class SpaceSaving:
+    """
+    Heavy hitters con memoria acotada (algoritmo Space-Saving).
+
+    Guarda a lo más 2 * capacity claves. Al llenarse se conservan las
+    `capacity` más frecuentes y el mayor conteo descartado pasa a ser el piso
+    con que entra una clave nueva, así cada conteo sobreestima el real en a lo
+    más su `error`. Todo elemento con frecuencia mayor a N / capacity aparece
+    en el resultado.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._counts: dict = {}
+        self._errors: dict = {}
+        self._floor = 0
+
+    def add(self, key, count: int = 1) -> None:
+        counts = self._counts
+        if key in counts:
+            counts[key] += count
+            return
+
+        counts[key] = self._floor + count
+        self._errors[key] = self._floor
+        if len(counts) > 2 * self.capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        self._floor = max(self._floor, ranked[self.capacity][1])
+
+        self._counts = dict(ranked[:self.capacity])
+        self._errors = {key: self._errors[key] for key in self._counts}
+
+    def top(self, n: int) -> list[tuple[object, int, int]]:
+        """Devuelve hasta n tuplas (clave, conteo, error) ordenadas por conteo descendente."""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(key, count, self._errors[key]) for key, count in ranked]
+
+
+class LogStats:
+    """Acumula la serie de tiempo por nivel y los mensajes frecuentes de un log."""
+
+    def __init__(self, bucket: str = "minute", capacity: int = 1000):
+        self.bucket_width = BUCKET_WIDTHS[bucket]
+        self.timeseries: Counter = Counter()
+        self.levels: Counter = Counter()
+        # Un Space-Saving por nivel: los INFO, mucho más frecuentes, no desplazan a los ERROR
+        self.messages: dict[str, SpaceSaving] = {}
+        self.capacity = capacity
+        self.unparsed = 0
+
+    def add_line(self, line: str) -> None:
+        match = LOG_LINE_RE.match(line)
+        if match is None:
+            if line.strip():
+                self.unparsed += 1
+            return
+
+        timestamp, level, message = match.groups()
+        level = level.upper()
+        level = LEVEL_ALIASES.get(level, level)
+
+        self.timeseries[(timestamp[:self.bucket_width], level)] += 1
+        self.levels[level] += 1
+        heavy_hitters = self.messages.get(level)
+        if heavy_hitters is None:
+            heavy_hitters = self.messages[level] = SpaceSaving(self.capacity)
+        heavy_hitters.add(normalize_message(message.rstrip("\r")))
+
+    def add_file(self, log_path: str, block_size: int = READ_BLOCK_SIZE) -> None:
+        """Procesa el archivo por bloques de líneas completas."""
+        pending = b""
+        with open(log_path, "rb") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+
+                cut = block.rfind(b"\n") + 1
+                if cut == 0:
+                    pending += block
+                    continue
+
+                self._add_block(pending + block[:cut])
+                pending = block[cut:]
+
+        if pending:
+            self._add_block(pending)
+
+    def _add_block(self, block: bytes) -> None:
+        add_line = self.add_line
+        for line in block.decode("utf-8", errors="replace").split("\n"):
+            add_line(line)
+
+    def timeseries_rows(self) -> list[tuple[str, str, int]]:
+        return [(bucket, level, count) for (bucket, level), count in sorted(self.timeseries.items())]
+
+    def top_messages(self, n: int, level: str) -> list[tuple[str, str, int, int]]:
+        heavy_hitters = self.messages.get(level)
+        if heavy_hitters is None:
+            return []
+        return [(level, message, count, error) for message, count, error in heavy_hitters.top(n)]
+
+
+def save_timeseries(stats: LogStats, output_path: str) -> bool:
+    """Guarda la serie (bucket, level, count) en CSV o, si la ruta termina en .parquet, en Parquet."""
+    rows = stats.timeseries_rows()
+
+    if output_path.endswith(".parquet"):
+        try:
+            import pandas as pd
+            pd.DataFrame(rows, columns=["bucket", "level", "count"]).to_parquet(output_path, index=False)
+        except ImportError as e:
+            print(f"[ERROR] Para guardar en Parquet se requiere pandas y pyarrow: {e}")
+            return False
+        return True
+
+    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["bucket", "level", "count"])
+        writer.writerows(rows)
+    return True
+
+
+def save_top_messages(stats: LogStats, output_path: str, n: int) -> None:
+    """Guarda el top-N de mensajes normalizados de cada nivel."""
+    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["level", "message", "count", "max_overcount"])
+        for level in sorted(stats.levels):
+            writer.writerows(stats.top_messages(n, level))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serie de tiempo por nivel y top de mensajes de un log.")
+    parser.add_argument("log_path", nargs="?", default=LOG_FILE, help=f"log a analizar (por defecto: {LOG_FILE})")
+    parser.add_argument("--bucket", choices=sorted(BUCKET_WIDTHS), default="minute",
+                        help="ancho de los intervalos de la serie (por defecto: minute)")
+    parser.add_argument("--top", type=int, default=10, help="mensajes a mostrar por nivel (por defecto: 10)")
+    parser.add_argument("--capacity", type=int, default=1000,
+                        help="mensajes distintos que se siguen con exactitud aproximada (por defecto: 1000)")
+    parser.add_argument("--timeseries-output", default=TIMESERIES_FILE,
+                        help=f"CSV o .parquet de la serie (por defecto: {TIMESERIES_FILE})")
+    parser.add_argument("--top-output", default=TOP_MESSAGES_FILE,
+                        help=f"CSV con el top de mensajes (por defecto: {TOP_MESSAGES_FILE})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if not os.path.exists(args.log_path):
+        print(f"[ERROR] El archivo {args.log_path} no existe.")
+        return
+
+    print(f"[INFO] Analizando {args.log_path} (intervalos por {args.bucket})")
+    stats = LogStats(args.bucket, args.capacity)
+    start = time.perf_counter()
+    stats.add_file(args.log_path)
+    elapsed = time.perf_counter() - start
+
+    print("\n=== Totales por nivel ===")
+    for level, count in stats.levels.most_common():
+        print(f"{level}: {count}")
+    if stats.unparsed:
+        print(f"[WARNING] {stats.unparsed} líneas no tienen el formato esperado y se omitieron.")
+
+    for level in ("ERROR", "WARNING"):
+        top = stats.top_messages(args.top, level)
+        if top:
+            print(f"\n=== Top {len(top)} mensajes {level} ===")
+            for _, message, count, _ in top:
+                print(f"{count:>8}  {message}")
+
+    buckets = {bucket for bucket, _ in stats.timeseries}
+    print(f"\n[INFO] {len(buckets)} intervalos procesados en {elapsed:.2f}s")
+
+    if save_timeseries(stats, args.timeseries_output):
+        print(f"[INFO] Serie guardada en: {args.timeseries_output}")
+    save_top_messages(stats, args.top_output, args.top)
+    print(f"[INFO] Top de mensajes guardado en: {args.top_output}")
+
+
+if __name__ == "__main__":
+    main()
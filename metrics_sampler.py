@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+metrics_sampler.py
+
+Muestreo continuo y no bloqueante de métricas del sistema con psutil.
+
+`psutil.cpu_percent(interval=None)` devuelve el uso de CPU desde la llamada
+anterior sin dormir, y los contadores acumulados de red se convierten en tasas
+(bytes/s) con la diferencia entre dos muestras. Las últimas muestras quedan en
+un buffer circular (`collections.deque` con maxlen).
+"""
+
+import os
+import time
+from collections import deque
+from datetime import datetime, UTC
+
+import psutil
+
+
+DEFAULT_HISTORY = 300  # muestras que se conservan
+
+
+class MetricsSampler:
+    """Toma muestras de CPU, RAM, disco, load y red sin bloquear."""
+
+    def __init__(self, history: int = DEFAULT_HISTORY, disk_path: str | None = None):
+        self.disk_path = disk_path or os.path.abspath(os.sep)
+        self.samples: deque[dict] = deque(maxlen=history)
+        self.costs: deque[float] = deque(maxlen=history)  # segundos que tomó cada muestra
+        self._has_loadavg = hasattr(psutil, "getloadavg")
+
+        # La primera llamada fija la referencia; devuelve 0.0 y se descarta
+        psutil.cpu_percent(interval=None)
+        self._prev_net = psutil.net_io_counters()
+        self._prev_time = time.monotonic()
+
+    def sample(self) -> dict:
+        """Toma una muestra; las tasas se calculan contra la muestra anterior."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        net = psutil.net_io_counters()
+
+        elapsed = now - self._prev_time
+        prev = self._prev_net
+        # max(0, ...) por si los contadores se reinician (p. ej. una interfaz que se recrea)
+        sent_rate = max(0, net.bytes_sent - prev.bytes_sent) / elapsed if elapsed > 0 else 0.0
+        recv_rate = max(0, net.bytes_recv - prev.bytes_recv) / elapsed if elapsed > 0 else 0.0
+        self._prev_net = net
+        self._prev_time = now
+
+        metrics = {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": psutil.virtual_memory().percent,
+            "disk_percent": psutil.disk_usage(self.disk_path).percent,
+            "load_avg": psutil.getloadavg() if self._has_loadavg else "N/A",
+            "net": {
+                "bytes_sent": net.bytes_sent,
+                "bytes_recv": net.bytes_recv,
+                "bytes_sent_per_s": round(sent_rate, 1),
+                "bytes_recv_per_s": round(recv_rate, 1),
+            },
+        }
+
+        self.samples.append(metrics)
+        self.costs.append(time.perf_counter() - start)
+        return metrics
+
+    def run(self, interval: float, on_sample) -> None:
+        """
+        Muestrea cada `interval` segundos hasta un KeyboardInterrupt, llamando a
+        `on_sample(metrics)` con cada muestra. Los horarios se calculan sobre el
+        inicio, de modo que el costo de cada iteración no acumula desfase.
+        """
+        next_run = time.monotonic() + interval
+        try:
+            while True:
+                time.sleep(max(0.0, next_run - time.monotonic()))
+                on_sample(self.sample())
+                next_run += interval
+                if next_run < time.monotonic():
+                    next_run = time.monotonic() + interval  # Atrasado (p. ej. suspensión): no recuperar en ráfaga
+        except KeyboardInterrupt:
+            pass
+
+    def cost_summary(self) -> str:
+        """Costo promedio y máximo por muestra, en milisegundos."""
+        if not self.costs:
+            return "sin muestras"
+        return (f"promedio {1000 * sum(self.costs) / len(self.costs):.3f} ms, "
+                f"máx {1000 * max(self.costs):.3f} ms en {len(self.costs)} muestras")
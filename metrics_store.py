@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+metrics_store.py
+
+Serie de tiempo de métricas en memoria fija, persistida en un archivo mapeado
+en memoria (mmap) para que un reinicio retome el historial al instante.
+
+Cada métrica tiene tres niveles, cada uno un buffer circular de float64 sobre
+el mmap (`memoryview.cast("d")`, sin copias):
+
+  - raw:    las muestras tal cual (ts, valor).
+  - minute: un resumen por minuto (ts, min, max, avg, p95).
+  - hour:   un resumen por hora calculado sobre las muestras de la hora.
+
+El tamaño del archivo, y por lo tanto la memoria, depende solo del número de
+métricas y de la capacidad de cada nivel: ver MetricsStore.size_bytes().
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+from array import array
+
+
+MAGIC = b"MTSTORE1"
+HEADER_SIZE = 4096
+# magic, n_metrics, largo del JSON de nombres, y por nivel: capacidad, próxima posición, cantidad
+HEADER = struct.Struct("<8sII" + "QQQ" * 3)
+NAMES_OFFSET = 256
+ROLLUP_FIELDS = 4  # min, max, avg, p95
+MINUTE = 60
+HOUR = 3600
+
+
+class Sample:
+    __slots__ = ("ts", "value")
+
+    def __init__(self, ts: float, value: float):
+        self.ts = ts
+        self.value = value
+
+    def __repr__(self):
+        return f"Sample(ts={self.ts}, value={self.value})"
+
+
+class Rollup:
+    __slots__ = ("ts", "min", "max", "avg", "p95")
+
+    def __init__(self, ts: float, min: float, max: float, avg: float, p95: float):
+        self.ts = ts
+        self.min = min
+        self.max = max
+        self.avg = avg
+        self.p95 = p95
+
+    def __repr__(self):
+        return f"Rollup(ts={self.ts}, min={self.min}, max={self.max}, avg={self.avg}, p95={self.p95})"
+
+
+def summarize(values) -> tuple[float, float, float, float]:
+    """min, max, promedio y p95 (nearest-rank) de una lista no vacía."""
+    ordered = sorted(values)
+    p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+    return ordered[0], ordered[-1], sum(ordered) / len(ordered), p95
+
+
+class _Ring:
+    """Buffer circular de registros de `width` float64 sobre una región del mmap."""
+
+    def __init__(self, view: memoryview, capacity: int, width: int, head: int, count: int):
+        self.view = view
+        self.capacity = capacity
+        self.width = width
+        self.head = head    # posición donde se escribe el próximo registro
+        self.count = count
+
+    def append(self, record) -> None:
+        base = self.head * self.width
+        for i, value in enumerate(record):
+            self.view[base + i] = value
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def records(self):
+        """Registros del más antiguo al más reciente."""
+        start = (self.head - self.count) % self.capacity
+        width = self.width
+        for k in range(self.count):
+            base = ((start + k) % self.capacity) * width
+            yield self.view[base:base + width]
+
+    def last_ts(self) -> float | None:
+        if not self.count:
+            return None
+        return self.view[((self.head - 1) % self.capacity) * self.width]
+
+
+class MetricsStore:
+    """
+    Historial de métricas con rollups 1s→1m→1h en un archivo mmap de tamaño fijo.
+
+    `add()` escribe la muestra cruda; al cambiar de minuto (u hora) resume las
+    muestras acumuladas del período anterior. Las muestras del período en curso
+    se recuperan del nivel raw al reabrir el archivo, por lo que raw_capacity
+    debe cubrir al menos una hora de muestras para no perder parte de ella.
+    """
+
+    TIERS = ("raw", "minute", "hour")
+
+    def __init__(self, path: str, metrics: list[str], raw_capacity: int = 3600,
+                 minute_capacity: int = 1440, hour_capacity: int = 24 * 30):
+        self.path = path
+        self.metrics = list(metrics)
+        self._index = {name: i for i, name in enumerate(self.metrics)}
+        n = len(self.metrics)
+        self._widths = (1 + n, 1 + ROLLUP_FIELDS * n, 1 + ROLLUP_FIELDS * n)
+        self._capacities = (raw_capacity, minute_capacity, hour_capacity)
+
+        names = json.dumps(self.metrics).encode()
+        self._names_len = len(names)
+        if NAMES_OFFSET + len(names) > HEADER_SIZE:
+            raise ValueError("Demasiadas métricas o nombres muy largos para el encabezado")
+
+        size = self.size_bytes(n, raw_capacity, minute_capacity, hour_capacity)
+        self._file, positions = self._open_file(size, names)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+        offset = HEADER_SIZE
+        self._rings = []
+        for tier, (capacity, width) in enumerate(zip(self._capacities, self._widths)):
+            length = capacity * width * 8
+            view = memoryview(self._mm)[offset:offset + length].cast("d")
+            head, count = positions[tier]
+            self._rings.append(_Ring(view, capacity, width, head, count))
+            offset += length
+        self.raw, self.minute, self.hour = self._rings
+
+        self._minute_acc = [array("d") for _ in self.metrics]
+        self._hour_acc = [array("d") for _ in self.metrics]
+        self._minute_bucket = None
+        self._hour_bucket = None
+        self._replay_open_periods()
+
+    @staticmethod
+    def size_bytes(n_metrics: int, raw_capacity: int = 3600, minute_capacity: int = 1440,
+                   hour_capacity: int = 24 * 30) -> int:
+        """Tamaño del archivo (y del mapeo en memoria) para esa configuración."""
+        raw = raw_capacity * (1 + n_metrics)
+        rollups = (minute_capacity + hour_capacity) * (1 + ROLLUP_FIELDS * n_metrics)
+        return HEADER_SIZE + 8 * (raw + rollups)
+
+    def _open_file(self, size: int, names: bytes):
+        """Abre el archivo si coincide con la configuración; si no, lo crea de nuevo."""
+        positions = [(0, 0)] * 3
+
+        if os.path.exists(self.path):
+            if os.path.getsize(self.path) != size:
+                print(f"[WARNING] {self.path} tiene otra configuración de métricas, se crea de nuevo.")
+                return self._create_file(size, names, positions)
+
+            f = open(self.path, "r+b")
+            header = f.read(HEADER_SIZE)
+            fields = HEADER.unpack_from(header)
+            magic, n_metrics, names_len = fields[:3]
+            tiers = [fields[3 + 3 * t:6 + 3 * t] for t in range(3)]
+            stored_names = header[NAMES_OFFSET:NAMES_OFFSET + names_len]
+
+            if (magic == MAGIC and n_metrics == len(self.metrics) and stored_names == names
+                    and all(tier[0] == cap for tier, cap in zip(tiers, self._capacities))):
+                return f, [(head, count) for _, head, count in tiers]
+
+            f.close()
+            print(f"[WARNING] {self.path} tiene otra configuración de métricas, se crea de nuevo.")
+
+        return self._create_file(size, names, positions)
+
+    def _create_file(self, size: int, names: bytes, positions):
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        f = open(self.path, "r+b")
+        f.seek(NAMES_OFFSET)
+        f.write(names)
+        self._write_header(f, positions, len(names))
+        return f, positions
+
+    def _write_header(self, f, positions, names_len: int) -> None:
+        fields = []
+        for capacity, (head, count) in zip(self._capacities, positions):
+            fields.extend((capacity, head, count))
+        header = HEADER.pack(MAGIC, len(self.metrics), names_len, *fields)
+        f.seek(0)
+        f.write(header)
+        f.flush()
+
+    def _save_positions(self) -> None:
+        fields = []
+        for ring in self._rings:
+            fields.extend((ring.capacity, ring.head, ring.count))
+        HEADER.pack_into(self._mm, 0, MAGIC, len(self.metrics), self._names_len, *fields)
+
+    def _replay_open_periods(self) -> None:
+        """Reconstruye los acumuladores del minuto y la hora en curso desde el nivel raw."""
+        last_minute = self.minute.last_ts()
+        last_hour = self.hour.last_ts()
+        for record in self.raw.records():
+            ts = record[0]
+            self._accumulate(ts, record[1:], last_minute, last_hour)
+
+    def _accumulate(self, ts: float, values, last_minute=None, last_hour=None) -> None:
+        minute_bucket = ts // MINUTE * MINUTE
+        hour_bucket = ts // HOUR * HOUR
+
+        if self._minute_bucket is not None and minute_bucket != self._minute_bucket:
+            self._close_period(self.minute, self._minute_bucket, self._minute_acc)
+        if self._hour_bucket is not None and hour_bucket != self._hour_bucket:
+            self._close_period(self.hour, self._hour_bucket, self._hour_acc)
+
+        # Al reabrir se ignoran las muestras de períodos que ya tienen su resumen
+        if last_minute is None or minute_bucket > last_minute:
+            self._minute_bucket = minute_bucket
+            for acc, value in zip(self._minute_acc, values):
+                acc.append(value)
+        if last_hour is None or hour_bucket > last_hour:
+            self._hour_bucket = hour_bucket
+            for acc, value in zip(self._hour_acc, values):
+                acc.append(value)
+
+    def _close_period(self, ring: _Ring, bucket: float, accumulators: list[array]) -> None:
+        if accumulators[0]:
+            record = [bucket]
+            for acc in accumulators:
+                record.extend(summarize(acc))
+            ring.append(record)
+        for acc in accumulators:
+            del acc[:]
+
+    def add(self, ts: float, values: dict[str, float]) -> None:
+        """Agrega una muestra; las métricas ausentes se guardan como NaN."""
+        row = [float(values.get(name, math.nan)) for name in self.metrics]
+        self.raw.append([ts, *row])
+        self._accumulate(ts, row)
+        self._save_positions()
+
+    def query(self, metric: str, tier: str = "raw", since: float | None = None) -> list:
+        """Devuelve Sample (raw) o Rollup (minute/hour) de una métrica, del más antiguo al más reciente."""
+        i = self._index[metric]
+        ring = self._rings[self.TIERS.index(tier)]
+        result = []
+
+        for record in ring.records():
+            ts = record[0]
+            if since is not None and ts < since:
+                continue
+            if tier == "raw":
+                result.append(Sample(ts, record[1 + i]))
+            else:
+                base = 1 + ROLLUP_FIELDS * i
+                result.append(Rollup(ts, *record[base:base + ROLLUP_FIELDS]))
+        return result
+
+    def flush(self) -> None:
+        """Fuerza la escritura del mmap a disco."""
+        self._mm.flush()
+
+    def close(self) -> None:
+        self._save_positions()
+        for ring in self._rings:
+            ring.view.release()
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
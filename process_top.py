@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+process_top.py
+
+Top-K de procesos y de cgroups (contenedores / unidades systemd) por uso de
+CPU y memoria, pensado para correr en cada muestra de system_monitor.py.
+
+Se hace una sola pasada de `psutil.process_iter(attrs=...)`, que lee todos los
+atributos de cada proceso de una vez (oneshot) en lugar de una syscall por
+atributo. El uso de CPU es la diferencia de `cpu_times` contra la pasada
+anterior, el top-K se arma durante la misma pasada con heaps de K elementos
+(sin guardar una fila por proceso) y el cgroup de cada proceso se lee de
+/proc/<pid>/cgroup solo la primera vez que se ve.
+
+Aun así la pasada recorre todos los procesos (con miles cuesta cientos de
+ms), por eso system_monitor.py la desactiva por defecto (MONITOR_TOP_K=0).
+"""
+
+import heapq
+import re
+import time
+from collections import defaultdict
+
+import psutil
+
+
+PROCESS_ATTRS = ["pid", "name", "cpu_times", "memory_info", "create_time"]
+
+# Contenedores en la ruta del cgroup (v1 y v2): docker, podman/libpod, containerd/CRI
+CONTAINER_RE = re.compile(r"(?:docker|libpod|cri-containerd|crio)[-/]([0-9a-f]{12,64})")
+
+
+def read_cgroup(pid: int) -> str:
+    """Etiqueta del cgroup de un proceso: "container:<id>", la unidad systemd o la ruta; "" si no se puede leer."""
+    try:
+        with open(f"/proc/{pid}/cgroup", "r", encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        return ""
+
+    # "0::/system.slice/nginx.service" (v2) o "4:memory:/docker/<id>" (v1); en
+    # sistemas híbridos manda la jerarquía de memoria de v1
+    memory_path = unified_path = None
+    for line in content.splitlines():
+        hierarchy, _, rest = line.partition(":")
+        controllers, _, cgroup_path = rest.partition(":")
+        if "memory" in controllers.split(","):
+            memory_path = cgroup_path
+        elif hierarchy == "0":
+            unified_path = cgroup_path
+    path = memory_path or unified_path or ""
+
+    match = CONTAINER_RE.search(path)
+    if match:
+        return f"container:{match.group(1)[:12]}"
+
+    last = path.rstrip("/").rsplit("/", 1)[-1]
+    return last or path
+
+
+class ProcessTop:
+    """Mantiene los cpu_times de la pasada anterior para calcular el uso de CPU por proceso."""
+
+    def __init__(self, k: int = 5, cgroups: bool = True):
+        self.k = k
+        self.cgroups = cgroups and psutil.LINUX
+        # (pid, create_time) identifica un proceso aunque el pid se reutilice
+        self._prev_cpu: dict[tuple[int, float], float] = {}
+        self._cgroup_cache: dict[tuple[int, float], str] = {}
+        self._prev_time: float | None = None
+        self.last_cost = 0.0  # segundos de la última pasada
+
+    def snapshot(self) -> dict:
+        """
+        Devuelve {"cpu": [...], "rss": [...], "cgroups_cpu": [...], "cgroups_rss": [...]}
+        con los K mayores. El CPU se mide desde la llamada anterior; en la primera
+        llamada "cpu" y "cgroups_cpu" vienen vacíos.
+        """
+        start = time.perf_counter()
+        now = time.monotonic()
+        elapsed = None if self._prev_time is None else now - self._prev_time
+
+        prev_cpu = self._prev_cpu
+        current_cpu: dict[tuple[int, float], float] = {}
+        cgroup_cache = self._cgroup_cache
+        new_cgroups: dict[tuple[int, float], str] = {}
+        # Heaps de mínimos con los K mayores vistos: (valor, pid, cpu, rss, nombre, cgroup)
+        top_cpu: list[tuple] = []
+        top_rss: list[tuple] = []
+        cgroup_cpu: dict[str, float] = defaultdict(float)
+        cgroup_rss: dict[str, int] = defaultdict(int)
+
+        for proc in psutil.process_iter(PROCESS_ATTRS):
+            info = proc.info
+            cpu_times = info["cpu_times"]
+            memory = info["memory_info"]
+            if cpu_times is None or memory is None:
+                continue  # Sin permisos o proceso que terminó durante la pasada
+
+            key = (info["pid"], info["create_time"])
+            total = cpu_times.user + cpu_times.system
+            current_cpu[key] = total
+
+            cpu_percent = 0.0
+            if elapsed:
+                previous = prev_cpu.get(key)
+                if previous is not None:
+                    cpu_percent = max(0.0, total - previous) / elapsed * 100
+
+            cgroup = ""
+            if self.cgroups:
+                cgroup = cgroup_cache.get(key)
+                if cgroup is None:
+                    cgroup = read_cgroup(info["pid"])
+                new_cgroups[key] = cgroup
+                cgroup_cpu[cgroup] += cpu_percent
+                cgroup_rss[cgroup] += memory.rss
+
+            row = (info["pid"], cpu_percent, memory.rss, info["name"], cgroup)
+            _push_top(top_cpu, self.k, (cpu_percent, *row))
+            _push_top(top_rss, self.k, (memory.rss, *row))
+
+        # Solo se conservan los procesos vivos: el caché no crece con los que terminan
+        self._prev_cpu = current_cpu
+        self._cgroup_cache = new_cgroups
+        self._prev_time = now
+
+        def entries(heap):
+            return [{"pid": pid, "name": name, "cgroup": cgroup,
+                     "cpu_percent": round(cpu, 1), "rss_mb": round(rss / 1024 / 1024, 1)}
+                    for value, pid, cpu, rss, name, cgroup in sorted(heap, reverse=True)]
+
+        result = {
+            "cpu": [entry for entry in entries(top_cpu) if entry["cpu_percent"] > 0] if elapsed else [],
+            "rss": entries(top_rss),
+            "cgroups_cpu": [],
+            "cgroups_rss": [],
+        }
+        if self.cgroups:
+            if elapsed:
+                result["cgroups_cpu"] = [
+                    {"cgroup": name, "cpu_percent": round(value, 1)}
+                    for name, value in heapq.nlargest(self.k, cgroup_cpu.items(), key=lambda item: item[1])
+                    if value > 0
+                ]
+            result["cgroups_rss"] = [
+                {"cgroup": name, "rss_mb": round(value / 1024 / 1024, 1)}
+                for name, value in heapq.nlargest(self.k, cgroup_rss.items(), key=lambda item: item[1])
+            ]
+
+        self.last_cost = time.perf_counter() - start
+        return result
+
+
+def _push_top(heap: list, k: int, item: tuple) -> None:
+    """Agrega `item` al heap si está entre los K mayores (por su primer elemento)."""
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif heap and item[0] > heap[0][0]:
+        heapq.heapreplace(heap, item)
+
+
+def format_top(top: dict) -> str:
+    """Texto breve para Slack/consola con los procesos y cgroups que más consumen."""
+    lines = []
+    if top.get("cpu"):
+        lines.append("*Top CPU:* " + ", ".join(f"{p['name']} ({p['pid']}) {p['cpu_percent']}%" for p in top["cpu"]))
+    if top.get("rss"):
+        lines.append("*Top RAM:* " + ", ".join(f"{p['name']} ({p['pid']}) {p['rss_mb']} MB" for p in top["rss"]))
+    if top.get("cgroups_cpu"):
+        lines.append("*Cgroups CPU:* " + ", ".join(f"{c['cgroup']} {c['cpu_percent']}%" for c in top["cgroups_cpu"]))
+    if top.get("cgroups_rss"):
+        lines.append("*Cgroups RAM:* " + ", ".join(f"{c['cgroup']} {c['rss_mb']} MB" for c in top["cgroups_rss"]))
+    return "\n".join(lines)
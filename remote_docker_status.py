@@ -2,110 +2,237 @@
 """
 remote_docker_status.py
 
-Se conecta por SSH a un servidor Linux remoto,
-ejecuta `docker ps` y muestra el estado de los contenedores.
-Opcionalmente envía el resumen a Slack.
+Se conecta por SSH a uno o varios servidores Linux definidos en un archivo
+YAML, obtiene el estado de los contenedores Docker (incluidos los detenidos)
+con su uso de CPU, memoria y cantidad de reinicios, y envía el resumen a Slack.
+
+Los hosts se revisan en paralelo y cada uno en un solo `exec_command`: `docker
+ps -a`, `docker stats --no-stream` y `docker inspect` van en el mismo comando
+separados por marcadores de sección, y la salida JSON se procesa línea a línea
+a medida que llega.
+
+Sin archivo YAML se revisa solo el servidor de SSH_MARCHIGUE_HOST, como antes.
 """
 
+import json
 import os
-import paramiko
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import yaml
 from dotenv import load_dotenv
 
+from slack_notifier import send_slack_message
+from ssh_pool import discard_ssh_client, get_ssh_client, iter_remote_lines
+
 # Cargar variables desde .env
 load_dotenv()
 
+CONFIG_FILE = os.getenv("DOCKER_CONFIG_FILE", "servers_storage.yaml")
+MAX_WORKERS = int(os.getenv("DOCKER_MAX_WORKERS", "20"))  # 1 = secuencial
+
 SSH_MARCHIGUE_HOST = os.getenv("SSH_MARCHIGUE_HOST")
 SSH_MARCHIGUE_USER = os.getenv("SSH_MARCHIGUE_USER")
 SSH_MARCHIGUE_PASSWORD = os.getenv("SSH_MARCHIGUE_PASSWORD")
 SSH_MARCHIGUE_PORT = int(os.getenv("SSH_MARCHIGUE_PORT", "22"))
 
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
-
-
-def send_slack_message(message: str) -> None:
-    """Envía un mensaje a Slack usando un Webhook."""
-    if not SLACK_WEBHOOK_URL:
-        print("[WARNING] SLACK_WEBHOOK_URL no está configurado, no se enviará a Slack.")
-        return
+# Un solo round trip: contenedores, consumo y reinicios, cada uno tras su marcador
+DOCKER_COMMAND = (
+    "echo @@PS; docker ps -a --no-trunc --format '{{json .}}'; "
+    "echo @@STATS; docker stats --no-stream --format '{{json .}}'; "
+    "echo @@INSPECT; ids=$(docker ps -aq); "
+    "[ -n \"$ids\" ] && docker inspect --format '{{.Name}} {{.RestartCount}}' $ids"
+)
 
-    payload = {"text": message}
 
+def _parse_percent(value) -> float | None:
+    """Convierte "12.34%" a 12.34; None si no hay dato."""
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def parse_docker_output(lines) -> list[dict]:
+    """
+    Procesa las líneas de DOCKER_COMMAND (cualquier iterable, p. ej. el stream
+    remoto) y devuelve un dict por contenedor con name, image, state, status,
+    cpu_percent, mem_usage, mem_percent y restarts.
+    """
+    section = None
+    containers: dict[str, dict] = {}
+    stats: dict[str, dict] = {}
+    restarts: dict[str, int] = {}
+
+    for line in lines:
+        if line.startswith("@@"):
+            section = line[2:].strip()
+            continue
+        if not line.strip():
+            continue
+
+        if section == "INSPECT":
+            name, _, count = line.strip().rpartition(" ")
+            restarts[name.lstrip("/")] = int(count) if count.isdigit() else 0
+            continue
+
+        try:
+            item = json.loads(line)
+        except ValueError:
+            continue
+
+        if section == "PS":
+            name = item.get("Names", "").split(",")[0]
+            status = item.get("Status", "")
+            containers[name] = {
+                "name": name,
+                "image": item.get("Image", ""),
+                "state": item.get("State") or ("running" if status.startswith("Up") else "exited"),
+                "status": status,
+            }
+        elif section == "STATS":
+            stats[item.get("Name", "")] = item
+
+    for name, container in containers.items():
+        usage = stats.get(name, {})
+        container["cpu_percent"] = _parse_percent(usage.get("CPUPerc"))
+        container["mem_usage"] = usage.get("MemUsage", "")
+        container["mem_percent"] = _parse_percent(usage.get("MemPerc"))
+        container["restarts"] = restarts.get(name, 0)
+
+    return list(containers.values())
+
+
+def is_container_healthy(container: dict) -> bool:
+    """Un contenedor está bien si corre y su healthcheck (si tiene) no falla."""
+    return container["state"] == "running" and "(unhealthy)" not in container["status"]
+
+
+def get_remote_docker_status(host: str, user: str, password: str, port: int = 22) -> list[dict]:
+    """Se conecta por SSH y obtiene el estado y consumo de los contenedores en un solo `exec_command`."""
     try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=5)
-        if resp.status_code == 200:
-            print("[OK] Resumen enviado a Slack.")
-        else:
-            print(f"[ERROR] Slack respondió con status {resp.status_code}: {resp.text}")
+        client = get_ssh_client(host, user, password, port)
+        stdin, stdout, stderr = client.exec_command(DOCKER_COMMAND)
+
+        containers = parse_docker_output(iter_remote_lines(stdout))
+        error_output = stderr.read().decode(errors="ignore").strip()
     except Exception as e:
-        print(f"[ERROR] No se pudo enviar mensaje a Slack: {e}")
+        discard_ssh_client(host, user, port)
+        print(f"[ERROR] No se pudo conectar o ejecutar el comando en {host}: {e}")
+        return []
 
+    if error_output:
+        level = "WARNING" if containers else "ERROR"
+        print(f"[{level}] Error desde docker en {host}: {error_output}")
 
-def get_remote_docker_status():
-    """Se conecta por SSH y ejecuta `docker ps` en el servidor remoto."""
-    if not SSH_MARCHIGUE_HOST or not SSH_MARCHIGUE_USER or not SSH_MARCHIGUE_PASSWORD:
-        print("[ERROR] Faltan SSH_HOST, SSH_USER o SSH_PASSWORD en las variables de entorno.")
-        return []
+    return containers
 
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
-    try:
-        print(f"[INFO] Conectando a {SSH_MARCHIGUE_USER}@{SSH_MARCHIGUE_HOST}:{SSH_MARCHIGUE_PORT} ...")
-        client.connect(
-            hostname=SSH_MARCHIGUE_HOST,
-            port=SSH_MARCHIGUE_PORT,
-            username=SSH_MARCHIGUE_USER,
-            password=SSH_MARCHIGUE_PASSWORD,
-            timeout=10,
-        )
-
-        cmd = 'docker ps --format "{{.Names}}|{{.Status}}|{{.Image}}"'
-        stdin, stdout, stderr = client.exec_command(cmd)
-
-        output = stdout.read().decode().strip()
-        error_output = stderr.read().decode().strip()
-    except Exception as e:
-        print(f"[ERROR] No se pudo conectar o ejecutar el comando: {e}")
+def format_container(container: dict) -> str:
+    """Línea de resumen de un contenedor con su consumo y reinicios."""
+    line = f"- {container['name']}: {container['status']} ({container['image']})"
+
+    extras = []
+    if container["cpu_percent"] is not None:
+        extras.append(f"CPU {container['cpu_percent']:.1f}%")
+    if container["mem_percent"] is not None:
+        extras.append(f"RAM {container['mem_usage']} ({container['mem_percent']:.1f}%)")
+    if container["restarts"]:
+        extras.append(f"{container['restarts']} reinicios")
+
+    if extras:
+        line += " | " + ", ".join(extras)
+    return line
+
+
+def load_servers_from_yaml():
+    """Lee la lista de servidores desde el YAML; sin archivo usa SSH_MARCHIGUE_*."""
+    if not os.path.exists(CONFIG_FILE):
+        if SSH_MARCHIGUE_HOST and SSH_MARCHIGUE_USER and SSH_MARCHIGUE_PASSWORD:
+            return [{
+                "name": SSH_MARCHIGUE_HOST,
+                "host": SSH_MARCHIGUE_HOST,
+                "user": SSH_MARCHIGUE_USER,
+                "password": SSH_MARCHIGUE_PASSWORD,
+                "port": SSH_MARCHIGUE_PORT,
+            }]
+        print(f"[ERROR] No se encontró {CONFIG_FILE} ni SSH_MARCHIGUE_HOST, SSH_MARCHIGUE_USER "
+              "y SSH_MARCHIGUE_PASSWORD en las variables de entorno.")
         return []
-    finally:
-        client.close()
 
-    if error_output:
-        print(f"[ERROR] Error desde docker ps: {error_output}")
-        return []
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
 
-    containers = []
-    if output:
-        for line in output.splitlines():
-            parts = line.split("|")
-            if len(parts) == 3:
-                name, status, image = parts
-                containers.append(
-                    {"name": name.strip(), "status": status.strip(), "image": image.strip()}
-                )
+    servers = data.get("servers", [])
+    if not servers:
+        print("[WARNING] No se encontraron servidores en el YAML.")
+    return servers
 
-    return containers
 
+def process_server(server: dict):
+    """Devuelve (name, host, containers) de un servidor del YAML o None si se omite."""
+    name = server.get("name", "Servidor sin nombre")
+    host = server.get("host")
+    user = server.get("user")
+    password = server.get("password")
+    port = int(server.get("port", 22))
 
-def main():
-    containers = get_remote_docker_status()
+    if not host or not user or not password:
+        print(f"[WARNING] Servidor '{name}' tiene configuración incompleta, se omite.")
+        return None
+
+    return name, host, get_remote_docker_status(host, user, password, port)
 
+
+def report_result(name: str, host: str, containers: list[dict]) -> None:
+    """Muestra los contenedores de un servidor y envía el resumen a Slack."""
     if not containers:
-        print("No se encontraron contenedores o hubo un error.")
+        print(f"\nNo se encontraron contenedores o hubo un error en {name} ({host}).")
         return
 
-    print("\nContenedores en el servidor remoto:")
-    for c in containers:
-        print(f"- {c['name']} | {c['status']} | {c['image']}")
+    bad = [c for c in containers if not is_container_healthy(c)]
+    ok = [c for c in containers if is_container_healthy(c)]
+
+    print(f"\n===== Contenedores en: {name} ({host}) =====")
+    for c in bad + ok:
+        print(format_container(c))
 
     # Crear mensaje para Slack
-    lines = [f"Estado de Docker en {SSH_MARCHIGUE_HOST}:"]
-    for c in containers:
-        lines.append(f"- {c['name']}: {c['status']} ({c['image']})")
+    lines = [f"Estado de Docker en {host} ({name}):"]
+    if bad:
+        lines.append("🔴 *Contenedores con problemas:*")
+        lines.extend(format_container(c) for c in bad)
+    if ok:
+        lines.append("🟢 *Contenedores OK:*")
+        lines.extend(format_container(c) for c in ok)
+
+    send_slack_message("\n".join(lines))
+
+
+def main():
+    servers = load_servers_from_yaml()
+    if not servers:
+        return
 
-    message = "\n".join(lines)
-    send_slack_message(message)
+    # Los hosts se revisan en paralelo (acotado por DOCKER_MAX_WORKERS) y cada
+    # resultado se reporta apenas llega, sin esperar al host más lento.
+    start = time.monotonic()
+    workers = max(1, min(MAX_WORKERS, len(servers)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_server, server): server for server in servers}
+
+        for future in as_completed(futures):
+            server = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] Fallo inesperado procesando '{server.get('name', server.get('host'))}': {e}")
+                continue
+
+            if result is not None:
+                report_result(*result)
+
+    print(f"\n[INFO] {len(servers)} servidores revisados en {time.monotonic() - start:.1f}s")
 
 
 if __name__ == "__main__":
@@ -8,78 +8,172 @@ lee las últimas líneas de un archivo de log y genera un resumen de niveles
 """
 
 import os
-import paramiko
-import requests
+import re
+import shlex
 import yaml
 import csv
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import lru_cache
 from dotenv import load_dotenv
 
+from log_cursor_store import LogCursorStore
+from log_levels import analyze_log_chunk, new_summary
+from slack_notifier import send_slack_message
+from ssh_pool import discard_ssh_client, get_ssh_client, iter_remote_chunks
+
 OUTPUT_DIR = "archivos"
 
 load_dotenv()
 
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 CONFIG_FILE = os.getenv("LOGS_CONFIG_FILE", "logs_monitor.yaml")
 TAIL_LINES = int(os.getenv("LOG_TAIL_LINES", "200"))
 LOG_TIME_RANGE = os.getenv("LOG_TIME_RANGE", "").strip()  # "", "1h", "24h"
+MAX_WORKERS = int(os.getenv("LOG_MAX_WORKERS", "20"))  # 1 = secuencial
+HOST_TIMEOUT = float(os.getenv("LOG_HOST_TIMEOUT", "30"))  # segundos por host
+# 1 = leer solo los bytes nuevos desde la última ejecución (cursor por host+log)
+LOG_INCREMENTAL = os.getenv("LOG_INCREMENTAL", "1") == "1"
+LOG_CURSOR_FILE = os.getenv("LOG_CURSOR_FILE", "log_cursors.json")
+# Ventana máxima que se lee la primera vez (sin cursor) para obtener las últimas TAIL_LINES
+BOOTSTRAP_BYTES = int(os.getenv("LOG_BOOTSTRAP_BYTES", str(4 * 1024 * 1024)))
+# Bytes del final que se miran para no cortar la última línea a medio escribir
+PARTIAL_LINE_LOOKBACK = 64 * 1024
+# Conteo en el servidor remoto: "auto" = solo con LOG_TIME_RANGE, "1" = siempre, "0" = nunca
+LOG_PUSHDOWN = os.getenv("LOG_PUSHDOWN", "auto").strip().lower()
+
+# Mismas reglas que summarize_log_content: ERROR > WARN > INFO, sin distinguir mayúsculas.
+# Imprime solo las líneas con ERROR y al final una línea "@@COUNTS error warning info total".
+PUSHDOWN_AWK = (
+    "awk '{ n++; u = toupper($0) } "
+    "index(u, \"ERROR\") { e++; print; next } "
+    "index(u, \"WARN\") { w++; next } "
+    "index(u, \"INFO\") { i++ } "
+    "END { printf \"@@COUNTS %d %d %d %d\\n\", e, w, i, n }'"
+)
+
+CURSOR_STORE = LogCursorStore(LOG_CURSOR_FILE)
+
+# Timestamps al inicio de la línea: "2025-11-29 23:27:56" / ISO, o syslog "Nov 29 23:27:56"
+ISO_TIMESTAMP_RE = re.compile(r"\s*(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})")
+SYSLOG_TIMESTAMP_RE = re.compile(r"\s*([A-Z][a-z]{2}) {1,2}(\d{1,2}) (\d{2}:\d{2}:\d{2})")
+SYSLOG_MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+
+@lru_cache(maxsize=1024)
+def _syslog_date(month: str, day: str) -> str | None:
+    """Convierte "Nov 29" a "YYYY-11-29" asumiendo el año actual (o el anterior si quedaría en el futuro)."""
+    month_number = SYSLOG_MONTHS.get(month)
+    if month_number is None:
+        return None
+
+    today = datetime.now()
+    try:
+        date = today.replace(month=month_number, day=int(day))
+        if date - today > timedelta(days=1):
+            date = date.replace(year=today.year - 1)
+    except ValueError:
+        return None
+    return date.strftime("%Y-%m-%d")
 
-def save_errors_to_csv(host: str, log_content: str):
-    """Guarda solo las líneas con ERROR en un archivo CSV dentro de OUTPUT_DIR."""
 
-    if not log_content:
-        return
+def parse_log_timestamp(line: str) -> str | None:
+    """Extrae el timestamp original de una línea de log en formato ISO, o None si no tiene."""
+    # Camino rápido para "YYYY-mm-dd HH:MM:SS ..." (formato de generate_fake_logs.py)
+    if line[4:5] == "-" and line[13:14] == ":" and line[:4].isdigit():
+        return f"{line[:10]}T{line[11:19]}"
 
-    # Asegura que el directorio exista
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    match = ISO_TIMESTAMP_RE.match(line)
+    if match:
+        return f"{match[1]}T{match[2]}"
 
-    rows = []
-    for line in log_content.splitlines():
-        if "ERROR" in line.upper():
-            rows.append([datetime.now().isoformat(), line.strip()])
+    match = SYSLOG_TIMESTAMP_RE.match(line)
+    if match:
+        date = _syslog_date(match[1], match[2])
+        if date:
+            return f"{date}T{match[3]}"
+    return None
 
-    if not rows:
-        return
 
-    filename = f"error_logs_{host.replace('.', '_')}.csv"
-    filepath = os.path.join(OUTPUT_DIR, filename)
+class ErrorCsvWriter:
+    """
+    Escribe líneas con ERROR en el CSV de un host a medida que llegan.
+    El timestamp de cada fila es el de la propia línea de log; si la línea no
+    trae uno reconocible, se usa la hora de ingesta. El archivo se abre recién
+    con la primera fila, así que si no hay errores no se crea nada.
+    """
 
-    try:
-        file_exists = os.path.isfile(filepath)
+    BUFFER_ROWS = 1000
 
-        with open(filepath, "a", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
+    def __init__(self, host: str):
+        self.filepath = os.path.join(OUTPUT_DIR, f"error_logs_{host.replace('.', '_')}.csv")
+        self.rows = 0
+        self.ingested_at = datetime.now().isoformat()
+        self._buffer: list[list[str]] = []
+        self._file = None
+        self._writer = None
+        self._failed = False
 
-            if not file_exists:
-                writer.writerow(["timestamp", "message"])
+    def write(self, line: str) -> None:
+        self._buffer.append([parse_log_timestamp(line) or self.ingested_at, line.strip()])
+        if len(self._buffer) >= self.BUFFER_ROWS:
+            self.flush()
 
-            writer.writerows(rows)
+    def flush(self) -> None:
+        if not self._buffer or self._failed:
+            self._buffer.clear()
+            return
 
-        print(f"[OK] {len(rows)} errores guardados en {filepath}")
+        try:
+            if self._writer is None:
+                # Asegura que el directorio exista
+                os.makedirs(OUTPUT_DIR, exist_ok=True)
+                file_exists = os.path.isfile(self.filepath)
 
-    except Exception as e:
-        print(f"[ERROR] No se pudo guardar el archivo CSV: {e}")
+                self._file = open(self.filepath, "a", newline="", encoding="utf-8")
+                self._writer = csv.writer(self._file)
 
+                if not file_exists:
+                    self._writer.writerow(["timestamp", "message"])
 
+            self._writer.writerows(self._buffer)
+            self.rows += len(self._buffer)
 
-def send_slack_message(message: str) -> None:
-    """Envía un mensaje a Slack usando un Webhook."""
-    if not SLACK_WEBHOOK_URL:
-        print("[WARNING] SLACK_WEBHOOK_URL no está configurado. No se enviará a Slack.")
+        except Exception as e:
+            self._failed = True
+            print(f"[ERROR] No se pudo guardar el archivo CSV: {e}")
+        finally:
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if not self._failed:
+                print(f"[OK] {self.rows} errores guardados en {self.filepath}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def save_errors_to_csv(host: str, log_content) -> None:
+    """
+    Guarda solo las líneas con ERROR en un archivo CSV dentro de OUTPUT_DIR.
+    `log_content` acepta lo mismo que summarize_log_content.
+    """
+
+    if not log_content:
         return
 
-    try:
-        resp = requests.post(
-            SLACK_WEBHOOK_URL,
-            json={"text": message},
-            timeout=5,
-        )
-        if resp.status_code == 200:
-            print("[OK] Resumen enviado a Slack.")
-        else:
-            print(f"[ERROR] Slack respondió con status {resp.status_code}: {resp.text}")
-    except Exception as e:
-        print(f"[ERROR] No se pudo enviar mensaje a Slack: {e}")
+    with ErrorCsvWriter(host) as writer:
+        summarize_log_content(log_content, writer.write)
+
 
 
 def load_servers_from_yaml():
@@ -97,77 +191,203 @@ def load_servers_from_yaml():
     return servers
 
 
-def fetch_log_tail(host: str, user: str, password: str, log_path: str, port: int = 22) -> str:
+def use_pushdown() -> bool:
+    """Indica si el conteo de niveles se hace en el servidor remoto."""
+    if LOG_PUSHDOWN == "auto":
+        return bool(LOG_TIME_RANGE)
+    return LOG_PUSHDOWN in ("1", "true", "yes")
+
+
+def build_incremental_command(log_path: str, cursor: dict[str, int] | None, post: str = "") -> str:
     """
-    Se conecta por SSH y obtiene el contenido del log remoto.
-    Si LOG_TIME_RANGE está definido (por ejemplo '1h' o '24h'), intenta usar journalctl
-    para filtrar por rango de tiempo. En caso contrario, usa `tail -n` sobre el archivo.
+    Construye el comando remoto que lee solo los bytes nuevos de `log_path`.
+
+    La primera línea de la salida es "<inode> <fin>", donde fin es el tamaño
+    según `stat` sin la última línea si todavía no termina en salto de línea
+    (se está escribiendo); el resto son los bytes entre el offset guardado y
+    ese fin. Así el cursor queda siempre al inicio de una línea y una línea a
+    medio escribir se lee entera en la próxima ejecución. Solo se busca el
+    último salto en los últimos PARTIAL_LINE_LOOKBACK bytes: una línea
+    incompleta más larga se lee hasta el tamaño, como antes.
+    Si cambió el inode (rotación) o el archivo es más chico que el offset
+    (truncado), se lee desde el inicio. Sin cursor previo se leen las últimas
+    TAIL_LINES líneas. `post` es un filtro opcional que se aplica solo a los
+    bytes del log.
+    """
+    path = shlex.quote(log_path)
+
+    if cursor is None:
+        start = "$(( $2 > {w} ? $2 - {w} : 0 ))".format(w=BOOTSTRAP_BYTES)
+        select = f"start={start}; filter='tail -n {TAIL_LINES}'"
+    else:
+        inode = int(cursor["inode"])
+        offset = int(cursor["offset"])
+        select = (
+            f"start={offset}; filter=cat; "
+            f'if [ "$1" != "{inode}" ] || [ "$2" -lt "$start" ]; then start=0; fi'
+        )
+
+    # Largo de la línea final sin "\n" dentro de los últimos bytes de la ventana (0 si no hay)
+    tail_bytes = f'tail -c +$((lb + 1)) -- {path} | head -c $(($2 - lb))'
+    partial = (
+        f"lb=$(( $2 - start > {PARTIAL_LINE_LOOKBACK} ? $2 - {PARTIAL_LINE_LOOKBACK} : start )); cut=0; "
+        f'if [ -n "$({tail_bytes} | tail -c 1)" ]; then '
+        f"cut=$(( $({tail_bytes} | tail -n 1 | wc -c) )); "
+        'if [ "$cut" -ge $(($2 - lb)) ] && [ "$lb" -gt "$start" ]; then cut=0; fi; '
+        "fi; end=$(($2 - cut))"
+    )
+
+    return (
+        f"st=$(stat -L -c '%i %s' -- {path}) || exit 1; set -- $st; {select}; {partial}; "
+        'echo "$1 $end"; '
+        f'tail -c +$((start + 1)) -- {path} | head -c $((end - start)) | $filter'
+        + (f" | {post}" if post else "")
+    )
+
+
+def build_log_command(host: str, log_path: str, pushdown: bool = False) -> tuple[str, bool]:
+    """
+    Elige el comando remoto que lee el log según LOG_TIME_RANGE y LOG_INCREMENTAL.
+    Devuelve (comando, incremental); si es incremental, la primera línea de la
+    salida es "<inode> <fin>" (ver build_incremental_command).
+    """
+    post = PUSHDOWN_AWK if pushdown else ""
+
+    # Elegir comando según rango de tiempo
+    if LOG_TIME_RANGE == "1h":
+        print("[INFO] Analizando logs de la última hora usando journalctl.")
+        cmd = "journalctl --since '1 hour ago'"
+    elif LOG_TIME_RANGE == "24h":
+        print("[INFO] Analizando logs del último día usando journalctl.")
+        cmd = "journalctl --since '1 day ago'"
+    elif LOG_INCREMENTAL:
+        return build_incremental_command(log_path, CURSOR_STORE.get(host, log_path), post), True
+    else:
+        # Comportamiento original: leer últimas N líneas del archivo
+        cmd = f"tail -n {TAIL_LINES} {log_path}"
+
+    if post:
+        cmd = f"{cmd} | {post}"
+    return cmd, False
+
+
+def stream_log_chunks(host: str, user: str, password: str, log_path: str, port: int = 22,
+                      timeout: float = HOST_TIMEOUT, pushdown: bool = False):
     """
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    Se conecta por SSH e itera el log remoto a medida que llega, en bloques de
+    bytes con líneas completas.
+    Si LOG_TIME_RANGE está definido (por ejemplo '1h' o '24h'), intenta usar journalctl
+    para filtrar por rango de tiempo. Si LOG_INCREMENTAL está activo, lee solo lo
+    escrito desde la última ejecución (ver CURSOR_STORE). En caso contrario, usa
+    `tail -n` sobre el archivo.
+
+    Con `pushdown=True` la salida se filtra en el servidor con PUSHDOWN_AWK, de modo
+    que solo viajan las líneas con ERROR y una línea final de conteos.
 
+    `timeout` limita tanto la conexión como la espera de datos del comando, para
+    que un host caído no retenga al resto de la flota. La memoria usada no depende
+    del tamaño del log; el cursor incremental se guarda solo si el log se leyó completo.
+    """
     try:
-        print(f"[INFO] Conectando a {user}@{host}:{port} ...")
-        client.connect(
-            hostname=host,
-            port=port,
-            username=user,
-            password=password,
-            timeout=10,
-        )
+        client = get_ssh_client(host, user, password, port, timeout=min(10, timeout))
+        cmd, incremental = build_log_command(host, log_path, pushdown)
+
+        stdin, stdout, stderr = client.exec_command(cmd, timeout=timeout)
+        chunks = iter_remote_chunks(stdout)
 
-        # Elegir comando según rango de tiempo
-        if LOG_TIME_RANGE == "1h":
-            print("[INFO] Analizando logs de la última hora usando journalctl.")
-            cmd = "journalctl --since '1 hour ago'"
-        elif LOG_TIME_RANGE == "24h":
-            print("[INFO] Analizando logs del último día usando journalctl.")
-            cmd = "journalctl --since '1 day ago'"
-        else:
-            # Comportamiento original: leer últimas N líneas del archivo
-            cmd = f"tail -n {TAIL_LINES} {log_path}"
+        if incremental:
+            # Primera línea: "<inode> <fin>", el offset hasta donde se lee (última línea completa)
+            header, _, first_chunk = next(chunks, b"").partition(b"\n")
+            try:
+                inode, end = (int(v) for v in header.split())
+            except ValueError:
+                print(f"[WARNING] No se pudo obtener el cursor de {log_path} en {host}: "
+                      f"{stderr.read().decode(errors='ignore').strip()}")
+                return
 
-        stdin, stdout, stderr = client.exec_command(cmd)
+            if first_chunk:
+                yield first_chunk
 
-        output = stdout.read().decode(errors="ignore")
-        error_output = stderr.read().decode().strip()
+        yield from chunks
 
+        error_output = stderr.read().decode(errors="ignore").strip()
         if error_output:
             print(f"[WARNING] Error al leer log en {host}: {error_output}")
 
-        return output
+        if incremental:
+            CURSOR_STORE.set(host, log_path, inode, end)
 
     except Exception as e:
+        discard_ssh_client(host, user, port)
         print(f"[ERROR] Fallo al conectar o ejecutar comando en {host}: {e}")
-        return ""
-    finally:
-        client.close()
 
-def summarize_log_content(log_content: str) -> dict[str, int]:
+
+def fetch_log_tail(host: str, user: str, password: str, log_path: str, port: int = 22,
+                   timeout: float = HOST_TIMEOUT, pushdown: bool = False) -> str:
+    """Igual que stream_log_chunks, pero devuelve el contenido completo como texto."""
+    return b"".join(stream_log_chunks(host, user, password, log_path, port, timeout, pushdown)).decode(errors="ignore")
+
+
+def parse_pushdown_output(output, on_error=None) -> dict[str, int]:
+    """
+    Procesa la salida de PUSHDOWN_AWK (texto, bytes o iterable de bloques de bytes).
+    Devuelve un resumen con la misma forma que summarize_log_content y llama
+    a `on_error(linea)` por cada línea con ERROR recibida.
+    """
+    summary = new_summary()
+
+    if isinstance(output, str):
+        output = output.encode()
+    chunks = [output] if isinstance(output, bytes) else output
+
+    for chunk in chunks:
+        for line in chunk.splitlines():
+            if line.startswith(b"@@COUNTS "):
+                error_count, warning_count, info_count, total = (int(v) for v in line.split()[1:5])
+                summary.update(ERROR=error_count, WARNING=warning_count, INFO=info_count, TOTAL_LINES=total)
+            elif on_error is not None:
+                on_error(line.decode(errors="ignore"))
+
+    return summary
+
+
+def fetch_log_summary(host: str, user: str, password: str, log_path: str, port: int = 22,
+                      timeout: float = HOST_TIMEOUT, on_error=None) -> dict[str, int]:
+    """
+    Obtiene el resumen de niveles del log remoto en una sola pasada sobre el stream,
+    llamando a `on_error(linea)` por cada línea con ERROR.
+    Si use_pushdown() está activo, el conteo se hace en el servidor y solo se
+    reciben las líneas con ERROR; si no, se cuentan localmente todas las líneas.
+    """
+    if use_pushdown():
+        chunks = stream_log_chunks(host, user, password, log_path, port, timeout, pushdown=True)
+        return parse_pushdown_output(chunks, on_error)
+
+    chunks = stream_log_chunks(host, user, password, log_path, port, timeout)
+    return summarize_log_content(chunks, on_error)
+
+
+def summarize_log_content(log_content, on_error=None) -> dict[str, int]:
     """
     Cuenta ocurrencias de niveles típicos en el contenido del log.
-    Se basa en coincidencias de texto simples.
+    Se basa en coincidencias de texto simples, sin distinguir mayúsculas:
+    ERROR tiene prioridad sobre WARN/WARNING, y este sobre INFO.
+
+    `log_content` puede ser el texto completo (str o bytes) o un iterable de
+    bloques de bytes con líneas completas, como los de stream_log_chunks. Si se
+    pasa `on_error`, se llama con cada línea que cuenta como ERROR.
     """
-    summary = {
-        "ERROR": 0,
-        "WARNING": 0,
-        "INFO": 0,
-        "TOTAL_LINES": 0,
-    }
+    summary = new_summary()
 
     if not log_content:
         return summary
 
-    for line in log_content.splitlines():
-        line_upper = line.upper()
-        summary["TOTAL_LINES"] += 1
+    if isinstance(log_content, str):
+        log_content = log_content.encode()
+    chunks = [log_content] if isinstance(log_content, bytes) else log_content
 
-        if "ERROR" in line_upper:
-            summary["ERROR"] += 1
-        elif "WARNING" in line_upper or "WARN" in line_upper:
-            summary["WARNING"] += 1
-        elif "INFO" in line_upper:
-            summary["INFO"] += 1
+    for chunk in chunks:
+        analyze_log_chunk(chunk, summary, on_error)
 
     return summary
 
@@ -216,39 +436,67 @@ def build_slack_message(server_name: str, host: str, log_label: str, log_path: s
     return f"{header}\n{host_info}\n{log_info}\n\n{counts}"
 
 
+def process_server(server: dict):
+    """
+    Procesa un servidor del YAML: lee el log, lo resume y guarda los errores.
+    Devuelve (name, host, log_label, log_path, summary) o None si se omite.
+    """
+    name = server.get("name", "Servidor sin nombre")
+    host = server.get("host")
+    user = server.get("user")
+    password = server.get("password")
+    port = int(server.get("port", 22))
+    log_path = server.get("log_path")
+    log_label = server.get("log_label", "log")
+
+    if not host or not user or not password or not log_path:
+        print(f"[WARNING] Servidor '{name}' tiene configuración incompleta, se omite.")
+        return None
+
+    # Conteo y guardado de errores en una sola pasada sobre el stream remoto
+    with ErrorCsvWriter(host) as error_writer:
+        summary = fetch_log_summary(host, user, password, log_path, port, on_error=error_writer.write)
+
+    return name, host, log_label, log_path, summary
+
+
+def report_result(name: str, host: str, log_label: str, log_path: str, summary: dict[str, int]) -> None:
+    """Muestra el resumen de un servidor y alerta a Slack si corresponde."""
+    # Consola
+    report = build_console_report(name, host, log_label, log_path, summary)
+    print(report)
+
+    # Slack: solo si hay errores o warnings
+    if summary["ERROR"] > 0 or summary["WARNING"] > 0:
+        slack_msg = build_slack_message(name, host, log_label, log_path, summary)
+        send_slack_message(slack_msg)
+    else:
+        print("Sin errores ni warnings en el tramo analizado. ✅")
+
+
 def main():
     servers = load_servers_from_yaml()
     if not servers:
         return
 
-    for server in servers:
-        name = server.get("name", "Servidor sin nombre")
-        host = server.get("host")
-        user = server.get("user")
-        password = server.get("password")
-        port = int(server.get("port", 22))
-        log_path = server.get("log_path")
-        log_label = server.get("log_label", "log")
-
-        if not host or not user or not password or not log_path:
-            print(f"[WARNING] Servidor '{name}' tiene configuración incompleta, se omite.")
-            continue
-
-        log_content = fetch_log_tail(host, user, password, log_path, port)
-
-        summary = summarize_log_content(log_content)
-        save_errors_to_csv(host, log_content)
-
-        # Consola
-        report = build_console_report(name, host, log_label, log_path, summary)
-        print(report)
-
-        # Slack: solo si hay errores o warnings
-        if summary["ERROR"] > 0 or summary["WARNING"] > 0:
-            slack_msg = build_slack_message(name, host, log_label, log_path, summary)
-            send_slack_message(slack_msg)
-        else:
-            print("Sin errores ni warnings en el tramo analizado. ✅")
+    # Los hosts se revisan en paralelo (acotado por LOG_MAX_WORKERS) y cada
+    # resultado se reporta apenas llega, sin esperar al host más lento.
+    workers = max(1, min(MAX_WORKERS, len(servers)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_server, server): server for server in servers}
+
+        for future in as_completed(futures):
+            server = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] Fallo inesperado procesando '{server.get('name', server.get('host'))}': {e}")
+                continue
+
+            if result is not None:
+                report_result(*result)
+
+    CURSOR_STORE.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+remote_probe.py
+
+Revisa storage, servicios, contenedores Docker y logs de cada servidor del
+YAML con una sola conexión SSH y un solo `exec_command` por host.
+
+Arma un script remoto con una sección por chequeo (df, systemctl, docker y
+la lectura del log), cada una precedida por una línea marcadora única por
+ejecución, y separa la salida por sección para pasarla a los mismos parsers
+y reportes de remote_storage_health.py, remote_service_health.py,
+remote_docker_status.py y remote_log_error_summary.py. Así un ciclo cuesta
+1 conexión y 1 round trip por host en vez de uno por script.
+
+Las secciones se procesan a medida que llegan: la del log no se guarda,
+sus bloques van directo al resumen (memoria constante, como
+remote_log_error_summary.py).
+
+Por defecto lee los servidores de `servers_storage.yaml`, el mismo YAML que
+remote_storage_health.py, remote_service_health.py y remote_docker_status.py
+(se cambia con PROBE_CONFIG_FILE). Cada servidor puede limitar sus chequeos
+con `checks:` (por defecto todos); el de logs se hace solo si el servidor
+define `log_path` (y opcionalmente `log_label`), como en logs_monitor.yaml.
+"""
+
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, groupby
+from operator import itemgetter
+
+import yaml
+from dotenv import load_dotenv
+
+import remote_docker_status
+import remote_log_error_summary
+import remote_service_health
+import remote_storage_health
+from ssh_pool import discard_ssh_client, get_ssh_client, iter_remote_chunks
+
+load_dotenv()
+
+CONFIG_FILE = os.getenv("PROBE_CONFIG_FILE", "servers_storage.yaml")
+MAX_WORKERS = int(os.getenv("PROBE_MAX_WORKERS", "20"))  # 1 = secuencial
+HOST_TIMEOUT = float(os.getenv("PROBE_HOST_TIMEOUT", "60"))  # segundos por host
+
+CHECKS = ("storage", "services", "docker", "logs")
+
+
+def load_servers_from_yaml():
+    """Lee la lista de servidores desde el YAML."""
+    if not os.path.exists(CONFIG_FILE):
+        print(f"[ERROR] No se encontró archivo de configuración: {CONFIG_FILE}")
+        return []
+
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    servers = data.get("servers", [])
+    if not servers:
+        print("[WARNING] No se encontraron servidores en el YAML.")
+    return servers
+
+
+def build_probe_script(host: str, checks, log_path: str | None, marker: str,
+                       pushdown: bool = False) -> tuple[str, bool]:
+    """
+    Script remoto con una sección por chequeo. Cada sección corre en un
+    subshell, así un comando que falla (o hace `exit`) no corta las demás.
+    Devuelve (script, incremental) como build_log_command.
+    """
+    commands = {
+        "storage": remote_storage_health.DF_COMMAND,
+        "services": remote_service_health.SERVICES_COMMAND,
+        "docker": remote_docker_status.DOCKER_COMMAND,
+    }
+    incremental = False
+    if "logs" in checks and log_path:
+        commands["logs"], incremental = remote_log_error_summary.build_log_command(host, log_path, pushdown)
+
+    parts = [f"echo '{marker} {name}'\n(\n{commands[name]}\n)" for name in checks if name in commands]
+    return "\n".join(parts), incremental
+
+
+def iter_section_pieces(chunks, marker: bytes):
+    """
+    Pares (sección, bloque) de la salida del script (bloques de bytes con
+    líneas completas, como los de iter_remote_chunks) a medida que llegan.
+    Solo se busca el marcador; el resto de cada bloque se pasa sin recorrerlo
+    línea por línea.
+    """
+    current = None
+
+    for chunk in chunks:
+        start = 0
+        while True:
+            pos = chunk.find(marker, start)
+            # El marcador cuenta solo al inicio de una línea
+            while pos > 0 and chunk[pos - 1] != 0x0A:
+                pos = chunk.find(marker, pos + 1)
+
+            if pos < 0:
+                if current is not None and start < len(chunk):
+                    yield current, chunk[start:]
+                break
+
+            if current is not None and pos > start:
+                yield current, chunk[start:pos]
+
+            end = chunk.find(b"\n", pos)
+            end = len(chunk) if end < 0 else end + 1
+            current = chunk[pos + len(marker):end].strip().decode(errors="ignore")
+            start = end
+
+
+def split_sections(chunks, marker: bytes):
+    """
+    Separa la salida del script en (sección, iterador de sus bloques), en el
+    orden en que llegan y sin guardarlas: como con itertools.groupby, cada
+    sección se debe consumir antes de pedir la siguiente. Así la del log se
+    puede resumir mientras se recibe.
+    """
+    for name, pieces in groupby(iter_section_pieces(chunks, marker), key=itemgetter(0)):
+        yield name, (chunk for _, chunk in pieces)
+
+
+def probe_server(server: dict):
+    """
+    Ejecuta el script de chequeos en un servidor y parsea cada sección.
+    Devuelve un dict con los resultados (solo los chequeos pedidos) o None si se omite.
+    """
+    name = server.get("name", "Servidor sin nombre")
+    host = server.get("host")
+    user = server.get("user")
+    password = server.get("password")
+    port = int(server.get("port", 22))
+    log_path = server.get("log_path")
+    checks = [check for check in server.get("checks", CHECKS) if check in CHECKS]
+
+    if not host or not user or not password:
+        print(f"[WARNING] Servidor '{name}' tiene configuración incompleta, se omite.")
+        return None
+
+    marker = f"@@PROBE-{secrets.token_hex(8)}"
+    pushdown = remote_log_error_summary.use_pushdown()
+    script, incremental = build_probe_script(host, checks, log_path, marker, pushdown)
+
+    result = {"name": name, "host": host, "threshold": float(server.get("threshold", remote_storage_health.THRESHOLD))}
+    # Las secciones chicas (df, systemctl, docker) se guardan como texto; el log se resume mientras llega
+    texts: dict[str, str] = {}
+
+    try:
+        client = get_ssh_client(host, user, password, port, timeout=min(10, HOST_TIMEOUT))
+        stdin, stdout, stderr = client.exec_command(script, timeout=HOST_TIMEOUT)
+        for section, chunks in split_sections(iter_remote_chunks(stdout), marker.encode()):
+            if section == "logs":
+                result["logs"] = _summarize_log_section(host, log_path, chunks, incremental, pushdown)
+            else:
+                texts[section] = b"".join(chunks).decode(errors="ignore")
+        error_output = stderr.read().decode(errors="ignore").strip()
+    except Exception as e:
+        discard_ssh_client(host, user, port)
+        print(f"[ERROR] Fallo al conectar o ejecutar el probe en {host}: {e}")
+        return None
+
+    if error_output:
+        print(f"[WARNING] Errores en el probe de {host}: {error_output}")
+
+    def text(section):
+        return texts.get(section, "")
+
+    if "storage" in checks:
+        result["storage"] = remote_storage_health.parse_df_output(text("storage").strip())
+    if "services" in checks:
+        result["services"] = remote_service_health.parse_systemctl_show(text("services"))
+    if "docker" in checks:
+        result["docker"] = remote_docker_status.parse_docker_output(text("docker").splitlines())
+    if "logs" in checks and log_path and "logs" not in result:
+        # Sin sección en la salida: se resume vacía, como un log sin líneas
+        result["logs"] = _summarize_log_section(host, log_path, iter(()), incremental, pushdown)
+
+    return result
+
+
+def _summarize_log_section(host: str, log_path: str, chunks, incremental: bool, pushdown: bool):
+    """
+    Resume la sección del log (un iterador de bloques, consumido una sola
+    vez mientras llega) y avanza el cursor, como fetch_log_summary.
+    """
+    if incremental:
+        # Primera línea: "<inode> <fin>", el offset hasta donde se lee (última línea completa)
+        header, _, first = next(chunks, b"").partition(b"\n")
+        try:
+            inode, end = (int(v) for v in header.split())
+        except ValueError:
+            print(f"[WARNING] No se pudo obtener el cursor de {log_path} en {host}.")
+            return None
+        chunks = chain([first], chunks)
+
+    with remote_log_error_summary.ErrorCsvWriter(host) as error_writer:
+        if pushdown:
+            summary = remote_log_error_summary.parse_pushdown_output(chunks, error_writer.write)
+        else:
+            summary = remote_log_error_summary.summarize_log_content(chunks, error_writer.write)
+
+    if incremental:
+        remote_log_error_summary.CURSOR_STORE.set(host, log_path, inode, end)
+    return summary
+
+
+def report_probe(result: dict, server: dict) -> None:
+    """Reporta cada chequeo con la misma salida y alertas que su script."""
+    name, host = result["name"], result["host"]
+
+    if "storage" in result:
+        print(f"\n===== Revisando storage en: {name} ({host}) =====")
+        if result["storage"]:
+            remote_storage_health.report_storage(name, host, result["storage"], result["threshold"])
+        else:
+            print(f"No se pudo obtener información de almacenamiento para {name}.")
+
+    if "services" in result:
+        print(f"\n===== Revisando servicios en: {name} ({host}) =====")
+        if result["services"]:
+            remote_service_health.report_services(name, host, result["services"])
+        else:
+            print(f"No se obtuvieron estados de servicios para {name}.")
+
+    if "docker" in result:
+        remote_docker_status.report_result(name, host, result["docker"])
+
+    if result.get("logs") is not None:
+        remote_log_error_summary.report_result(
+            name, host, server.get("log_label", "log"), server["log_path"], result["logs"]
+        )
+
+
+def main():
+    servers = load_servers_from_yaml()
+    if not servers:
+        return
+
+    # Los hosts se revisan en paralelo y cada uno se reporta apenas termina;
+    # los reportes corren en este hilo, así el estado de alertas no se comparte entre hilos.
+    start = time.monotonic()
+    workers = max(1, min(MAX_WORKERS, len(servers)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(probe_server, server): server for server in servers}
+
+        for future in as_completed(futures):
+            server = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] Fallo inesperado procesando '{server.get('name', server.get('host'))}': {e}")
+                continue
+
+            if result is not None:
+                report_probe(result, server)
+
+    remote_storage_health.ALERT_STORE.save()
+    remote_storage_health.HISTORY.save()
+    remote_service_health.ALERT_STORE.save()
+    remote_log_error_summary.CURSOR_STORE.save()
+
+    print(f"\n[INFO] {len(servers)} servidores revisados en {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
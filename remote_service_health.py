@@ -7,35 +7,38 @@ definidos en un archivo YAML, usando SSH, y envía un resumen/alerta a Slack.
 """
 
 import os
-import paramiko
-import requests
 import yaml
 from dotenv import load_dotenv
 
+from alert_state import NOTIFY_RECOVERED, STATE_CRIT, STATE_OK, AlertStateStore
+from slack_notifier import send_slack_message
+from ssh_pool import discard_ssh_client, get_ssh_client
+
 load_dotenv()
 
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 CONFIG_FILE = os.getenv("SERVICES_CONFIG_FILE", "servers_storage.yaml")
+# 1 = un solo round trip por host; 0 = un `systemctl is-active` por servicio
+SERVICES_BATCH_MODE = os.getenv("SERVICES_BATCH_MODE", "1") == "1"
 
+SHOW_PROPERTIES = ["ActiveState", "SubState", "MainPID", "NRestarts"]
 
-def send_slack_message(message: str) -> None:
-    """Envía un mensaje a Slack usando un Webhook."""
-    if not SLACK_WEBHOOK_URL:
-        print("[WARNING] SLACK_WEBHOOK_URL no está configurado. No se enviará a Slack.")
-        return
+# Estados que se listan: además de los activos, los caídos (failed) y los que están
+# reintentando arrancar (activating/auto-restart), para que no desaparezcan del reporte
+LIST_STATES = "active,activating,failed"
 
-    try:
-        resp = requests.post(
-            SLACK_WEBHOOK_URL,
-            json={"text": message},
-            timeout=5,
-        )
-        if resp.status_code == 200:
-            print("[OK] Resumen enviado a Slack.")
-        else:
-            print(f"[ERROR] Slack respondió con status {resp.status_code}: {resp.text}")
-    except Exception as e:
-        print(f"[ERROR] No se pudo enviar mensaje a Slack: {e}")
+# Descubre los servicios y trae sus propiedades en un solo comando
+SERVICES_COMMAND = (
+    f"units=$(systemctl list-units --type=service --state={LIST_STATES} --plain --no-legend "
+    "| awk '{print $1}'); "
+    f'[ -n "$units" ] && systemctl show -p Id,{",".join(SHOW_PROPERTIES)} $units'
+)
+
+ALERT_STORE = AlertStateStore()
+
+EXCLUDED_PREFIXES = [
+    "systemd", "dbus", "polkit", "NetworkManager", "snapd", "accounts-daemon",
+    "cron", "ssh", "haveged", "rngd", "user@", "avahi", "syslog"
+]
 
 
 def load_servers_from_yaml():
@@ -53,63 +56,189 @@ def load_servers_from_yaml():
     return servers
 
 
-def check_services_status_auto(host: str, user: str, password: str, port: int = 22) -> dict[str, str]:
+def _is_excluded(svc: str) -> bool:
+    """Indica si el servicio es irrelevante o del sistema."""
+    return any(svc.startswith(prefix) for prefix in EXCLUDED_PREFIXES)
+
+
+def parse_systemctl_show(output: str) -> dict[str, dict[str, str]]:
     """
-    Descubre servicios activos (systemctl) y monitorea su estado.
-    Filtra servicios irrelevantes o del sistema.
+    Parsea la salida de `systemctl show -p ...` sobre varias unidades.
+    Cada unidad es un bloque de líneas `Clave=Valor` separado por una línea vacía.
     """
+    services: dict[str, dict[str, str]] = {}
+
+    for block in output.strip().split("\n\n"):
+        info = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition("=")
+            if sep:
+                info[key.strip()] = value.strip()
 
-    excluded_prefixes = [
-        "systemd", "dbus", "polkit", "NetworkManager", "snapd", "accounts-daemon",
-        "cron", "ssh", "haveged", "rngd", "user@", "avahi", "syslog"
-    ]
+        unit = info.pop("Id", "")
+        if not unit.endswith(".service"):
+            continue
 
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        svc = unit.replace(".service", "")
+        if _is_excluded(svc):
+            continue
 
-    try:
-        print(f"[INFO] Conectando a {user}@{host}:{port} ...")
-        client.connect(hostname=host, port=port, username=user,
-                       password=password, timeout=10)
+        services[svc] = info
+
+    return services
+
+
+def _check_services_batched(client, host: str) -> dict[str, dict[str, str]]:
+    """Descubre servicios (activos o con problemas) y obtiene su estado en un solo `exec_command`."""
+    stdin, stdout, stderr = client.exec_command(SERVICES_COMMAND)
+    output = stdout.read().decode()
 
-        # Auto-descubrimiento de servicios activos
-        discover_cmd = "systemctl list-units --type=service --state=active"
-        stdin, stdout, stderr = client.exec_command(discover_cmd)
-        output = stdout.read().decode().strip()
+    services = parse_systemctl_show(output)
+    print(f"[INFO] {len(services)} servicios detectados en {host}")
+    return services
 
-        services = []
-        for line in output.splitlines():
-            if ".service" not in line:
-                continue
 
-            svc = line.split()[0].replace(".service", "")
+def _check_services_one_by_one(client, host: str) -> dict[str, dict[str, str]]:
+    """Ruta original: descubre servicios y consulta `systemctl is-active` uno por uno."""
+    # Auto-descubrimiento de servicios activos o con problemas
+    discover_cmd = f"systemctl list-units --type=service --state={LIST_STATES} --plain"
+    stdin, stdout, stderr = client.exec_command(discover_cmd)
+    output = stdout.read().decode().strip()
+
+    services = []
+    for line in output.splitlines():
+        if ".service" not in line:
+            continue
+
+        svc = line.split()[0].replace(".service", "")
+
+        # Filtrar servicios irrelevantes del sistema
+        if _is_excluded(svc):
+            continue
 
-            # Filtrar servicios irrelevantes del sistema
-            if any(svc.startswith(prefix) for prefix in excluded_prefixes):
-                continue
+        services.append(svc)
 
-            services.append(svc)
+    print(f"[INFO] {len(services)} servicios detectados en {host}")
 
-        print(f"[INFO] {len(services)} servicios detectados en {host}")
+    results = {}
 
-        results = {}
+    # Ahora consulta estado uno por uno (si en el futuro queremos saber si falla)
+    for svc in services:
+        cmd = f"systemctl is-active {svc}"
+        stdin, stdout, stderr = client.exec_command(cmd)
+        status = stdout.read().decode().strip() or "unknown"
+        results[svc] = {"ActiveState": status}
 
-        # Ahora consulta estado uno por uno (si en el futuro queremos saber si falla)
-        for svc in services:
-            cmd = f"systemctl is-active {svc}"
-            stdin, stdout, stderr = client.exec_command(cmd)
-            status = stdout.read().decode().strip() or "unknown"
-            results[svc] = status
+    return results
 
-        return results
+
+def check_services_details(host: str, user: str, password: str, port: int = 22,
+                           batch: bool = SERVICES_BATCH_MODE) -> dict[str, dict[str, str]]:
+    """
+    Descubre servicios activos o con problemas (systemctl) y obtiene su estado detallado.
+    Filtra servicios irrelevantes o del sistema.
+
+    En modo batch (por defecto) todo se resuelve en un único round trip y cada
+    servicio incluye ActiveState, SubState, MainPID y NRestarts. Con batch=False
+    se usa la ruta original de un `systemctl is-active` por servicio, que solo
+    entrega ActiveState.
+    """
+    try:
+        client = get_ssh_client(host, user, password, port)
+
+        if batch:
+            return _check_services_batched(client, host)
+        return _check_services_one_by_one(client, host)
 
     except Exception as e:
+        discard_ssh_client(host, user, port)
         print(f"[ERROR] Fallo en {host}: {e}")
         return {}
-    finally:
-        client.close()
 
 
+def check_services_status_auto(host: str, user: str, password: str, port: int = 22,
+                               batch: bool = SERVICES_BATCH_MODE) -> dict[str, str]:
+    """
+    Descubre servicios activos o con problemas (systemctl) y monitorea su estado.
+    Filtra servicios irrelevantes o del sistema.
+    """
+    details = check_services_details(host, user, password, port, batch)
+    return {svc: info.get("ActiveState") or "unknown" for svc, info in details.items()}
+
+
+def format_service_status(svc: str, info: dict[str, str]) -> str:
+    """Formatea un servicio con su estado y, si existen, SubState, PID y reinicios."""
+    line = f"- {svc}: `{info.get('ActiveState') or 'unknown'}`"
+
+    extras = []
+    if info.get("SubState"):
+        extras.append(info["SubState"])
+    if info.get("MainPID") not in (None, "", "0"):
+        extras.append(f"pid {info['MainPID']}")
+    if info.get("NRestarts") not in (None, "", "0"):
+        extras.append(f"{info['NRestarts']} reinicios")
+
+    if extras:
+        line += f" ({', '.join(extras)})"
+    return line
+
+
+def report_services(name: str, host: str, details: dict[str, dict[str, str]]) -> None:
+    """Muestra el estado de los servicios de un servidor y alerta a Slack si cambió."""
+    ok_services: list[tuple[str, dict[str, str]]] = []
+    bad_services: list[tuple[str, dict[str, str]]] = []
+    # Solo lo que cambió de estado (o toca recordar) se envía a Slack
+    to_notify: list[tuple[str, dict[str, str]]] = []
+    recovered: list[tuple[str, dict[str, str]]] = []
+
+    for service, info in details.items():
+        if info.get("ActiveState") == "active":
+            ok_services.append((service, info))
+            decision = ALERT_STORE.evaluate(host, f"service:{service}", STATE_OK)
+        else:
+            bad_services.append((service, info))
+            fingerprint = f"{info.get('ActiveState')}/{info.get('SubState', '')}"
+            decision = ALERT_STORE.evaluate(host, f"service:{service}", STATE_CRIT, fingerprint)
+
+        if decision == NOTIFY_RECOVERED:
+            recovered.append((service, info))
+        elif decision is not None:
+            to_notify.append((service, info))
+
+    header = "🖥️ *Estado de servicios remotos*"
+    host_info = f"📍 Servidor: `{host}` ({name})"
+
+    lines: list[str] = []
+
+    if bad_services:
+        lines.append("\n🔴 *Servicios con problemas:*")
+        for svc, info in bad_services:
+            lines.append(format_service_status(svc, info))
+
+    if ok_services:
+        lines.append("\n🟢 *Servicios OK:*")
+        for svc, info in ok_services:
+            lines.append(format_service_status(svc, info))
+
+    message = f"{header}\n{host_info}\n" + "\n".join(lines)
+
+    # Consola
+    print(message)
+
+    # Slack: solo problemas nuevos, recordatorios o recuperaciones
+    if to_notify or recovered:
+        alert_lines = [format_service_status(svc, info) for svc, info in to_notify]
+        # Sin problemas nuevos el título ya dice que son recuperaciones
+        if recovered and to_notify:
+            alert_lines.append("\n✅ *Servicios recuperados:*")
+        alert_lines.extend(format_service_status(svc, info) for svc, info in recovered)
+        title = "⚠️ *Alerta de servicios con problemas*" if to_notify else "✅ *Servicios recuperados*"
+        send_slack_message(f"{title}\n{host_info}\n" + "\n".join(alert_lines))
+    elif bad_services:
+        print("[INFO] Alerta ya notificada y sin cambios, no se reenvía a Slack.")
+    else:
+        print("Todos los servicios están activos en este servidor. ✅")
+
 
 def main():
     servers = load_servers_from_yaml()
@@ -129,51 +258,15 @@ def main():
 
         print(f"\n===== Revisando servicios en: {name} ({host}) =====")
 
-        status_map = check_services_status_auto(host, user, password, port)
+        details = check_services_details(host, user, password, port)
 
-        if not status_map:
+        if not details:
             print(f"No se obtuvieron estados de servicios para {name}.")
             continue
 
-        ok_services: list[tuple[str, str]] = []
-        bad_services: list[tuple[str, str]] = []
-
-        for service, status in status_map.items():
-            if status == "active":
-                ok_services.append((service, status))
-            else:
-                bad_services.append((service, status))
-
-        header = "🖥️ *Estado de servicios remotos*"
-        host_info = f"📍 Servidor: `{host}` ({name})"
-
-        lines: list[str] = []
-
-        if bad_services:
-            lines.append("\n🔴 *Servicios con problemas:*")
-            for svc, st in bad_services:
-                lines.append(f"- {svc}: `{st}`")
-
-        if ok_services:
-            lines.append("\n🟢 *Servicios OK:*")
-            for svc, st in ok_services:
-                lines.append(f"- {svc}: `{st}`")
-
-        message = f"{header}\n{host_info}\n" + "\n".join(lines)
-
-        # Consola
-        print(message)
-
-        # Slack: solo si hay problemas
-        if bad_services:
-            alert_msg = (
-                f"⚠️ *Alerta de servicios con problemas*\n{host_info}\n" +
-                "\n".join(f"- {svc}: `{st}`" for svc, st in bad_services)
-            )
-            send_slack_message(alert_msg)
-        else:
-            print("Todos los servicios están activos en este servidor. ✅")
+        report_services(name, host, details)
 
+    ALERT_STORE.save()
 
 
 if __name__ == "__main__":
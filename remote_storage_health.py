@@ -5,66 +5,163 @@ remote_storage_health.py
 Se conecta a un servidor Linux remoto vía SSH, verifica el uso de disco
 en los sistemas de archivos y envía una notificación a Slack si alguno
 supera el 80% de uso.
+
+Cada medición (bytes exactos de `df -B1`) se guarda en el historial de
+storage_history.py, y con la tendencia de las últimas mediciones se avisa
+también cuando un montaje va a superar el umbral dentro de
+STORAGE_FORECAST_HORIZON segundos, antes de que ocurra. El uso de inodos se
+revisa con el mismo umbral.
 """
 
 import os
-import paramiko
-import requests
+import time
 import yaml
 from dotenv import load_dotenv
 
+from alert_state import NOTIFY_RECOVERED, STATE_CRIT, STATE_OK, AlertStateStore
+from slack_notifier import send_slack_message
+from storage_history import StorageHistory, format_duration
+from ssh_pool import discard_ssh_client, get_ssh_client
+
 load_dotenv()
 
 CONFIG_FILE = os.getenv("STORAGE_CONFIG_FILE", "servers_storage.yaml")
 
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 THRESHOLD = float(os.getenv("STORAGE_THRESHOLD", "80"))
+INODE_THRESHOLD = float(os.getenv("STORAGE_INODE_THRESHOLD", str(THRESHOLD)))
+# Avisar si, al ritmo actual, el umbral se alcanza dentro de este plazo (segundos)
+FORECAST_HORIZON = float(os.getenv("STORAGE_FORECAST_HORIZON", "86400"))
+FORECAST_MIN_POINTS = int(os.getenv("STORAGE_FORECAST_MIN_POINTS", "3"))
 
+DF_COMMAND = "df -B1 --output=source,size,used,avail,ipcent,target"
 
-def send_slack_alert(message: str):
-    if not SLACK_WEBHOOK_URL:
-        print("[ERROR] SLACK_WEBHOOK_URL no está configurado.")
-        return
+ALERT_STORE = AlertStateStore()
+HISTORY = StorageHistory()
 
-    try:
-        requests.post(SLACK_WEBHOOK_URL, json={"text": message}, timeout=5)
-        print("[OK] Alerta enviada a Slack")
-    except Exception as e:
-        print(f"[ERROR] No se pudo enviar alerta Slack: {e}")
 
+def parse_df_output(output: str) -> list[dict]:
+    """
+    Parsea la salida de DF_COMMAND. Cada filesystem es un dict con fs, size,
+    used y avail en bytes, used_percent (como lo calcula df: usado / (usado +
+    disponible), sin redondear), inode_percent (None si el filesystem no
+    tiene inodos) y mount.
+    """
+    filesystems = []
 
-def get_remote_storage_status(host: str, user: str, password: str, port: int = 22):
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    for line in output.splitlines()[1:]:
+        # El punto de montaje es la última columna y puede contener espacios
+        parts = line.split(None, 5)
+        if len(parts) != 6:
+            continue
 
+        fs, size, used, avail, ipcent, mount = parts
+        try:
+            size, used, avail = int(size), int(used), int(avail)
+        except ValueError:
+            continue
+
+        usable = used + avail
+        filesystems.append({
+            "fs": fs,
+            "size": size,
+            "used": used,
+            "avail": avail,
+            "used_percent": used * 100 / usable if usable else 0.0,
+            "inode_percent": float(ipcent.rstrip("%")) if ipcent.rstrip("%").isdigit() else None,
+            "mount": mount,
+        })
+
+    return filesystems
+
+
+def get_remote_storage_status(host: str, user: str, password: str, port: int = 22):
     try:
-        print(f"[INFO] Conectando a {user}@{host}:{port}")
-        client.connect(
-            hostname=host,
-            port=port,
-            username=user,
-            password=password,
-            timeout=10,
-        )
-
-        stdin, stdout, stderr = client.exec_command("df -h --output=source,pcent,target")
+        client = get_ssh_client(host, user, password, port)
+
+        stdin, stdout, stderr = client.exec_command(DF_COMMAND)
         output = stdout.read().decode().strip()
-        client.close()
     except Exception as e:
+        discard_ssh_client(host, user, port)
         print(f"[ERROR] Fallo al conectar o ejecutar comando en {host}: {e}")
         return []
 
-    lines = output.splitlines()[1:]
-    filesystems = []
+    return parse_df_output(output)
 
-    for line in lines:
-        parts = line.split()
-        if len(parts) == 3:
-            fs, used, mount = parts
-            used_percent = float(used.replace('%', ''))
-            filesystems.append((fs, used_percent, mount))
+def report_storage(name: str, host: str, filesystems: list[dict], threshold: float = THRESHOLD) -> None:
+    """Evalúa los filesystems de un servidor, muestra el estado y alerta a Slack si cambió."""
+    critical = []
+    normal = []
+    # Solo lo que cambió de estado (o toca recordar) se envía a Slack
+    to_notify = []
+    recovered = []
+
+    now = time.time()
+
+    for disk in filesystems:
+        fs, used, mount = disk["fs"], disk["used_percent"], disk["mount"]
+        if any(excluded in fs for excluded in ["tmpfs", "udev", "overlay"]):
+            continue
+
+        HISTORY.add(host, mount, now, disk["used"], disk["used"] + disk["avail"])
+        forecast = HISTORY.forecast(host, mount, threshold, FORECAST_MIN_POINTS)
+
+        # El umbral se compara con el porcentaje exacto; solo se redondea al mostrarlo
+        entry = f"{mount}: {used:.1f}%"
+        if disk["inode_percent"] is not None:
+            entry += f" (inodos {disk['inode_percent']:g}%)"
+
+        growing = (forecast is not None and forecast.seconds_to_threshold is not None
+                   and forecast.seconds_to_threshold <= FORECAST_HORIZON)
+        if growing:
+            entry += (f" → {threshold:g}% en ~{format_duration(forecast.seconds_to_threshold)}"
+                      f", lleno en ~{format_duration(forecast.seconds_to_full)}")
+        elif forecast is not None and forecast.seconds_to_full is not None and used > threshold:
+            entry += f" → lleno en ~{format_duration(forecast.seconds_to_full)}"
+
+        inodes_high = disk["inode_percent"] is not None and disk["inode_percent"] > INODE_THRESHOLD
+
+        # El pronóstico sigue en alerta mientras el disco esté sobre el umbral,
+        # así no se "recupera" justo cuando se cumple lo que anunciaba
+        checks = {
+            f"disk:{mount}": used > threshold,
+            f"forecast:{mount}": growing or used > threshold,
+            f"inodes:{mount}": inodes_high,
+        }
+        failing = any(checks.values())
+        if failing:
+            critical.append(entry)
+        else:
+            normal.append(entry)
+
+        decisions = [
+            ALERT_STORE.evaluate(host, check, STATE_CRIT if bad else STATE_OK, now=now)
+            for check, bad in checks.items()
+        ]
+        if any(d is not None and d != NOTIFY_RECOVERED for d in decisions):
+            to_notify.append(entry)
+        elif NOTIFY_RECOVERED in decisions and not failing:
+            recovered.append(entry)
+
+    host_info = f"📍 Servidor: `{host}` ({name})"
+    header = "📦 *Estado de Storage*"
+
+    details = "\n".join(
+        [f"🔴 {e}" for e in critical] +
+        [f"🟢 {e}" for e in normal]
+    )
+
+    message = f"{header}\n{host_info}\n\n{details}"
+    print(message)
+
+    if to_notify or recovered:
+        lines = [f"🔴 {e}" for e in to_notify] + [f"✅ {e} (recuperado)" for e in recovered]
+        title = "⚠️ *Alerta de almacenamiento crítico*" if to_notify else "✅ *Almacenamiento recuperado*"
+        send_slack_message(f"{title}\n{host_info}\n\n" + "\n".join(lines))
+    elif critical:
+        print("[INFO] Alerta ya notificada y sin cambios, no se reenvía a Slack.")
+    else:
+        print("Sin alertas para este servidor. Todo OK 👍")
 
-    return filesystems
 
 def load_servers_from_yaml():
     if not os.path.exists(CONFIG_FILE):
@@ -102,38 +199,10 @@ def main():
             print(f"No se pudo obtener información de almacenamiento para {name}.")
             continue
 
-        critical = []
-        normal = []
+        report_storage(name, host, filesystems, threshold)
 
-        for fs, used, mount in filesystems:
-            if any(excluded in fs for excluded in ["tmpfs", "udev", "overlay"]):
-                continue
-
-            entry = f"{mount}: {used}%"
-
-            if used > threshold:
-                critical.append(entry)
-            else:
-                normal.append(entry)
-
-        host_info = f"📍 Servidor: `{host}` ({name})"
-        header = "📦 *Estado de Storage*"
-
-        details = "\n".join(
-            [f"🔴 {e}" for e in critical] +
-            [f"🟢 {e}" for e in normal]
-        )
-
-        message = f"{header}\n{host_info}\n\n{details}"
-        print(message)
-
-        if critical:
-            send_slack_alert(
-                f"⚠️ *Alerta de almacenamiento crítico*\n{host_info}\n\n" +
-                "\n".join(f"🔴 {e}" for e in critical)
-            )
-        else:
-            print("Sin alertas para este servidor. Todo OK 👍")
+    ALERT_STORE.save()
+    HISTORY.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+slack_notifier.py
+
+Notificador de Slack compartido por los scripts de monitoreo.
+
+En vez de un `requests.post` bloqueante por alerta, los mensajes se encolan y
+un hilo en segundo plano los envía por una única `requests.Session` (la
+conexión TLS se reutiliza):
+
+  - Agrupa los mensajes que llegan dentro de SLACK_COALESCE_WINDOW segundos
+    en un solo mensaje (sin pasar de SLACK_MAX_MESSAGE_CHARS caracteres).
+  - Limita la tasa de envío con un token bucket (SLACK_RATE_PER_SEC, SLACK_BURST).
+  - Ante un 429 espera lo que indique `Retry-After` y reintenta; ante errores
+    de red o 5xx reintenta con espera exponencial (SLACK_MAX_RETRIES).
+  - Al terminar el proceso vacía la cola (atexit), esperando a lo más
+    SLACK_FLUSH_TIMEOUT segundos.
+
+Para probar sin Slack real, apuntar SLACK_WEBHOOK_URL a slack_webhook_stub.py.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+COALESCE_WINDOW = float(os.getenv("SLACK_COALESCE_WINDOW", "2"))  # segundos, 0 = solo lo que ya esté en cola
+RATE_PER_SEC = float(os.getenv("SLACK_RATE_PER_SEC", "1"))  # límite de Slack para webhooks: ~1 msg/s
+BURST = int(os.getenv("SLACK_BURST", "3"))
+MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "3"))
+FLUSH_TIMEOUT = float(os.getenv("SLACK_FLUSH_TIMEOUT", "30"))  # segundos
+MAX_MESSAGE_CHARS = int(os.getenv("SLACK_MAX_MESSAGE_CHARS", "3500"))
+REQUEST_TIMEOUT = 5
+
+MESSAGE_SEPARATOR = "\n\n────────────\n\n"
+_STOP = object()  # en la cola: enviar lo anterior (y lo que llegue mientras) y terminar el hilo de envío
+
+
+class TokenBucket:
+    """Token bucket: permite ráfagas de hasta `burst` envíos y en promedio `rate` por segundo."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def acquire(self) -> None:
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        wait = self._paused_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        if self.rate <= 0:
+            return
+
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            time.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Bloquea los envíos por `seconds` segundos (p. ej. tras un 429 con Retry-After)."""
+        self._paused_until = time.monotonic() + seconds
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+
+class SlackNotifier:
+    """Envía mensajes a un webhook de Slack desde un hilo en segundo plano."""
+
+    def __init__(self, webhook_url: str | None = SLACK_WEBHOOK_URL, coalesce_window: float = COALESCE_WINDOW,
+                 rate_per_sec: float = RATE_PER_SEC, burst: int = BURST, max_retries: int = MAX_RETRIES,
+                 max_message_chars: int = MAX_MESSAGE_CHARS):
+        self.webhook_url = webhook_url
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.max_message_chars = max_message_chars
+        self._bucket = TokenBucket(rate_per_sec, burst)
+        self._queue: queue.Queue = queue.Queue()
+        self._session: requests.Session | None = None
+        self._worker: threading.Thread | None = None
+        # Protege _worker, _closing y los `put` en la cola: el hilo decide terminar
+        # con la cola vacía bajo este lock, así ningún mensaje queda sin hilo que lo envíe
+        self._lock = threading.Lock()
+        self._closing = False
+        self._warned = False
+
+    def send(self, message: str) -> None:
+        """Encola un mensaje; no bloquea."""
+        if not self.webhook_url:
+            if not self._warned:
+                print("[WARNING] SLACK_WEBHOOK_URL no está configurado. No se enviará a Slack.")
+                self._warned = True
+            return
+
+        with self._lock:
+            self._ensure_worker()
+            self._queue.put(message)
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """Envía de inmediato lo encolado y espera a que termine; indica si alcanzó a vaciar la cola."""
+        done = threading.Event()
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                return True
+            self._queue.put(done)
+
+        if not done.wait(timeout):
+            print(f"[WARNING] Quedaron mensajes de Slack sin enviar tras {timeout:.0f}s.")
+            return False
+        return True
+
+    def close(self, timeout: float = FLUSH_TIMEOUT) -> None:
+        """
+        Vacía la cola (también lo que se encole mientras tanto), detiene el
+        hilo de envío, que cierra la sesión al terminar. Un `send` posterior
+        vuelve a levantar el hilo.
+        """
+        with self._lock:
+            worker = self._worker
+            if worker is None or not worker.is_alive():
+                self._close_session()
+                return
+            if not self._closing:
+                self._closing = True
+                self._queue.put(_STOP)
+
+        worker.join(timeout)
+        if worker.is_alive():
+            print(f"[WARNING] Quedaron mensajes de Slack sin enviar tras {timeout:.0f}s.")
+
+    def _ensure_worker(self) -> None:
+        """Levanta el hilo de envío si no está corriendo; se llama con `_lock` tomado."""
+        if self._worker is None or not self._worker.is_alive():
+            self._closing = False
+            self._worker = threading.Thread(target=self._run, name="slack-notifier", daemon=True)
+            self._worker.start()
+
+    def _close_session(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _run(self) -> None:
+        stopping = False
+        while True:
+            if stopping:
+                with self._lock:
+                    if self._queue.empty():
+                        # Nada quedó después del _STOP: el próximo `send` levanta otro hilo
+                        self._close_session()
+                        self._worker = None
+                        self._closing = False
+                        return
+
+            item = self._queue.get()
+            pending: list[str] = []
+            flush_events: list[threading.Event] = []
+
+            # Agrupar lo que llegue durante la ventana (un flush o close corta la espera;
+            # tras un close se envía solo lo que ya está en cola)
+            deadline = time.monotonic() + (0 if stopping else self.coalesce_window)
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    flush_events.append(item)
+                    break
+                pending.append(item)
+
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            for batch in self._batches(pending):
+                self._post(batch)
+
+            for event in flush_events:
+                event.set()
+
+    def _batches(self, messages: list[str]) -> list[str]:
+        """Une mensajes en lotes que no superan max_message_chars (un mensaje largo va solo)."""
+        batches: list[str] = []
+        current = ""
+        for message in messages:
+            if current and len(current) + len(MESSAGE_SEPARATOR) + len(message) > self.max_message_chars:
+                batches.append(current)
+                current = ""
+            current = f"{current}{MESSAGE_SEPARATOR}{message}" if current else message
+        if current:
+            batches.append(current)
+        return batches
+
+    def _post(self, text: str) -> None:
+        if self._session is None:
+            self._session = requests.Session()
+
+        for attempt in range(self.max_retries + 1):
+            self._bucket.acquire()
+            try:
+                resp = self._session.post(self.webhook_url, json={"text": text}, timeout=REQUEST_TIMEOUT)
+            except requests.RequestException as e:
+                print(f"[ERROR] No se pudo enviar mensaje a Slack (intento {attempt + 1}): {e}")
+                time.sleep(2 ** attempt)
+                continue
+
+            if resp.status_code == 200:
+                print("[OK] Mensaje enviado a Slack.")
+                return
+
+            if resp.status_code == 429:
+                retry_after = _retry_after_seconds(resp)
+                print(f"[WARNING] Slack limitó el envío (429), se reintenta en {retry_after:.0f}s.")
+                self._bucket.pause(retry_after)
+                continue
+
+            if resp.status_code >= 500:
+                print(f"[ERROR] Slack respondió con status {resp.status_code}, se reintenta.")
+                time.sleep(2 ** attempt)
+                continue
+
+            print(f"[ERROR] Slack respondió con status {resp.status_code}: {resp.text}")
+            return
+
+        print(f"[ERROR] Se descartó un mensaje de Slack tras {self.max_retries + 1} intentos.")
+
+
+def _retry_after_seconds(resp: requests.Response, default: float = 1.0) -> float:
+    try:
+        return max(float(resp.headers.get("Retry-After", default)), 0.0)
+    except ValueError:
+        return default
+
+
+_default_notifier = SlackNotifier()
+atexit.register(_default_notifier.close)
+
+
+def send_slack_message(message: str) -> None:
+    """Encola un mensaje para el webhook configurado en SLACK_WEBHOOK_URL."""
+    _default_notifier.send(message)
+
+
+def flush_slack_messages(timeout: float = FLUSH_TIMEOUT) -> bool:
+    """Espera a que se envíen los mensajes encolados."""
+    return _default_notifier.flush(timeout)
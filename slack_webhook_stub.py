@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+slack_webhook_stub.py
+
+Webhook de Slack falso para pruebas locales de slack_notifier.py.
+
+Escucha en http://127.0.0.1:<puerto>/, imprime cada mensaje recibido y, con
+--rate-limit N, responde 429 con `Retry-After` cuando se reciben más de N
+mensajes por segundo, como hace Slack.
+
+Uso:
+    python slack_webhook_stub.py --port 8099 --rate-limit 1
+    SLACK_WEBHOOK_URL=http://127.0.0.1:8099/ python remote_storage_health.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SlackStubHandler(BaseHTTPRequestHandler):
+    rate_limit = 0  # mensajes por segundo, 0 = sin límite
+    retry_after = 1
+    _lock = threading.Lock()
+    _window_start = 0.0
+    _window_count = 0
+    received = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if self._over_limit():
+            self._reply(429, "rate_limited", {"Retry-After": str(self.retry_after)})
+            print("[STUB] 429 rate_limited")
+            return
+
+        try:
+            text = json.loads(body).get("text", "")
+        except ValueError:
+            self._reply(400, "invalid_payload")
+            return
+
+        with SlackStubHandler._lock:
+            SlackStubHandler.received += 1
+            count = SlackStubHandler.received
+        print(f"[STUB] Mensaje #{count} ({len(text)} caracteres):\n{text}\n")
+        self._reply(200, "ok")
+
+    def _over_limit(self) -> bool:
+        if self.rate_limit <= 0:
+            return False
+
+        with SlackStubHandler._lock:
+            now = time.monotonic()
+            if now - SlackStubHandler._window_start >= 1:
+                SlackStubHandler._window_start = now
+                SlackStubHandler._window_count = 0
+            SlackStubHandler._window_count += 1
+            return SlackStubHandler._window_count > self.rate_limit
+
+    def _reply(self, status: int, text: str, headers: dict[str, str] | None = None) -> None:
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook de Slack falso para pruebas locales.")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--rate-limit", type=int, default=0, help="mensajes por segundo antes de responder 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="valor del header Retry-After en los 429")
+    args = parser.parse_args()
+
+    SlackStubHandler.rate_limit = args.rate_limit
+    SlackStubHandler.retry_after = args.retry_after
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), SlackStubHandler)
+    print(f"[INFO] Webhook de prueba escuchando en http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+ssh_pool.py
+
+Pool compartido de conexiones SSH para los scripts remote_*.
+
+Mantiene vivas las conexiones por (host, port, user), de modo que varias
+consultas al mismo servidor (storage, servicios, logs, docker) reutilizan un
+único transporte TCP/SSH y abren solo canales `exec_command` nuevos sobre él.
+Las conexiones inactivas se cierran por antigüedad (LRU) y antes de reutilizar
+una conexión se verifica que siga viva.
+"""
+
+import atexit
+import codecs
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import paramiko
+from dotenv import load_dotenv
+
+load_dotenv()
+
+POOL_MAX_SIZE = int(os.getenv("SSH_POOL_MAX_SIZE", "50"))
+POOL_IDLE_TIMEOUT = float(os.getenv("SSH_POOL_IDLE_TIMEOUT", "300"))  # segundos
+KEEPALIVE_INTERVAL = int(os.getenv("SSH_KEEPALIVE_INTERVAL", "30"))  # segundos, 0 = desactivado
+READ_CHUNK_SIZE = 64 * 1024
+
+# Terminadores que reconoce str.splitlines(); cada línea termina en a lo más uno de ellos
+_LINE_BREAKS = "\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _is_alive(client: paramiko.SSHClient) -> bool:
+    """Comprueba que el transporte siga activo y autenticado."""
+    transport = client.get_transport()
+    if transport is None or not transport.is_active() or not transport.is_authenticated():
+        return False
+
+    try:
+        # Mensaje SSH_MSG_IGNORE: barato y falla si el socket está roto
+        transport.send_ignore()
+    except Exception:
+        return False
+    return True
+
+
+class SSHConnectionPool:
+    """
+    Pool de clientes SSH indexado por (host, port, user).
+
+    Es seguro entre hilos: dos hilos que piden el mismo host esperan a una
+    sola conexión en vez de abrir dos. `max_size` debe ser mayor o igual al
+    número de hilos concurrentes para no cerrar clientes en uso.
+    """
+
+    def __init__(self, max_size: int = POOL_MAX_SIZE, idle_timeout: float = POOL_IDLE_TIMEOUT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._clients: OrderedDict[tuple[str, int, str], tuple[paramiko.SSHClient, float]] = OrderedDict()
+        self._key_locks: dict[tuple[str, int, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, host: str, user: str, password: str, port: int = 22,
+                   timeout: float = 10) -> paramiko.SSHClient:
+        """Devuelve un cliente conectado, reutilizando uno vivo si existe."""
+        key = (host, int(port), user)
+
+        with self._lock:
+            expired = self._pop_idle_locked(time.monotonic())
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        self._close_clients(expired)
+
+        with key_lock:
+            with self._lock:
+                entry = self._clients.pop(key, None)
+
+            if entry is not None:
+                client = entry[0]
+                if _is_alive(client):
+                    self._store(key, client)
+                    return client
+                print(f"[INFO] Conexión SSH a {user}@{host}:{port} expirada, se reconecta.")
+                client.close()
+
+            client = self._connect(host, user, password, int(port), timeout)
+            self._store(key, client)
+            return client
+
+    def discard(self, host: str, user: str, port: int = 22) -> None:
+        """Cierra y saca del pool la conexión de un host (por ejemplo, tras un error)."""
+        with self._lock:
+            entry = self._clients.pop((host, int(port), user), None)
+        if entry is not None:
+            entry[0].close()
+
+    def close_all(self) -> None:
+        """Cierra todas las conexiones del pool."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        self._close_clients(clients)
+
+    def _connect(self, host: str, user: str, password: str, port: int, timeout: float) -> paramiko.SSHClient:
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        print(f"[INFO] Conectando a {user}@{host}:{port} ...")
+        try:
+            client.connect(
+                hostname=host,
+                port=port,
+                username=user,
+                password=password,
+                timeout=timeout,
+                banner_timeout=timeout,
+                auth_timeout=timeout,
+            )
+        except Exception:
+            client.close()
+            raise
+
+        if KEEPALIVE_INTERVAL > 0:
+            client.get_transport().set_keepalive(KEEPALIVE_INTERVAL)
+        return client
+
+    def _store(self, key: tuple[str, int, str], client: paramiko.SSHClient) -> None:
+        """Guarda el cliente como el más reciente y desaloja los más antiguos si se excede max_size."""
+        with self._lock:
+            self._clients[key] = (client, time.monotonic())
+            self._clients.move_to_end(key)
+
+            evicted = []
+            while len(self._clients) > self.max_size:
+                _, (old_client, _) = self._clients.popitem(last=False)
+                evicted.append(old_client)
+        self._close_clients(evicted)
+
+    def _pop_idle_locked(self, now: float) -> list[paramiko.SSHClient]:
+        """Saca las conexiones sin uso por más de idle_timeout (requiere self._lock)."""
+        expired = []
+        # OrderedDict en orden LRU: basta con recorrer desde el más antiguo
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used <= self.idle_timeout:
+                break
+            del self._clients[key]
+            expired.append(client)
+        return expired
+
+    @staticmethod
+    def _close_clients(clients: list[paramiko.SSHClient]) -> None:
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+def iter_remote_chunks(stream, chunk_size: int = READ_CHUNK_SIZE):
+    """
+    Itera la salida de un comando remoto en bloques de bytes que terminan en un
+    salto de línea (el último bloque puede no terminar en uno). Sirve para
+    procesar la salida por bloques de líneas completas sin decodificarla.
+    """
+    pending = b""
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            if pending:
+                yield pending
+            return
+
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            pending += chunk
+            continue
+
+        yield pending + chunk[:cut]
+        pending = chunk[cut:]
+
+
+def iter_remote_lines(stream, chunk_size: int = READ_CHUNK_SIZE, errors: str = "ignore"):
+    """
+    Itera las líneas de la salida de un comando remoto (p. ej. el `stdout` de
+    `exec_command`) sin cargarla completa en memoria.
+
+    Lee bloques de `chunk_size` bytes y los decodifica con un decodificador UTF-8
+    incremental, por lo que un carácter multibyte partido entre dos bloques se
+    decodifica bien. Las líneas se cortan igual que con `str.splitlines()`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors=errors)
+    pending = ""
+
+    while True:
+        chunk = stream.read(chunk_size)
+        final = not chunk
+        pending += decoder.decode(chunk, final=final)
+
+        lines = pending.splitlines(True)
+        # La última línea puede estar incompleta (o ser un "\r" de un "\r\n" partido)
+        pending = "" if final or not lines else lines.pop()
+
+        for line in lines:
+            yield line.rstrip(_LINE_BREAKS)
+
+        if final:
+            return
+
+
+_default_pool = SSHConnectionPool()
+atexit.register(_default_pool.close_all)
+
+
+def get_ssh_client(host: str, user: str, password: str, port: int = 22, timeout: float = 10) -> paramiko.SSHClient:
+    """Obtiene un cliente SSH del pool compartido."""
+    return _default_pool.get_client(host, user, password, port, timeout)
+
+
+def discard_ssh_client(host: str, user: str, port: int = 22) -> None:
+    """Descarta la conexión de un host del pool compartido."""
+    _default_pool.discard(host, user, port)
+
+
+def close_all_ssh_clients() -> None:
+    """Cierra todas las conexiones del pool compartido."""
+    _default_pool.close_all()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+storage_history.py
+
+Historial de uso de disco por (host, punto de montaje) y pronóstico de cuándo
+se llena, para remote_storage_health.py.
+
+El historial es un archivo binario de solo agregado: cada medición es un
+registro fijo de 40 bytes (huella de host+montaje, timestamp, bytes usados,
+tamaño). Al superar el doble de lo que se conserva, el archivo se reescribe
+con solo las últimas STORAGE_HISTORY_POINTS mediciones de cada montaje.
+
+El pronóstico es una regresión lineal (mínimos cuadrados) de bytes usados
+contra el tiempo sobre esas últimas mediciones, mantenida con sumas
+acumuladas: agregar una medición cuesta O(1).
+"""
+
+import hashlib
+import os
+import struct
+import threading
+from collections import deque
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_HISTORY_FILE = os.getenv("STORAGE_HISTORY_FILE", "storage_history.bin")
+# Mediciones por montaje usadas para la regresión (288 = 24 h si se corre cada 5 minutos)
+STORAGE_HISTORY_POINTS = int(os.getenv("STORAGE_HISTORY_POINTS", "288"))
+
+# huella de (host, montaje), timestamp, bytes usados, tamaño en bytes
+RECORD = struct.Struct("<16sdqq")
+
+
+def _key_digest(host: str, mount: str) -> bytes:
+    return hashlib.blake2b(f"{host}\0{mount}".encode(), digest_size=16).digest()
+
+
+class Forecast:
+    __slots__ = ("bytes_per_second", "seconds_to_threshold", "seconds_to_full", "points")
+
+    def __init__(self, bytes_per_second: float, seconds_to_threshold: float | None,
+                 seconds_to_full: float | None, points: int):
+        self.bytes_per_second = bytes_per_second
+        self.seconds_to_threshold = seconds_to_threshold  # None si no crece o ya lo superó
+        self.seconds_to_full = seconds_to_full            # None si no crece
+        self.points = points
+
+    def __repr__(self):
+        return (f"Forecast(bytes_per_second={self.bytes_per_second}, seconds_to_threshold="
+                f"{self.seconds_to_threshold}, seconds_to_full={self.seconds_to_full}, points={self.points})")
+
+
+class _Trend:
+    """
+    Regresión lineal incremental sobre una ventana de (ts, usados).
+
+    Las sumas se llevan relativas a un punto de referencia para no perder
+    precisión con timestamps y tamaños grandes, y se recalculan desde la
+    ventana cada `maxlen` mediciones para que la referencia no quede lejos.
+    """
+
+    def __init__(self, maxlen: int):
+        self.points: deque[tuple[float, int]] = deque(maxlen=maxlen)
+        self.size = 0
+        self._evicted = 0
+        self._rebase()
+
+    def _rebase(self) -> None:
+        self.t0, self.y0 = self.points[0] if self.points else (0.0, 0)
+        self.n = 0
+        self.st = self.sy = self.stt = self.sty = 0.0
+        self._evicted = 0
+        for ts, used in self.points:
+            self._add_sums(ts, used, 1)
+
+    def _add_sums(self, ts: float, used: int, sign: int) -> None:
+        t = ts - self.t0
+        y = float(used - self.y0)
+        self.n += sign
+        self.st += sign * t
+        self.sy += sign * y
+        self.stt += sign * t * t
+        self.sty += sign * t * y
+
+    def add(self, ts: float, used: int, size: int) -> None:
+        if size != self.size:
+            # Cambió el tamaño del filesystem (resize, otro disco): la tendencia anterior no sirve
+            self.points.clear()
+            self.size = size
+        elif len(self.points) == self.points.maxlen:
+            self._add_sums(*self.points.popleft(), -1)
+            self._evicted += 1
+
+        self.points.append((ts, used))
+        if len(self.points) == 1 or self._evicted >= self.points.maxlen:
+            self._rebase()
+        else:
+            self._add_sums(ts, used, 1)
+
+    def slope(self) -> float | None:
+        """Bytes por segundo; None con menos de 2 puntos o sin variación de tiempo."""
+        if self.n < 2:
+            return None
+        denominator = self.n * self.stt - self.st * self.st
+        if denominator <= 0:
+            return None
+        return (self.n * self.sty - self.st * self.sy) / denominator
+
+
+class StorageHistory:
+    """Mediciones de uso por (host, montaje) en un archivo de solo agregado, con su tendencia."""
+
+    def __init__(self, path: str = STORAGE_HISTORY_FILE, max_points: int = STORAGE_HISTORY_POINTS):
+        self.path = path
+        self.max_points = max(2, max_points)
+        self._trends: dict[bytes, _Trend] | None = None
+        self._records_on_disk = 0
+        self._pending: list[bytes] = []
+        self._lock = threading.Lock()
+
+    def _load_locked(self) -> dict[bytes, _Trend]:
+        if self._trends is None:
+            self._trends = {}
+            self._records_on_disk = 0
+            try:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return self._trends
+            except OSError as e:
+                print(f"[WARNING] No se pudo leer {self.path}, se parte sin historial: {e}")
+                return self._trends
+
+            # Un registro incompleto al final (corte durante una escritura) se ignora
+            usable = len(data) - len(data) % RECORD.size
+            for digest, ts, used, size in RECORD.iter_unpack(memoryview(data)[:usable]):
+                trend = self._trends.get(digest)
+                if trend is None:
+                    trend = self._trends[digest] = _Trend(self.max_points)
+                trend.add(ts, used, size)
+            self._records_on_disk = usable // RECORD.size
+        return self._trends
+
+    def add(self, host: str, mount: str, ts: float, used: int, size: int) -> None:
+        """Registra una medición; se escribe a disco con save()."""
+        digest = _key_digest(host, mount)
+        with self._lock:
+            trends = self._load_locked()
+            trend = trends.get(digest)
+            if trend is None:
+                trend = trends[digest] = _Trend(self.max_points)
+            trend.add(ts, used, size)
+            self._pending.append(RECORD.pack(digest, ts, used, size))
+
+    def forecast(self, host: str, mount: str, threshold_percent: float, min_points: int = 3) -> Forecast | None:
+        """
+        Pronostica en cuántos segundos el montaje supera threshold_percent y en
+        cuántos se llena, desde la última medición. None sin suficientes puntos.
+        """
+        with self._lock:
+            trend = self._load_locked().get(_key_digest(host, mount))
+            if trend is None or trend.n < max(2, min_points):
+                return None
+            slope = trend.slope()
+            if slope is None:
+                return None
+            _, used = trend.points[-1]
+            size = trend.size
+            points = trend.n
+
+        if slope <= 0 or size <= 0:
+            return Forecast(slope, None, None, points)
+
+        threshold_bytes = size * threshold_percent / 100
+        to_threshold = (threshold_bytes - used) / slope if used < threshold_bytes else None
+        return Forecast(slope, to_threshold, (size - used) / slope, points)
+
+    def save(self) -> None:
+        """Agrega las mediciones nuevas al archivo; lo compacta si creció demasiado."""
+        with self._lock:
+            if not self._pending:
+                return
+            trends = self._load_locked()
+            try:
+                if self._records_on_disk + len(self._pending) > 2 * self.max_points * max(1, len(trends)):
+                    self._compact_locked(trends)
+                else:
+                    with open(self.path, "ab") as f:
+                        f.write(b"".join(self._pending))
+                    self._records_on_disk += len(self._pending)
+                self._pending.clear()
+            except OSError as e:
+                print(f"[ERROR] No se pudo guardar el historial de storage en {self.path}: {e}")
+
+    def _compact_locked(self, trends: dict[bytes, _Trend]) -> None:
+        """Reescribe el archivo con la ventana actual de cada montaje (archivo temporal + rename)."""
+        records = []
+        for digest, trend in trends.items():
+            for ts, used in trend.points:
+                records.append(RECORD.pack(digest, ts, used, trend.size))
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(records))
+        os.replace(tmp_path, self.path)
+        self._records_on_disk = len(records)
+
+
+def format_duration(seconds: float) -> str:
+    """Duración aproximada legible: "45 min", "5.2 h", "3.1 días"."""
+    if seconds < 60:
+        return "<1 min"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} días"
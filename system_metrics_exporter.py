@@ -4,17 +4,33 @@ System Metrics One Shot
 
 Obtiene el uso de CPU, RAM y disco,
 lo muestra por consola y lo envía a Slack una sola vez.
+
+Con --serve expone en cambio un endpoint `/metrics` en formato de texto de
+Prometheus. Un hilo en segundo plano toma una muestra cada
+METRICS_REFRESH_INTERVAL segundos (metrics_sampler.py) y deja el texto de
+respuesta ya generado, así un scrape nunca espera a `cpu_percent` ni recalcula
+nada: solo escribe bytes en el socket.
 """
 
+import argparse
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import psutil
-import requests
 from dotenv import load_dotenv
 
+from metrics_sampler import MetricsSampler
+from slack_notifier import send_slack_message
+
 load_dotenv()
 
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_REFRESH_INTERVAL = float(os.getenv("METRICS_REFRESH_INTERVAL", "5"))  # segundos
 
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 def get_system_metrics():
@@ -29,25 +45,105 @@ def get_system_metrics():
     return cpu, mem, disk
 
 
-def send_slack_message(message: str):
-    """Envía un mensaje a Slack usando un webhook."""
-    if not SLACK_WEBHOOK_URL:
-        print("[ERROR] SLACK_WEBHOOK_URL no está configurado.")
-        return
-
-    payload = {"text": message}
-
+def render_prometheus(metrics: dict, sample_seconds: float) -> bytes:
+    """Genera el texto de exposición de Prometheus para una muestra de MetricsSampler."""
+    lines = []
+
+    def metric(name, kind, help_text, value, labels=""):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{labels} {value}")
+
+    metric("system_cpu_percent", "gauge", "Uso de CPU desde la muestra anterior (%).", metrics["cpu_percent"])
+    metric("system_memory_percent", "gauge", "Uso de memoria RAM (%).", metrics["memory_percent"])
+    metric("system_disk_percent", "gauge", "Uso del disco raíz (%).", metrics["disk_percent"])
+
+    load_avg = metrics["load_avg"]
+    if isinstance(load_avg, (list, tuple)):
+        lines.append("# HELP system_load_average Load average del sistema.")
+        lines.append("# TYPE system_load_average gauge")
+        for period, value in zip(("1m", "5m", "15m"), load_avg):
+            lines.append(f'system_load_average{{period="{period}"}} {value}')
+
+    net = metrics["net"]
+    lines.append("# HELP system_network_bytes_total Bytes de red acumulados desde el arranque.")
+    lines.append("# TYPE system_network_bytes_total counter")
+    lines.append(f'system_network_bytes_total{{direction="sent"}} {net["bytes_sent"]}')
+    lines.append(f'system_network_bytes_total{{direction="recv"}} {net["bytes_recv"]}')
+    lines.append("# HELP system_network_bytes_per_second Tasa de red entre las dos últimas muestras.")
+    lines.append("# TYPE system_network_bytes_per_second gauge")
+    lines.append(f'system_network_bytes_per_second{{direction="sent"}} {net["bytes_sent_per_s"]}')
+    lines.append(f'system_network_bytes_per_second{{direction="recv"}} {net["bytes_recv_per_s"]}')
+
+    metric("system_exporter_last_sample_timestamp_seconds", "gauge",
+           "Momento de la última muestra (epoch).", f"{time.time():.3f}")
+    metric("system_exporter_sample_duration_seconds", "gauge",
+           "Tiempo que tomó la última muestra.", f"{sample_seconds:.6f}")
+
+    return ("\n".join(lines) + "\n").encode()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantiene la conexión abierta entre scrapes. Encabezados y cuerpo
+    # salen en un solo write (buffer + flush al final de la petición) y sin Nagle,
+    # para no esperar el ACK retardado de TCP (~40 ms) en cada respuesta.
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    payload = b"# Sin muestras todavia\n"
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self._reply(404, b"Not found. Use /metrics\n", "text/plain")
+            return
+        self._reply(200, MetricsHandler.payload, CONTENT_TYPE)
+
+    def _reply(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(host: str, port: int, interval: float) -> None:
+    sampler = MetricsSampler(history=1)
+
+    def on_sample(metrics):
+        # Reemplazar la referencia es atómico: cada scrape ve un payload completo
+        MetricsHandler.payload = render_prometheus(metrics, sampler.costs[-1])
+
+    time.sleep(0.5)  # Ventana mínima para que el primer cpu_percent tenga sentido
+    on_sample(sampler.sample())
+    threading.Thread(target=sampler.run, args=(interval, on_sample), name="metrics-sampler", daemon=True).start()
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    print(f"[INFO] Exponiendo métricas en http://{host}:{port}/metrics (muestra cada {interval:g}s)")
     try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=5)
-        if resp.status_code == 200:
-            print("[OK] Mensaje enviado a Slack.")
-        else:
-            print(f"[ERROR] Slack respondió con status {resp.status_code}: {resp.text}")
-    except Exception as e:
-        print(f"[ERROR] No se pudo enviar mensaje a Slack: {e}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Servidor detenido.")
+    finally:
+        server.server_close()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Métricas del sistema a Slack o como endpoint de Prometheus.")
+    parser.add_argument("--serve", action="store_true", help="exponer /metrics en vez de enviar a Slack")
+    parser.add_argument("--host", default=METRICS_HOST, help=f"interfaz de escucha (por defecto: {METRICS_HOST})")
+    parser.add_argument("--port", type=int, default=METRICS_PORT, help=f"puerto (por defecto: {METRICS_PORT})")
+    parser.add_argument("--interval", type=float, default=METRICS_REFRESH_INTERVAL,
+                        help=f"segundos entre muestras (por defecto: {METRICS_REFRESH_INTERVAL:g})")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_metrics(args.host, args.port, args.interval)
+        return
+
     cpu, mem, disk = get_system_metrics()
 
     message = f"CPU: {cpu:.1f}% | RAM: {mem:.1f}% | Disco: {disk:.1f}%"
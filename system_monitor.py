@@ -1,79 +1,207 @@
-import psutil
+import argparse
 import json
 import os
-import requests
-from datetime import datetime, UTC
+import socket
+import time
+from collections import deque
+from datetime import datetime
 from dotenv import load_dotenv
 
+from alert_rules import WINDOW_AGGREGATES, load_rules
+from alert_state import NOTIFY_RECOVERED, AlertStateStore
+from metrics_sampler import MetricsSampler
+from metrics_store import MetricsStore
+from process_top import ProcessTop, format_top
+from slack_notifier import send_slack_message
+
 # ================================
 # CARGAR VARIABLES DEL ENTORNO
 # ================================
 load_dotenv()
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+
+# Reglas de alerta (ver alert_rules.py); sin archivo: CPU > 85, RAM > 90, disco > 85
+ALERT_RULES_FILE = os.getenv("ALERT_RULES_FILE", "alert_rules.yaml")
+
+# Modo daemon: segundos entre muestras y muestras que se conservan en memoria
+MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", "5"))
+MONITOR_HISTORY = int(os.getenv("MONITOR_HISTORY", "720"))
+# Historial persistente (raw + rollups por minuto y hora); vacío = desactivado
+MONITOR_STORE_FILE = os.getenv("MONITOR_STORE_FILE", "metrics_store.bin")
+# Procesos y cgroups que más consumen, incluidos en cada muestra y en las alertas; 0 = desactivado.
+# Recorre todos los procesos en cada muestra (con miles, cientos de ms): por eso viene desactivado
+MONITOR_TOP_K = int(os.getenv("MONITOR_TOP_K", "0"))
+STORE_METRICS = ["cpu_percent", "memory_percent", "disk_percent", "load_1m", "net_sent_per_s", "net_recv_per_s"]
+
+ALERT_STORE = AlertStateStore()
+RULES = load_rules(ALERT_RULES_FILE)
 
 
 # ================================
 # OBTENER MÉTRICAS DEL SISTEMA
 # ================================
 def get_metrics():
-    return {
-        "timestamp": datetime.now(UTC).isoformat(),
-        "cpu_percent": psutil.cpu_percent(interval=1),
-        "memory_percent": psutil.virtual_memory().percent,
-        "disk_percent": psutil.disk_usage('/').percent,
-        "load_avg": psutil.getloadavg() if hasattr(psutil, "getloadavg") else "N/A",
-        "net": {
-            "bytes_sent": psutil.net_io_counters().bytes_sent,
-            "bytes_recv": psutil.net_io_counters().bytes_recv,
-        }
-    }
+    # Una sola muestra necesita una ventana para medir CPU y tasas de red: 1 segundo
+    sampler = MetricsSampler(history=1)
+    top = ProcessTop(MONITOR_TOP_K) if MONITOR_TOP_K > 0 else None
+    if top is not None:
+        top.snapshot()
+    time.sleep(1)
+    metrics = sampler.sample()
+    if top is not None:
+        metrics["top"] = top.snapshot()
+    return metrics
 
 
 # ================================
 # ENVIAR ALERTA A SLACK
 # ================================
-def send_slack_alert(metrics):
-    if not SLACK_WEBHOOK_URL:
-        print("SLACK_WEBHOOK_URL no configurado en .env")
-        return
-
+def send_slack_alert(metrics, rules=()):
     message = (
         "*⚠️ ALERTA DE SISTEMA*\n\n"
         f"*CPU:* {metrics['cpu_percent']}%\n"
         f"*RAM:* {metrics['memory_percent']}%\n"
         f"*Disco:* {metrics['disk_percent']}%\n"
         f"*Load Avg:* {metrics['load_avg']}\n"
-        "\nRevisa el servidor, los valores superan los umbrales definidos."
     )
+    if rules:
+        message += "\n*Reglas en alerta:*\n" + "\n".join(f"🔴 {rule.describe()}" for rule in rules) + "\n"
+    if metrics.get("top"):
+        message += "\n" + format_top(metrics["top"]) + "\n"
+    message += "\nRevisa el servidor, los valores superan los umbrales definidos."
 
-    payload = {"text": message}
-
-    try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
-        resp.raise_for_status()
-        print("Alerta enviada a Slack.")
-    except Exception as e:
-        print(f"Error enviando alerta a Slack: {e}")
+    send_slack_message(message)
 
 
 # ================================
 # LÓGICA PRINCIPAL
 # ================================
+def check_alerts(metrics, now=None):
+    # Actualizar cada regla con la muestra y notificar solo cambios de estado o recordatorios
+    now = time.time() if now is None else now
+    host = socket.gethostname()
+    to_notify = []
+    recovered = []
+    for rule in RULES:
+        if not rule.restored:
+            # Tras un reinicio (o en cada ejecución suelta) se parte del estado ya notificado
+            rule.restore(ALERT_STORE.state(host, rule.name))
+        state = rule.update(metrics, now)
+        decision = ALERT_STORE.evaluate(host, rule.name, state, now=now)
+        if decision == NOTIFY_RECOVERED:
+            recovered.append(rule)
+        elif decision is not None:
+            to_notify.append(rule)
+    ALERT_STORE.save()
+
+    if to_notify:
+        send_slack_alert(metrics, to_notify)
+    elif recovered:
+        send_slack_message(
+            f"*✅ Sistema recuperado* ({host})\n\n" +
+            "\n".join(f"🟢 {rule.describe()}" for rule in recovered)
+        )
+
+
+def store_values(metrics):
+    """Valores de una muestra con los nombres de STORE_METRICS."""
+    load_avg = metrics["load_avg"]
+    return {
+        "cpu_percent": metrics["cpu_percent"],
+        "memory_percent": metrics["memory_percent"],
+        "disk_percent": metrics["disk_percent"],
+        "load_1m": load_avg[0] if isinstance(load_avg, (list, tuple)) else float("nan"),
+        "net_sent_per_s": metrics["net"]["bytes_sent_per_s"],
+        "net_recv_per_s": metrics["net"]["bytes_recv_per_s"],
+    }
+
+
+def open_store():
+    if not MONITOR_STORE_FILE:
+        return None
+    # Una hora de muestras crudas a MONITOR_INTERVAL (no a --interval, para que --history abra el mismo archivo)
+    raw_capacity = max(720, int(3600 / max(MONITOR_INTERVAL, 0.1)))
+    store = MetricsStore(MONITOR_STORE_FILE, STORE_METRICS, raw_capacity=raw_capacity)
+    print(f"[INFO] Historial en {MONITOR_STORE_FILE} "
+          f"({MetricsStore.size_bytes(len(STORE_METRICS), raw_capacity) / 1024:.0f} KiB, "
+          f"{store.raw.count} muestras recuperadas)")
+    return store
+
+
+def run_daemon(interval):
+    sampler = MetricsSampler(history=MONITOR_HISTORY)
+    store = open_store()
+    top = ProcessTop(MONITOR_TOP_K) if MONITOR_TOP_K > 0 else None
+    top_costs = deque(maxlen=MONITOR_HISTORY)
+
+    def on_sample(metrics):
+        if top is not None:
+            metrics["top"] = top.snapshot()
+            top_costs.append(top.last_cost)
+        # Una línea JSON por muestra
+        print(json.dumps(metrics), flush=True)
+        if store is not None:
+            store.add(time.time(), store_values(metrics))
+        check_alerts(metrics)
+
+    print(f"[INFO] Muestreando cada {interval}s (Ctrl+C para salir)")
+    try:
+        sampler.run(interval, on_sample)
+    finally:
+        if store is not None:
+            store.close()
+    print(f"\n[INFO] Costo de muestreo: {sampler.cost_summary()}")
+    if top_costs:
+        print(f"[INFO] Costo del top de procesos: promedio {1000 * sum(top_costs) / len(top_costs):.3f} ms, "
+              f"máx {1000 * max(top_costs):.3f} ms en {len(top_costs)} muestras")
+
+
+def show_history(tier):
+    """Imprime los rollups guardados por el modo daemon."""
+    store = open_store()
+    if store is None:
+        print("[ERROR] MONITOR_STORE_FILE está vacío, no hay historial.")
+        return
+
+    try:
+        for metric in STORE_METRICS:
+            rollups = store.query(metric, tier)
+            print(f"\n=== {metric} ({tier}, {len(rollups)} períodos) ===")
+            for r in rollups[-10:]:
+                ts = datetime.fromtimestamp(r.ts).strftime("%Y-%m-%d %H:%M")
+                print(f"{ts}  min {r.min:.1f}  máx {r.max:.1f}  prom {r.avg:.1f}  p95 {r.p95:.1f}")
+    finally:
+        store.close()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Métricas del sistema con alertas a Slack.")
+    parser.add_argument("--daemon", action="store_true", help="muestrear continuamente en vez de una sola vez")
+    parser.add_argument("--interval", type=float, default=MONITOR_INTERVAL,
+                        help=f"segundos entre muestras en modo daemon (por defecto: {MONITOR_INTERVAL:g})")
+    parser.add_argument("--history", choices=["minute", "hour"],
+                        help="mostrar los últimos rollups guardados por el modo daemon y salir")
+    args = parser.parse_args()
+
+    if args.history:
+        show_history(args.history)
+        return
+
+    if args.daemon:
+        run_daemon(args.interval)
+        return
+
+    # Con una sola muestra no se cumple `for:` ni se llena una ventana: esas reglas no
+    # alertan y, si ya estaban en alerta, tampoco se dan por recuperadas
+    for rule in RULES:
+        if rule.for_seconds > 0 or rule.aggregate in WINDOW_AGGREGATES:
+            print(f"[WARNING] La regla '{rule.name}' necesita varias muestras (`for:` o ventana); usar --daemon.")
+
     metrics = get_metrics()
 
     # Imprimir métricas como JSON
     print(json.dumps(metrics, indent=2))
 
-    # Evaluar si se debe enviar alerta
-    alert_triggered = (
-        metrics["cpu_percent"] > 85 or
-        metrics["memory_percent"] > 90 or
-        metrics["disk_percent"] > 85
-    )
-
-    if alert_triggered:
-        send_slack_alert(metrics)
+    check_alerts(metrics)
 
 
 # ================================
@@ -0,0 +1,77 @@
+from alert_rules import AlertRule
+from alert_state import NOTIFY_ALERT, NOTIFY_RECOVERED, STATE_CRIT, STATE_OK, AlertStateStore
+
+HOST = "host"
+
+
+def _rule():
+    return AlertRule("cpu_alta", "cpu_percent", above=85, clear=75, aggregate="avg", window=3, for_seconds=60)
+
+
+def _run(rule, store, values, start, step=10):
+    """Pasa las muestras por la regla y el store como check_alerts; devuelve los avisos."""
+    decisions = []
+    for i, value in enumerate(values):
+        now = start + i * step
+        state = rule.update({"cpu_percent": value}, now)
+        decisions.append(store.evaluate(HOST, rule.name, state, now=now))
+    return decisions
+
+
+def _crit_store(tmp_path):
+    """Un store con la regla ya alertada por un proceso anterior."""
+    store = AlertStateStore(str(tmp_path / "state.db"), renotify_interval=3600)
+    rule = _rule()
+    rule.restore(store.state(HOST, rule.name))
+    decisions = _run(rule, store, [95] * 8, start=0)
+    assert rule.state == STATE_CRIT and NOTIFY_ALERT in decisions
+    store.save()
+    return AlertStateStore(str(tmp_path / "state.db"), renotify_interval=3600)
+
+
+def test_restart_during_crit_does_not_send_false_recovery(tmp_path):
+    store = _crit_store(tmp_path)
+    rule = _rule()
+    rule.restore(store.state(HOST, rule.name))
+    assert rule.state == STATE_CRIT
+
+    # El problema sigue: en la banda de histéresis y luego sobre el umbral, sin avisos nuevos
+    assert _run(rule, store, [80, 90, 92, 95], start=1000) == [None] * 4
+    assert rule.state == STATE_CRIT
+
+
+def test_restart_during_crit_recovers_only_after_warm_up(tmp_path):
+    store = _crit_store(tmp_path)
+    rule = _rule()
+    rule.restore(store.state(HOST, rule.name))
+
+    # Bajo `clear` desde la primera muestra, pero recién a los 60 s (`for`) con la ventana llena
+    decisions = _run(rule, store, [10] * 8, start=1000)
+    assert decisions[:6] == [None] * 6
+    assert decisions[6] == NOTIFY_RECOVERED
+    assert rule.state == STATE_OK
+
+
+def test_fresh_rule_still_alerts_after_for(tmp_path):
+    store = AlertStateStore(str(tmp_path / "state.db"))
+    rule = _rule()
+    rule.restore(store.state(HOST, rule.name))
+    assert rule.state == STATE_OK
+    decisions = _run(rule, store, [95] * 8, start=0)
+    assert decisions.index(NOTIFY_ALERT) == 6
+
+
+def test_check_alerts_restores_state_after_restart(tmp_path, monkeypatch):
+    import system_monitor
+
+    store = _crit_store(tmp_path)
+    sent = []
+    monkeypatch.setattr(system_monitor, "ALERT_STORE", store)
+    monkeypatch.setattr(system_monitor, "RULES", [_rule()])
+    monkeypatch.setattr(system_monitor.socket, "gethostname", lambda: HOST)
+    monkeypatch.setattr(system_monitor, "send_slack_message", sent.append)
+
+    metrics = {"cpu_percent": 80, "memory_percent": 50, "disk_percent": 50, "load_avg": [1, 1, 1]}
+    system_monitor.check_alerts(metrics, now=1000)
+    assert system_monitor.RULES[0].state == STATE_CRIT
+    assert sent == []
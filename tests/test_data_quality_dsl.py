@@ -0,0 +1,193 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_quality_dsl_simple as dq
+from data_quality_dsl_simple import as_string_series, regex_match, run_quality_checks
+
+EMAIL = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+# La regla regex tiene la semántica de re.match aunque el patrón se evalúe con RE2
+REGEX_CASES = [
+    (EMAIL, "a@b.co\n"),        # `$` acepta un "\n" final
+    (EMAIL, "a@b.co"),
+    (EMAIL, "a b@c.co"),
+    (r"^\d+$", "١٢٣"),          # \d, \w y \s son Unicode
+    (r"^\w+$", "ñandú"),
+    (r"^\s$", " "),
+    (r"^\s$", "\x0b"),          # \v y \x1c-\x1f son espacios para `re`
+    (r"^\S+$", "a\x1cb"),
+    (r"(?i)k", "K"),       # signo Kelvin
+    (r"(a)\1", "aa"),           # sin soporte en RE2
+    (r"[[:alpha:]]", ":"),      # clase POSIX en RE2, conjunto para `re`
+    (r"a{,2}$", "a{,2}"),
+    (r"\B", ""),
+]
+
+
+@pytest.mark.filterwarnings("ignore:Possible nested set")
+@pytest.mark.parametrize("pattern,value", REGEX_CASES)
+def test_regex_match_keeps_re_semantics(pattern, value):
+    values = [value, "", "plain ascii", value]
+    expected = [re.match(pattern, v) is not None for v in values]
+    assert regex_match(as_string_series(pd.Series(values)), pattern).tolist() == expected
+
+
+@pytest.mark.filterwarnings("ignore:Possible nested set")
+@pytest.mark.parametrize("pattern,value", REGEX_CASES)
+def test_regex_rule_keeps_re_semantics(pattern, value):
+    df = pd.DataFrame({"c": [value, None, "x"]})
+    report = run_quality_checks(df, [{"type": "regex", "column": "c", "pattern": pattern}])
+    expected = [i for i, v in enumerate([value, "", "x"]) if re.match(pattern, v) is None]
+    assert report["results"][0]["failed_idx"].tolist() == expected
+
+
+# ---------- plan por columna y paralelismo (pandas) ----------
+
+def _comparable(report: dict) -> list[dict]:
+    # "seconds" depende del backend y de la corrida
+    return [{k: v for k, v in r.items() if k != "seconds"} for r in report["results"]]
+
+
+def _workers_frame(rows: int = 20_000) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(
+        {
+            "id": rng.integers(0, rows, size=rows),
+            "age": rng.integers(-10, 130, size=rows),
+            "email": pd.Series([f"u{i}@x.co" if i % 97 else "malo" for i in range(rows)]).where(
+                rng.random(rows) > 0.01),
+            "status": rng.choice(["a", "b", "c"], size=rows),
+        },
+        index=pd.RangeIndex(rows) * 2,  # etiquetas distintas de las posiciones
+    )
+
+
+# Columnas intercaladas, columna inexistente y tipo no soportado entre medio
+WORKERS_RULES = [
+    {"type": "regex", "column": "email", "pattern": EMAIL},
+    {"type": "unique", "column": "id"},
+    {"type": "not_null", "column": "nope"},
+    {"type": "in_range", "column": "age", "min": 0, "max": 120},
+    {"type": "bogus", "column": "age"},
+    {"type": "not_null", "column": "email"},
+    {"type": "in_set", "column": "status", "allowed": ["a", "b"]},
+    {"type": "in_range", "column": "age", "min": 18},
+    {"type": "regex", "column": "email", "pattern": EMAIL},
+    {"type": "bogus", "column": "nope"},
+]
+
+
+def test_plan_rules_groups_by_column_in_order():
+    groups, errors = dq._plan_rules(_workers_frame(10), WORKERS_RULES)
+    assert groups == {"email": [0, 5, 8], "id": [1], "age": [3, 7], "status": [6]}
+    assert list(groups) == ["email", "id", "age", "status"]
+    assert errors == {2: "Column 'nope' no existe", 4: "Rule type 'bogus' no soportada", 9: "Column 'nope' no existe"}
+
+
+def test_max_workers_does_not_change_results():
+    df = _workers_frame()
+    sequential = dq._run_quality_checks_pandas(df, WORKERS_RULES, max_workers=1)
+    parallel = dq._run_quality_checks_pandas(df, WORKERS_RULES, max_workers=4)
+
+    assert [r["rule"] for r in parallel["results"]] == WORKERS_RULES
+    assert _comparable(parallel) == _comparable(sequential)
+    assert parallel["summary"] == sequential["summary"]
+    assert [parallel["results"][i]["message"] for i in (2, 4, 9)] == [
+        "Column 'nope' no existe", "Rule type 'bogus' no soportada", "Column 'nope' no existe",
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_seconds_per_rule(workers):
+    report = dq._run_quality_checks_pandas(_workers_frame(), WORKERS_RULES, max_workers=workers)
+    for rule, result in zip(WORKERS_RULES, report["results"]):
+        assert "seconds" in result
+        if rule["column"] == "nope" or rule["type"] == "bogus":
+            assert result["seconds"] is None
+        else:
+            assert result["seconds"] >= 0
+
+
+# ---------- paridad pandas / polars ----------
+
+polars = pytest.importorskip("polars")
+
+
+def _assert_parity(df: pd.DataFrame, rules: list[dict]) -> None:
+    expected = _comparable(run_quality_checks(df, rules, backend="pandas"))
+    got = _comparable(run_quality_checks(df, rules, backend="polars"))
+    for rule, e, g in zip(rules, expected, got):
+        assert g == e, rule
+
+
+def _parity_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "int": [1, 2, 2, 3, 1, 5, 7, 0],
+            "int_nulls": [1, None, 2, 2, 3, None, 1, 9],  # pandas lo deja en float64
+            "nullable_int": pd.array([1, None, 2, 2, 3, None, 1, 9], dtype="Int64"),
+            "float": [0.0, -0.0, 1.5, float("nan"), 1.5, 2.0, float("inf"), -3.25],
+            "bool": [True, False, True, True, False, True, False, True],
+            "nullable_bool": pd.array([True, None, False, True, None, False, True, True], dtype="boolean"),
+            "text": ["a", "b", None, "a", "١٢٣", "a@b.co\n", "", "ñandú"],
+            "num_text": [" 5", "1e3", "5e  6", "inf", "", None, "12", "-7.5"],
+            "mixed": [1, "a", None, 1, 2.5, "a", True, "1"],
+            "date": pd.to_datetime(["2024-01-01", None, "2024-01-02", "2024-01-01", "2024-03-01", None,
+                                    "2023-12-31", "2024-01-02"]),
+            "category": pd.Categorical(["x", "y", "x", None, "z", "x", "y", "y"]),
+        }
+    )
+
+
+PARITY_RULES = [
+    {"type": "not_null"},
+    {"type": "unique"},
+    {"type": "in_range", "min": 0, "max": 5},
+    {"type": "in_range", "min": 1.5},
+    {"type": "regex", "pattern": r"^\d+$"},
+    {"type": "regex", "pattern": r"^\w+$"},
+    {"type": "regex", "pattern": r"^[^@\s]+@[^@\s]+\.[^@\s]+$"},
+    {"type": "regex", "pattern": r"(a)\1"},
+    {"type": "in_set", "allowed": [1, 2]},
+    {"type": "in_set", "allowed": [1.5, 2.0]},
+    {"type": "in_set", "allowed": ["a", "x"]},
+    {"type": "in_set", "allowed": ["1", "a", 1, True]},
+    {"type": "in_set", "allowed": [True]},
+    {"type": "in_set", "allowed": [None, "a"]},
+]
+
+
+@pytest.mark.parametrize("column", list(_parity_frame().columns))
+def test_polars_matches_pandas_by_dtype(column):
+    rules = [dict(rule, column=column) for rule in PARITY_RULES]
+    _assert_parity(_parity_frame(), rules)
+
+
+def test_polars_mixed_object_column_does_not_break_other_rules():
+    df = pd.DataFrame({"mixed": [1, "a", None, 1, 2.5], "ok": [1, 2, 2, None, 5]})
+    rules = [{"type": rtype, "column": col} for col in ("mixed", "ok") for rtype in ("not_null", "unique")]
+    rules += [{"type": "in_set", "column": "mixed", "allowed": [1, "a"]}, {"type": "missing_type", "column": "ok"},
+              {"type": "not_null", "column": "nope"}]
+    _assert_parity(df, rules)
+
+
+def test_polars_in_range_numeric_text_matches_to_numeric():
+    values = ["5", " 5", "5 ", "+3", ".5", "5.", "1e3", "5e  6", "7E36", "inf", "  inf", "-Infinity", "nan", "0x10",
+              "1_000", "", "١", "99999999999999999999", "0000859124214550684", "120", "120.0000000001", None]
+    df = pd.DataFrame({"v": values})
+    _assert_parity(df, [{"type": "in_range", "column": "v", "min": 0, "max": 120},
+                        {"type": "in_range", "column": "v", "max": 7e36}])
+
+
+def test_polars_error_falls_back_to_pandas(monkeypatch, capsys):
+    import data_quality_dsl_simple as dq
+
+    # Una expresión que falla al ejecutar la consulta (cast estricto fuera de rango)
+    monkeypatch.setattr(dq, "_polars_fail_expr", lambda pl, rule, dtype: (pl.col(rule["column"]).cast(pl.Int8) == 0, None))
+    df = pd.DataFrame({"v": [1, 1000, None, 1000]})
+    rules = [{"type": "unique", "column": "v"}, {"type": "in_range", "column": "v", "max": 10}]
+    _assert_parity(df, rules)
+    assert "[WARNING]" in capsys.readouterr().out
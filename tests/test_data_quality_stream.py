@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from data_quality_dsl_simple import run_quality_checks
+from data_quality_stream import UNIQUE_MODES, run_quality_checks_file
+
+# Columnas cuyo tipo inferido cambia de un bloque a otro (chunk_size=4)
+UNIQUE_CASES = [
+    ["5", "6", "7", "8", "5", "abc", "9", "10"],   # int en el primer bloque, texto en el segundo
+    ["5", "6", "7", "8", "5.0", "05", "", "9"],    # int y float: 5, 5.0 y 05 son el mismo número
+    ["5", "6", "7", "8", "05", "x", "", "5"],      # con texto, "05" y "5" son distintos
+    ["True", "false", "", "x1", "TRUE", "true", "False", ""],
+    ["True", "false", "", "FALSE", "TRUE", "true", "False", ""],  # booleana: sin mayúsculas
+]
+
+
+@pytest.mark.parametrize("mode", UNIQUE_MODES)
+@pytest.mark.parametrize("values", UNIQUE_CASES)
+def test_unique_matches_in_memory_across_chunks(tmp_path, mode, values):
+    path = tmp_path / "data.csv"
+    path.write_text("id,v\n" + "".join(f"{i},{v}\n" for i, v in enumerate(values)))
+    rules = [{"type": "unique", "column": "v"}, {"type": "not_null", "column": "v"}]
+
+    expected = run_quality_checks(pd.read_csv(path), rules)
+    report = run_quality_checks_file(str(path), rules, chunk_size=4, unique_mode=mode, spill_dir=str(tmp_path))
+
+    assert [r["failed_idx"].tolist() for r in report["results"]] == \
+        [r["failed_idx"].tolist() for r in expected["results"]]
+    assert list(tmp_path.iterdir()) == [path]  # sin particiones temporales al terminar
+
+
+STATELESS_RULES = [
+    {"type": "in_set", "column": "v", "allowed": [5, 6, 7, 8, 9, 10, True]},
+    {"type": "regex", "column": "v", "pattern": r"^\d+$"},
+    {"type": "in_range", "column": "v", "min": 5, "max": 9},
+]
+
+
+@pytest.mark.parametrize("values", UNIQUE_CASES + [
+    ["5", "6", "7", "8", "5", "", "9", "10"],      # int sin nulos en un bloque, con nulos en otro: float
+    ["True", "false", "true", "TRUE", "", "false", "True", "x"],
+])
+@pytest.mark.parametrize("rule", STATELESS_RULES, ids=lambda rule: rule["type"])
+def test_stateless_rules_match_in_memory_across_chunks(tmp_path, rule, values):
+    path = tmp_path / "data.csv"
+    path.write_text("id,v\n" + "".join(f"{i},{v}\n" for i, v in enumerate(values)))
+
+    expected = run_quality_checks(pd.read_csv(path), [rule])
+    report = run_quality_checks_file(str(path), [rule], chunk_size=4)
+
+    assert report["results"][0]["failed_idx"].tolist() == expected["results"][0]["failed_idx"].tolist()
+
+
+@pytest.mark.parametrize("mode", UNIQUE_MODES)
+def test_unique_parquet(tmp_path, mode):
+    path = tmp_path / "data.parquet"
+    df = pd.DataFrame({"v": [1.0, 2.0, None, 1.0, 3.0, 2.0, 4.0]})
+    df.to_parquet(path)
+    report = run_quality_checks_file(str(path), [{"type": "unique", "column": "v"}], chunk_size=3, unique_mode=mode)
+    assert report["results"][0]["failed_idx"].tolist() == [0, 1, 3, 5]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from failure_index import FailureIndex
+
+MASKS = {
+    "vacío": np.zeros(0, dtype=bool),
+    "sin fallas": np.zeros(50, dtype=bool),
+    "todas": np.ones(50, dtype=bool),
+    "alternada": np.arange(51) % 2 == 0,
+    "dispersa": np.isin(np.arange(1000), [0, 7, 500, 998, 999]),
+    "tramos": np.isin(np.arange(100), np.r_[0:10, 40:41, 60:100]),
+    "aleatoria": np.random.default_rng(0).random(500) < 0.3,
+}
+
+
+def _is_rle(index: FailureIndex) -> bool:
+    return index._starts is not None
+
+
+@pytest.mark.parametrize("mask", MASKS.values(), ids=MASKS.keys())
+def test_round_trips(mask):
+    index = FailureIndex.from_mask(mask)
+    total = len(mask)
+    expected = np.flatnonzero(mask)
+
+    assert len(index) == mask.sum()
+    assert np.array_equal(index.to_mask(), mask)
+    assert np.array_equal(index.positions(), expected)
+    assert index.tolist() == expected.tolist()
+    assert list(index) == expected.tolist()
+
+    starts, lengths = index.runs()
+    from_runs = FailureIndex.from_runs(starts, lengths, total)
+    from_positions = FailureIndex.from_positions(index.positions(), total)
+    assert np.array_equal(from_runs.to_mask(), mask)
+    assert np.array_equal(from_positions.to_mask(), mask)
+    assert from_runs == index == from_positions
+
+
+def test_picks_the_smaller_form():
+    assert _is_rle(FailureIndex.from_mask(MASKS["todas"]))
+    assert _is_rle(FailureIndex.from_mask(MASKS["tramos"]))
+    assert not _is_rle(FailureIndex.from_mask(MASKS["alternada"]))
+    assert not _is_rle(FailureIndex.from_mask(MASKS["dispersa"]))
+    # Tramos contiguos o vacíos se unen antes de elegir
+    merged = FailureIndex.from_runs([0, 5, 8, 20], [5, 3, 0, 10], 40)
+    assert merged.runs()[0].tolist() == [0, 20]
+    assert merged.runs()[1].tolist() == [8, 10]
+
+
+@pytest.mark.parametrize("labels", [
+    pd.Index([f"fila{i}" for i in range(20)]),
+    pd.RangeIndex(100, 120),
+    pd.Index(np.arange(20)[::-1] * 10),
+], ids=["texto", "range desde 100", "enteros desordenados"])
+@pytest.mark.parametrize("mask", [np.arange(20) >= 5, np.arange(20) % 3 == 0], ids=["tramo", "posiciones"])
+def test_sample_and_tolist_use_labels(labels, mask):
+    index = FailureIndex.from_mask(mask, labels)
+    expected = labels[mask].tolist()
+
+    assert index.tolist() == expected
+    assert list(index) == expected
+    assert index.sample(3) == expected[:3]
+    assert index.sample(0) == []
+    assert index.sample(100) == expected
+
+
+def test_range_index_from_zero_is_positional():
+    index = FailureIndex.from_mask(MASKS["alternada"], pd.RangeIndex(51))
+    assert index.labels is None
+    assert index.sample(2) == [0, 2]
+
+
+def test_union_all_mixes_runs_and_positions():
+    labels = pd.Index([f"r{i}" for i in range(100)])
+    runs = FailureIndex.from_runs([10, 50], [20, 30], 100, labels)
+    positions = FailureIndex.from_positions([0, 15, 45, 99], 100, labels)
+    empty = FailureIndex.from_positions([], 100, labels)
+    assert _is_rle(runs) and not _is_rle(positions)
+
+    union = FailureIndex.union_all([runs, positions, empty])
+    expected = runs.to_mask() | positions.to_mask()
+
+    assert np.array_equal(union.to_mask(), expected)
+    assert union.tolist() == labels[expected].tolist()
+    assert union == (runs | positions)
+    assert FailureIndex.union_all([empty]).tolist() == []
+
+
+def test_union_all_rejects_bad_input():
+    with pytest.raises(ValueError):
+        FailureIndex.union_all([])
+    with pytest.raises(ValueError):
+        FailureIndex.union_all([FailureIndex.all(10), FailureIndex.all(11)])
@@ -0,0 +1,130 @@
+import os
+import shlex
+import shutil
+import subprocess
+
+import pytest
+
+import remote_log_error_summary as rls
+from remote_log_error_summary import (
+    PUSHDOWN_AWK,
+    build_incremental_command,
+    parse_pushdown_output,
+    summarize_log_content,
+)
+
+# Niveles con mayúsculas mezcladas, líneas con más de un nivel, sin nivel y una última línea sin "\n"
+LOG_FIXTURE = (
+    "2025-11-29 23:27:56 [INFO] servicio iniciado\n"
+    "2025-11-29 23:27:57 [ERROR] fallo al conectar\n"
+    "2025-11-29 23:27:58 [warning] disco al 80%\n"
+    "2025-11-29 23:27:59 [Info] reintento\n"
+    "Nov 29 23:28:00 host app[12]: error: timeout (info adicional)\n"
+    "2025-11-29 23:28:01 [WARN] INFO duplicado en la misma línea\n"
+    "línea sin nivel con acentos: canción\n"
+    "\n"
+    "2025-11-29 23:28:02 [DEBUG] ERRORES=0 warn=1\n"
+    "  traceback: Error en ñandú.py\n"
+    "2025-11-29 23:28:03 [eRRoR] última línea sin salto"
+)
+
+
+def _run_awk(path) -> bytes:
+    result = subprocess.run(f"{PUSHDOWN_AWK} {shlex.quote(str(path))}", shell=True, capture_output=True, check=True)
+    return result.stdout
+
+
+@pytest.mark.skipif(shutil.which("awk") is None, reason="requiere awk")
+def test_pushdown_awk_matches_local_summary(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(LOG_FIXTURE.encode())
+
+    pushdown_errors, local_errors = [], []
+    pushdown = parse_pushdown_output(_run_awk(path), pushdown_errors.append)
+    local = summarize_log_content(LOG_FIXTURE, local_errors.append)
+
+    assert pushdown == local
+    assert pushdown_errors == local_errors
+    assert local == {"ERROR": 5, "WARNING": 2, "INFO": 2, "TOTAL_LINES": 11}
+    assert local_errors[-1].endswith("última línea sin salto")
+
+
+@pytest.mark.skipif(shutil.which("awk") is None, reason="requiere awk")
+def test_pushdown_awk_empty_log(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"")
+
+    assert parse_pushdown_output(_run_awk(path)) == summarize_log_content(b"")
+
+
+# ---------- lectura incremental ----------
+
+def _run_incremental(path, cursor, post: str = "") -> tuple[int, int, bytes]:
+    """Corre el comando incremental con bash local; devuelve (inode, fin, bytes leídos)."""
+    result = subprocess.run(["bash", "-c", build_incremental_command(str(path), cursor, post)],
+                            capture_output=True, check=True)
+    header, _, body = result.stdout.partition(b"\n")
+    inode, end = (int(v) for v in header.split())
+    return inode, end, body
+
+
+needs_gnu_stat = pytest.mark.skipif(
+    shutil.which("bash") is None or shutil.which("stat") is None
+    or subprocess.run(["stat", "--version"], capture_output=True).returncode != 0,
+    reason="requiere bash y stat de GNU",
+)
+
+
+@needs_gnu_stat
+def test_incremental_stops_at_last_complete_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"a INFO\nb ERROR\nc ERR")
+
+    inode, end, body = _run_incremental(path, None)
+    assert inode == os.stat(path).st_ino
+    assert (end, body) == (len(b"a INFO\nb ERROR\n"), b"a INFO\nb ERROR\n")
+
+    # La línea a medio escribir se lee entera en la siguiente ejecución
+    with open(path, "ab") as f:
+        f.write(b"OR tarde\nd WARN\ne")
+    _, end2, body2 = _run_incremental(path, {"inode": inode, "offset": end})
+    assert body2 == b"c ERROR tarde\nd WARN\n"
+    assert end2 == os.path.getsize(path) - 1
+
+    # Con el log completo (termina en "\n") se lee hasta el final
+    with open(path, "ab") as f:
+        f.write(b" INFO\n")
+    _, end3, body3 = _run_incremental(path, {"inode": inode, "offset": end2})
+    assert (end3, body3) == (os.path.getsize(path), b"e INFO\n")
+
+
+@needs_gnu_stat
+def test_incremental_single_partial_line_is_not_read(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"sin salto todavia")
+
+    _, end, body = _run_incremental(path, None)
+    assert (end, body) == (0, b"")
+    _, end, body = _run_incremental(path, {"inode": os.stat(path).st_ino, "offset": 0})
+    assert (end, body) == (0, b"")
+
+
+@needs_gnu_stat
+def test_incremental_partial_line_longer_than_lookback(tmp_path, monkeypatch):
+    monkeypatch.setattr(rls, "PARTIAL_LINE_LOOKBACK", 8)
+    path = tmp_path / "app.log"
+    path.write_bytes(b"a\n" + b"x" * 20)
+
+    # Sin salto en los últimos 8 bytes se lee hasta el tamaño, como antes
+    _, end, body = _run_incremental(path, {"inode": os.stat(path).st_ino, "offset": 0})
+    assert (end, body) == (22, b"a\n" + b"x" * 20)
+
+
+@needs_gnu_stat
+@pytest.mark.skipif(shutil.which("awk") is None, reason="requiere awk")
+def test_incremental_pushdown_counts_only_complete_lines(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"a INFO\nb ERROR\nc ERR")
+
+    _, _, body = _run_incremental(path, None, PUSHDOWN_AWK)
+    assert parse_pushdown_output(body) == {"ERROR": 1, "WARNING": 0, "INFO": 1, "TOTAL_LINES": 2}
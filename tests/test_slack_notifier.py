@@ -0,0 +1,55 @@
+import threading
+
+from slack_notifier import MESSAGE_SEPARATOR, SlackNotifier
+
+
+def _notifier(sent: list) -> SlackNotifier:
+    notifier = SlackNotifier("http://slack.invalid/hook", coalesce_window=0, rate_per_sec=0)
+    notifier._post = lambda text: sent.extend(text.split(MESSAGE_SEPARATOR))
+    return notifier
+
+
+def test_close_sends_everything_queued():
+    sent = []
+    notifier = _notifier(sent)
+    for i in range(50):
+        notifier.send(f"m{i}")
+    notifier.close(timeout=5)
+
+    assert sent == [f"m{i}" for i in range(50)]
+    assert notifier._worker is None
+
+
+def test_send_racing_close_is_not_lost():
+    # Un `send` que llega mientras close() detiene el hilo debe enviarse igual
+    for _ in range(200):
+        sent = []
+        notifier = _notifier(sent)
+        notifier.send("primero")
+        start = threading.Event()
+
+        def sender():
+            start.wait()
+            for i in range(20):
+                notifier.send(f"m{i}")
+
+        thread = threading.Thread(target=sender)
+        thread.start()
+        start.set()
+        notifier.close(timeout=5)
+        thread.join()
+        notifier.close(timeout=5)
+
+        assert sorted(sent) == sorted(["primero"] + [f"m{i}" for i in range(20)])
+
+
+def test_send_after_close_restarts_the_worker():
+    sent = []
+    notifier = _notifier(sent)
+    notifier.send("a")
+    notifier.close(timeout=5)
+    notifier.send("b")
+    assert notifier.flush(timeout=5)
+    notifier.close(timeout=5)
+
+    assert sent == ["a", "b"]
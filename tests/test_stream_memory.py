@@ -0,0 +1,129 @@
+"""
+Memoria de la lectura en streaming de logs remotos (opcional: es lenta).
+
+    STREAM_MEMORY_TEST_MB=500 python -m pytest -q tests/test_stream_memory.py
+
+Pasa un log generado de ese tamaño por un stdout falso (nunca está completo en
+memoria) y verifica con tracemalloc que el pico no depende del tamaño del log.
+"""
+
+import os
+import tracemalloc
+
+import pytest
+
+import remote_log_error_summary as rls
+from ssh_pool import READ_CHUNK_SIZE, iter_remote_chunks, iter_remote_lines
+
+LOG_MB = int(os.getenv("STREAM_MEMORY_TEST_MB", "0"))
+# Unos pocos bloques de lectura, sin importar el tamaño del log
+MAX_PEAK_BYTES = 64 * READ_CHUNK_SIZE
+
+pytestmark = pytest.mark.skipif(LOG_MB <= 0, reason="opcional: definir STREAM_MEMORY_TEST_MB")
+
+BLOCK = "".join(
+    f"2025-11-29 23:{i // 60 % 60:02d}:{i % 60:02d} [{level}] mensaje {i} con acentos: canción ñandú\n"
+    for i, level in enumerate(["INFO"] * 7 + ["WARNING"] * 2 + ["ERROR"])
+).encode()
+PARTIAL_TAIL = b"2025-11-29 23:59:59 [ERROR] ultima linea sin salto"
+
+
+class FakeStdout:
+    """stdout de exec_command que genera `total` bytes de log a medida que se leen."""
+
+    def __init__(self, total: int):
+        self.repeats = max(1, total // len(BLOCK))
+        self.size = self.repeats * len(BLOCK) + len(PARTIAL_TAIL)
+        self.pos = 0
+
+    def read(self, n: int) -> bytes:
+        # Lecturas de largo impar: cortan líneas y caracteres multibyte entre bloques
+        n = min(n - 7, self.size - self.pos)
+        if n <= 0:
+            return b""
+        start = self.pos
+        self.pos += n
+        body_end = self.repeats * len(BLOCK)
+        out = bytearray()
+        while start < min(self.pos, body_end):
+            offset = start % len(BLOCK)
+            piece = BLOCK[offset:offset + min(self.pos, body_end) - start]
+            out += piece
+            start += len(piece)
+        if self.pos > body_end:
+            out += PARTIAL_TAIL[start - body_end:self.pos - body_end]
+        return bytes(out)
+
+
+class FakeClient:
+    def __init__(self, total: int):
+        self.total = total
+
+    def exec_command(self, cmd, timeout=None):
+        return None, FakeStdout(self.total), FakeStdout(0)
+
+
+def _peak(fn) -> tuple[object, int]:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _total() -> int:
+    return LOG_MB * 1024 * 1024
+
+
+def test_iter_remote_chunks_memory_is_bounded():
+    stream = FakeStdout(_total())
+
+    def consume():
+        size = lines = 0
+        for chunk in iter_remote_chunks(stream):
+            size += len(chunk)
+            lines += chunk.count(b"\n")
+        return size, lines
+
+    (size, lines), peak = _peak(consume)
+    assert (size, lines) == (stream.size, stream.repeats * 10)
+    assert peak < MAX_PEAK_BYTES, f"pico {peak / 1e6:.1f} MB"
+
+
+def test_iter_remote_lines_memory_is_bounded():
+    stream = FakeStdout(_total())
+
+    def consume():
+        lines = errors = 0
+        for line in iter_remote_lines(stream):
+            lines += 1
+            errors += "[ERROR]" in line
+        return lines, errors
+
+    (lines, errors), peak = _peak(consume)
+    assert (lines, errors) == (stream.repeats * 10 + 1, stream.repeats + 1)
+    assert peak < MAX_PEAK_BYTES, f"pico {peak / 1e6:.1f} MB"
+
+
+def test_fetch_log_summary_memory_is_bounded(monkeypatch, tmp_path):
+    monkeypatch.setattr(rls, "get_ssh_client", lambda *args, **kwargs: FakeClient(_total()))
+    monkeypatch.setattr(rls, "LOG_INCREMENTAL", False)
+    monkeypatch.setattr(rls, "LOG_TIME_RANGE", "")
+    monkeypatch.setattr(rls, "LOG_PUSHDOWN", "0")
+    monkeypatch.setattr(rls, "OUTPUT_DIR", str(tmp_path))
+    repeats = FakeStdout(_total()).repeats
+
+    def fetch():
+        # Las líneas con ERROR van al CSV a medida que llegan (ErrorCsvWriter guarda de a BUFFER_ROWS)
+        with rls.ErrorCsvWriter("fake.host") as writer:
+            summary = rls.fetch_log_summary("fake.host", "user", "password", "/var/log/app.log",
+                                            on_error=writer.write)
+        return summary, writer.rows
+
+    (summary, rows), peak = _peak(fetch)
+    assert summary == {"ERROR": repeats + 1, "WARNING": 2 * repeats, "INFO": 7 * repeats,
+                       "TOTAL_LINES": 10 * repeats + 1}
+    assert rows == repeats + 1
+    assert peak < MAX_PEAK_BYTES, f"pico {peak / 1e6:.1f} MB"